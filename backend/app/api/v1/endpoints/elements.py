@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.deps import get_db
 from app.crud.device import device
 from app.services.element_locator import ElementLocator, create_element_locator
+from app.core.locator.profiler import locator_profiler
+from app.services.locator_optimizer import LocatorOptimizer
 from app.schemas.element import (
     ElementLocateRequest,
     ElementLocateResponse,
@@ -91,6 +93,59 @@ async def get_element_tree(
     
     return await locator.get_element_tree()
 
+@router.get("/locator-stats")
+async def get_locator_stats(
+    *,
+    project_id: Optional[int] = None,
+    limit: int = 10
+):
+    """获取定位器性能统计及慢定位器排行"""
+    return locator_profiler.get_stats(project_id, limit)
+
+@router.delete("/locator-stats")
+async def reset_locator_stats(
+    *,
+    project_id: Optional[int] = None
+):
+    """清空定位器性能统计"""
+    locator_profiler.reset(project_id)
+    return {"message": "定位器性能统计已清空"}
+
+@router.post("/{device_id}/locator-suggestions")
+async def suggest_locators(
+    *,
+    db: AsyncSession = Depends(get_db),
+    device_id: str,
+    project_id: Optional[int] = None,
+    limit: int = 10,
+    repeat: int = 3,
+    apply: bool = False
+):
+    """为慢XPath定位器推荐快速定位器并实测加速比"""
+    device_obj = await device.get(db, id=device_id)
+    if not device_obj:
+        raise HTTPException(status_code=404, detail="设备不存在")
+    
+    locator = create_element_locator(device_obj)
+    if not locator:
+        raise HTTPException(status_code=400, detail="不支持的设备类型")
+    
+    if not await locator.connect():
+        raise HTTPException(status_code=500, detail="设备连接失败")
+    try:
+        return await LocatorOptimizer(db).analyze(
+            locator,
+            device_obj.id,
+            project_id=project_id,
+            limit=limit,
+            repeat=repeat,
+            apply=apply
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await locator.disconnect()
+
 @router.websocket("/{device_id}/screen")
 async def screen_stream(websocket: WebSocket, device_id: str):
     """获取屏幕流"""
@@ -1,5 +1,5 @@
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, Body, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Body, BackgroundTasks, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.execution_service import ExecutionService
 from app.core.enums.project import ExecutionStatus
@@ -11,7 +11,6 @@ router = APIRouter()
 @router.post("/run")
 async def run_test(
     *,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     test_id: str = Body(...),
     device_id: str = Body(...),
@@ -21,7 +20,6 @@ async def run_test(
     运行测试
     
     Args:
-        background_tasks: 后台任务
         test_id: 测试ID
         device_id: 设备ID
         environment: 环境名称
@@ -34,8 +32,7 @@ async def run_test(
         execution = await execution_service.run_test(
             test_id,
             device_id,
-            environment,
-            background_tasks
+            environment
         )
         return {
             "message": "测试开始执行",
@@ -52,7 +49,7 @@ async def run_test_suite(
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     suite_id: str = Body(...),
-    device_id: str = Body(...),
+    device_id: Optional[str] = Body(None),
     environment: str = Body(...)
 ) -> Dict[str, Any]:
     """
@@ -61,7 +58,7 @@ async def run_test_suite(
     Args:
         background_tasks: 后台任务
         suite_id: 套件ID
-        device_id: 设备ID
+        device_id: 限定的设备ID，为空时分发到资源池中全部可用设备
         environment: 环境名称
         
     Returns:
@@ -69,7 +66,7 @@ async def run_test_suite(
     """
     execution_service = ExecutionService(db)
     try:
-        executions = await execution_service.run_test_suite(
+        schedule = await execution_service.run_test_suite(
             suite_id,
             device_id,
             environment,
@@ -77,7 +74,7 @@ async def run_test_suite(
         )
         return {
             "message": "测试套件开始执行",
-            "executions": [execution.to_dict() for execution in executions]
+            "schedule": schedule
         }
     except ExecutionError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -110,6 +107,88 @@ async def stop_execution(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/{execution_id}/resume")
+async def resume_execution(
+    *,
+    db: AsyncSession = Depends(get_db),
+    execution_id: str,
+    device_id: Optional[str] = Body(None, embed=True)
+) -> Dict[str, Any]:
+    """
+    从检查点恢复失败的执行
+    
+    Args:
+        execution_id: 执行ID
+        device_id: 指定的设备ID，为空时选择平台匹配的可用设备
+        
+    Returns:
+        Dict[str, Any]: 恢复结果
+    """
+    execution_service = ExecutionService(db)
+    try:
+        execution = await execution_service.resume_execution(execution_id, device_id)
+        return {
+            "execution_id": execution.id,
+            "device_id": execution.device_id,
+            "message": "执行已从检查点恢复"
+        }
+    except ExecutionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/keyword-stats")
+async def get_keyword_stats(
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    获取关键字调用次数和耗时
+    
+    Returns:
+        Dict[str, Any]: 按注册表分组的关键字统计
+    """
+    execution_service = ExecutionService(db)
+    return execution_service.get_keyword_stats()
+
+@router.get("/timings/project/{project_id}")
+async def get_project_timings(
+    *,
+    db: AsyncSession = Depends(get_db),
+    project_id: int,
+    days: int = Query(7, ge=1, le=90)
+) -> Dict[str, Any]:
+    """
+    获取项目的步骤耗时分解
+    
+    Args:
+        project_id: 项目ID
+        days: 统计最近多少天
+        
+    Returns:
+        Dict[str, Any]: 定位、操作、断言、截图、持久化各阶段的耗时及占比
+    """
+    execution_service = ExecutionService(db)
+    try:
+        return await execution_service.get_project_timings(project_id, days)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/queue/stats")
+async def get_queue_stats(
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    获取执行队列深度和等待时间
+    
+    Returns:
+        Dict[str, Any]: 按优先级的排队数、等待时间及预计排空时间
+    """
+    execution_service = ExecutionService(db)
+    try:
+        return await execution_service.get_queue_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{execution_id}")
 async def get_execution(
     *,
@@ -160,6 +239,29 @@ async def get_execution_status(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{execution_id}/timings")
+async def get_execution_timings(
+    *,
+    db: AsyncSession = Depends(get_db),
+    execution_id: str
+) -> Dict[str, Any]:
+    """
+    获取单次执行的步骤耗时分解
+    
+    Args:
+        execution_id: 执行ID
+        
+    Returns:
+        Dict[str, Any]: 各阶段的耗时及占比
+    """
+    execution_service = ExecutionService(db)
+    try:
+        return await execution_service.get_execution_timings(execution_id)
+    except ExecutionError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{execution_id}/result")
 async def get_execution_result(
     *,
@@ -251,6 +353,27 @@ async def get_test_executions(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/suite/{suite_id}/report")
+async def get_suite_report(
+    *,
+    db: AsyncSession = Depends(get_db),
+    suite_id: str
+) -> Dict[str, Any]:
+    """
+    获取套件最近一次执行报告
+    
+    Args:
+        suite_id: 套件ID
+        
+    Returns:
+        Dict[str, Any]: 执行报告，包含总完成时间和设备利用率
+    """
+    execution_service = ExecutionService(db)
+    report = execution_service.get_suite_report(suite_id)
+    if not report:
+        raise HTTPException(status_code=404, detail=f"套件没有执行报告: {suite_id}")
+    return report
+
 @router.get("/suite/{suite_id}")
 async def get_suite_executions(
     *,
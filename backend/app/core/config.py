@@ -1,4 +1,4 @@
-from typing import List
+from typing import Any, Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -30,6 +30,43 @@ class Settings(BaseSettings):
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     
+    # 截图配置
+    MEDIA_ROOT: str = "media"
+    SCREENSHOT_POLICY: str = "on_failure"  # always、on_failure、every_nth、on_assertion、never
+    SCREENSHOT_EVERY_N: int = 10
+    SCREENSHOT_WORKERS: int = 2
+    
+    # 步骤合并：相邻的点击、悬停、拖放等手势合并为一次W3C Actions调用，
+    # 只合并确定在同一页面上的步骤（点击类步骤需设置same_screen），默认关闭
+    STEP_FUSION: bool = False
+    
+    # 定位器性能画像最多保留的定位器数，超出后按LRU淘汰
+    LOCATOR_PROFILE_MAX_SIZE: int = 5000
+    
+    # 执行时间预算（秒）：整次执行和单个步骤的上限，超出后中断并释放设备
+    EXECUTION_TIMEOUT: int = 3600
+    STEP_TIMEOUT: int = 300
+    # 其他工作进程发起的停止通过数据库状态传递，轮询间隔（秒）
+    CANCEL_POLL_INTERVAL: float = 2.0
+    
+    # 设备发现：同时探测的设备数、设备属性缓存时间（秒）和单条命令超时（秒）
+    DEVICE_PROBE_CONCURRENCY: int = 16
+    DEVICE_INFO_TTL: float = 300.0
+    DEVICE_PROBE_TIMEOUT: float = 10.0
+    # 设备在线状态跟踪：Android通过adb track-devices实时获取，iOS按间隔（秒）列出
+    DEVICE_PRESENCE_TRACKING: bool = True
+    IOS_PRESENCE_INTERVAL: float = 5.0
+    
+    # Appium配置：设备名称到能力集合
+    APPIUM_SERVER: str = "http://localhost:4723"
+    DEVICES: Dict[str, Dict[str, Any]] = {}
+    # 驱动会话池：空闲超时（秒，需小于Appium的newCommandTimeout）、单个会话最多复用次数、
+    # 健康检查和重启应用的超时（秒），以及启动时是否为全部设备预先创建会话
+    SESSION_IDLE_TIMEOUT: float = 600.0
+    SESSION_MAX_USES: int = 50
+    SESSION_HEALTH_TIMEOUT: float = 10.0
+    SESSION_POOL_WARMUP: bool = False
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
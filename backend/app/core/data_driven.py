@@ -39,13 +39,13 @@ class DataDrivenTest:
             self.current_index = self.test_data.index(data)
             callback(data)
     
-    def parameterize(self, template: str) -> str:
-        """参数化字符串"""
+    def parameterize(self, template: str, data: Optional[Dict[str, Any]] = None) -> str:
+        """参数化字符串，未指定data时使用当前测试数据"""
         if not template:
             return template
         
         result = template
-        for key, value in self.get_current_data().items():
+        for key, value in (self.get_current_data() if data is None else data).items():
             result = result.replace(f"${{{key}}}", str(value))
         return result
     
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+async def run_sharded(
+    rows: Sequence[Dict[str, Any]],
+    workers: Sequence[Any],
+    run_row: Callable[[Any, int, Dict[str, Any]], Awaitable[Any]]
+) -> List[Dict[str, Any]]:
+    """
+    将数据行分发到多个工作者（设备）并发执行
+    
+    每个工作者空闲时领取下一行，执行快的设备自然多领，不需要预先均分；
+    单行失败只记录结果，不影响其他行。
+    
+    Args:
+        rows: 测试数据行
+        workers: 工作者列表，每个工作者同一时间只执行一行
+        run_row: 执行一行的协程函数，参数为(工作者, 行号, 数据)
+    
+    Returns:
+        List[Dict[str, Any]]: 按行号排序的逐行结果
+    """
+    next_index = iter(range(len(rows)))
+    results: List[Dict[str, Any]] = []
+    
+    async def consume(shard: int, worker: Any) -> None:
+        # 迭代器在单个事件循环内按顺序领取，不需要加锁
+        for index in next_index:
+            started = time.monotonic()
+            result = {"row": index, "shard": shard, "status": "passed", "error_message": None}
+            try:
+                await run_row(worker, index, rows[index])
+            except Exception as e:
+                result["status"] = "failed"
+                result["error_message"] = str(e)
+            result["duration"] = round(time.monotonic() - started, 3)
+            results.append(result)
+    
+    await asyncio.gather(*[consume(shard, worker) for shard, worker in enumerate(workers)])
+    return sorted(results, key=lambda result: result["row"])
+
+def merge_row_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    合并逐行结果
+    
+    Args:
+        results: run_sharded返回的逐行结果
+    
+    Returns:
+        Dict[str, Any]: 汇总，包含总行数、通过数、失败行及每个分片的行数
+    """
+    failed = [result for result in results if result["status"] != "passed"]
+    shards: Dict[int, int] = {}
+    for result in results:
+        shards[result["shard"]] = shards.get(result["shard"], 0) + 1
+    return {
+        "status": "failed" if failed else "passed",
+        "total": len(results),
+        "passed": len(results) - len(failed),
+        "failed": len(failed),
+        "failed_rows": [result["row"] for result in failed],
+        "rows_per_shard": shards,
+        "error_message": "; ".join(
+            f"第 {result['row'] + 1} 行: {result['error_message']}" for result in failed[:20]
+        ) or None
+    } 
\ No newline at end of file
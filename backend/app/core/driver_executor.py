@@ -0,0 +1,199 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.logger import logger
+
+class DriverExecutor:
+    """设备驱动调用执行器：在有界线程池中执行阻塞的Selenium/Appium调用"""
+    
+    def __init__(self, device_id: str, max_workers: int = 1, max_pending: int = 32):
+        """
+        初始化驱动调用执行器
+        
+        Args:
+            device_id: 设备ID
+            max_workers: 线程数，同一会话的命令需要串行，默认为1
+            max_pending: 最多排队的调用数，超出后提交方等待
+        """
+        self.device_id = device_id
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"driver-{device_id}"
+        )
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._failures = 0
+        self._queue_time = 0.0
+        self._busy_time = 0.0
+    
+    def _invoke(self, func: Callable, submitted: float) -> Any:
+        """在工作线程中执行调用并统计排队及执行耗时"""
+        started = time.monotonic()
+        try:
+            return func()
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            raise
+        finally:
+            finished = time.monotonic()
+            with self._lock:
+                self._calls += 1
+                self._queue_time += started - submitted
+                self._busy_time += finished - started
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在线程池中执行阻塞调用
+        
+        Args:
+            func: 阻塞函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+        
+        Returns:
+            Any: 函数返回值
+        """
+        if self._pending is None:
+            self._pending = asyncio.Semaphore(self.max_pending)
+        async with self._pending:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                self._invoke,
+                functools.partial(func, *args, **kwargs),
+                time.monotonic()
+            )
+    
+    def wrap(self, target: Any) -> "AsyncDriverProxy":
+        """
+        包装定位器等对象，使其方法调用变为可等待对象
+        
+        Args:
+            target: 被包装的对象，例如BaseLocator
+        
+        Returns:
+            AsyncDriverProxy: 异步代理
+        """
+        return AsyncDriverProxy(self, target)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        关闭线程池
+        
+        Args:
+            wait: 是否等待执行中的调用完成
+        """
+        self._executor.shutdown(wait=wait)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取执行统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        with self._lock:
+            return {
+                "device_id": self.device_id,
+                "max_workers": self.max_workers,
+                "calls": self._calls,
+                "failures": self._failures,
+                "avg_queue_time": round(self._queue_time / self._calls, 4) if self._calls else 0.0,
+                "busy_time": round(self._busy_time, 4)
+            }
+
+class AsyncDriverProxy:
+    """异步代理：属性原样返回，方法调用提交到设备执行器"""
+    
+    def __init__(self, executor: DriverExecutor, target: Any):
+        self._executor = executor
+        self._target = target
+    
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._executor.run(attr, *args, **kwargs)
+        return call
+
+class DriverExecutorRegistry:
+    """按设备管理驱动调用执行器，不同设备的调用互不阻塞"""
+    
+    def __init__(self, max_workers: int = 1, max_pending: int = 32):
+        """
+        初始化执行器注册表
+        
+        Args:
+            max_workers: 每个设备的线程数
+            max_pending: 每个设备最多排队的调用数
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executors: Dict[str, DriverExecutor] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, device_id: str) -> DriverExecutor:
+        """
+        获取设备的执行器，不存在时创建
+        
+        Args:
+            device_id: 设备ID
+        
+        Returns:
+            DriverExecutor: 驱动调用执行器
+        """
+        with self._lock:
+            executor = self._executors.get(device_id)
+            if executor is None:
+                executor = self._executors[device_id] = DriverExecutor(
+                    device_id,
+                    max_workers=self.max_workers,
+                    max_pending=self.max_pending
+                )
+            return executor
+    
+    def release(self, device_id: str, wait: bool = True) -> None:
+        """
+        关闭并移除设备的执行器
+        
+        Args:
+            device_id: 设备ID
+            wait: 是否等待执行中的调用完成
+        """
+        with self._lock:
+            executor = self._executors.pop(device_id, None)
+        if executor:
+            executor.shutdown(wait=wait)
+            logger.info(f"已关闭设备 {device_id} 的驱动调用执行器")
+    
+    def shutdown_all(self, wait: bool = True) -> None:
+        """关闭所有执行器"""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取所有执行器的统计
+        
+        Returns:
+            Dict[str, Any]: 按设备ID的统计信息
+        """
+        with self._lock:
+            executors = list(self._executors.values())
+        return {executor.device_id: executor.get_stats() for executor in executors}
+
+# 进程级驱动调用执行器注册表
+driver_executors = DriverExecutorRegistry() 
\ No newline at end of file
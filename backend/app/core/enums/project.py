@@ -15,6 +15,7 @@ class TestExecutionStatus(str, Enum):
     ERROR = "error"
     SKIPPED = "skipped"
     BLOCKED = "blocked"
+    CANCELLED = "cancelled"
 
 class TestStepStatus(str, Enum):
     """测试步骤状态枚举"""
@@ -81,4 +82,12 @@ class ReportType(str, Enum):
     HTML = "html"
     PDF = "pdf"
     EXCEL = "excel"
-    JSON = "json" 
\ No newline at end of file
+    JSON = "json"
+
+class ScreenshotPolicy(str, Enum):
+    """步骤截图策略枚举"""
+    ALWAYS = "always"
+    ON_FAILURE = "on_failure"
+    EVERY_NTH = "every_nth"
+    ON_ASSERTION = "on_assertion"
+    NEVER = "never" 
\ No newline at end of file
@@ -10,10 +10,22 @@ class TestStepError(Exception):
     """测试步骤错误"""
     pass
 
+class ExecutionCancelledError(Exception):
+    """测试执行已取消"""
+    pass
+
+class ExecutionTimeoutError(Exception):
+    """测试执行超出时间预算"""
+    pass
+
 class ElementNotFoundError(Exception):
     """元素未找到错误"""
     pass
 
+class WaitCancelledError(Exception):
+    """等待元素已取消"""
+    pass
+
 class ElementNotVisibleError(Exception):
     """元素不可见错误"""
     pass
@@ -0,0 +1,335 @@
+import time
+import asyncio
+import inspect
+import threading
+from typing import Any, Callable, Dict, List
+
+class Keyword:
+    """关键字：处理函数及其调用计时"""
+    
+    def __init__(self, name: str, func: Callable):
+        """
+        初始化关键字
+        
+        Args:
+            name: 关键字名称
+            func: 处理函数，同步或异步
+        """
+        self.name = name
+        self.func = func
+        self.is_async = inspect.iscoroutinefunction(func)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+    
+    def _record(self, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += elapsed
+            if elapsed > self.max_seconds:
+                self.max_seconds = elapsed
+            if failed:
+                self.failures += 1
+    
+    def __call__(self, *args, **kwargs) -> Any:
+        if self.is_async:
+            return self._call_async(*args, **kwargs)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = self.func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self._record(time.perf_counter() - started, failed)
+    
+    async def _call_async(self, *args, **kwargs) -> Any:
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await self.func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self._record(time.perf_counter() - started, failed)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取调用统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "total_ms": round(self.total_seconds * 1000, 3),
+                "avg_ms": round(self.total_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+                "max_ms": round(self.max_seconds * 1000, 3)
+            }
+    
+    def reset_stats(self) -> None:
+        """重置调用统计"""
+        with self._lock:
+            self.calls = 0
+            self.failures = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+
+class KeywordRegistry:
+    """关键字注册表：按名称注册操作或断言，执行前解析一次，之后按字典直接分发"""
+    
+    def __init__(self, name: str):
+        """
+        初始化关键字注册表
+        
+        Args:
+            name: 注册表名称
+        """
+        self.name = name
+        self._keywords: Dict[str, Keyword] = {}
+    
+    def register(self, name: str, *aliases: str) -> Callable[[Callable], Callable]:
+        """
+        注册关键字的装饰器，同名关键字后注册的覆盖先注册的
+        
+        Args:
+            name: 关键字名称
+            *aliases: 别名
+        
+        Returns:
+            Callable: 装饰器
+        """
+        def decorator(func: Callable) -> Callable:
+            keyword = Keyword(name, func)
+            for key in (name,) + aliases:
+                self._keywords[key] = keyword
+            return func
+        return decorator
+    
+    def resolve(self, name: str) -> Keyword:
+        """
+        解析关键字
+        
+        Args:
+            name: 关键字名称
+        
+        Returns:
+            Keyword: 关键字
+        
+        Raises:
+            ValueError: 未注册的关键字
+        """
+        keyword = self._keywords.get(name)
+        if keyword is None:
+            raise ValueError(f"不支持的{self.name}: {name}")
+        return keyword
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._keywords
+    
+    def names(self) -> List[str]:
+        """
+        获取已注册的关键字名称
+        
+        Returns:
+            List[str]: 关键字名称列表（含别名）
+        """
+        return sorted(self._keywords)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各关键字的调用统计，别名合并到关键字名称下
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: 关键字名称到统计信息
+        """
+        return {
+            keyword.name: keyword.get_stats()
+            for keyword in {id(keyword): keyword for keyword in self._keywords.values()}.values()
+        }
+    
+    def reset_stats(self) -> None:
+        """重置调用统计"""
+        for keyword in self._keywords.values():
+            keyword.reset_stats()
+
+# TestEngine的操作和断言，对定位器同步执行，在驱动调用执行器中运行
+locator_actions = KeywordRegistry("操作类型")
+locator_assertions = KeywordRegistry("断言类型")
+# TestExecutor的操作和断言，对异步驱动执行
+element_actions = KeywordRegistry("操作")
+element_assertions = KeywordRegistry("断言类型")
+
+def step_field(step: Any, name: str, default: Any = None) -> Any:
+    """读取步骤字段，步骤可以是字典或对象"""
+    if isinstance(step, dict):
+        return step.get(name, default)
+    return getattr(step, name, default)
+
+@locator_actions.register("click")
+def click(locator: Any, step: Any) -> None:
+    locator.click()
+
+@locator_actions.register("input")
+def input_text(locator: Any, step: Any) -> None:
+    locator.input_text(step_field(step, "value"))
+
+@locator_actions.register("clear")
+def clear(locator: Any, step: Any) -> None:
+    locator.clear()
+
+@locator_actions.register("submit")
+def submit(locator: Any, step: Any) -> None:
+    locator.submit()
+
+@locator_actions.register("scroll")
+def scroll(locator: Any, step: Any) -> None:
+    locator.scroll_into_view()
+
+@locator_actions.register("hover")
+def hover(locator: Any, step: Any) -> None:
+    locator.hover()
+
+@locator_actions.register("double_click")
+def double_click(locator: Any, step: Any) -> None:
+    locator.double_click()
+
+@locator_actions.register("right_click")
+def right_click(locator: Any, step: Any) -> None:
+    locator.right_click()
+
+@locator_actions.register("drag_and_drop")
+def drag_and_drop(locator: Any, step: Any) -> None:
+    target = step_field(step, "target_locator")
+    if not target:
+        raise ValueError("拖放操作未指定目标元素")
+    locator.drag_and_drop(locator.resolve(target))
+
+@locator_assertions.register("present")
+def assert_present(locator: Any, assertion: Dict[str, Any]) -> None:
+    if not locator.is_present():
+        raise AssertionError("元素不存在")
+
+@locator_assertions.register("visible")
+def assert_visible(locator: Any, assertion: Dict[str, Any]) -> None:
+    if not locator.is_visible():
+        raise AssertionError("元素不可见")
+
+@locator_assertions.register("enabled")
+def assert_enabled(locator: Any, assertion: Dict[str, Any]) -> None:
+    if not locator.is_enabled():
+        raise AssertionError("元素不可用")
+
+@locator_assertions.register("selected")
+def assert_selected(locator: Any, assertion: Dict[str, Any]) -> None:
+    if not locator.is_selected():
+        raise AssertionError("元素未选中")
+
+@locator_assertions.register("text")
+def assert_text(locator: Any, assertion: Dict[str, Any]) -> None:
+    actual = locator.get_text()
+    if actual != assertion["value"]:
+        raise AssertionError(f"文本不匹配: 期望 {assertion['value']}, 实际 {actual}")
+
+@locator_assertions.register("attribute")
+def assert_attribute(locator: Any, assertion: Dict[str, Any]) -> None:
+    if locator.get_attribute(assertion["attribute"]) != assertion["value"]:
+        raise AssertionError(f"属性不匹配: {assertion['attribute']}")
+
+@locator_assertions.register("css_property")
+def assert_css_property(locator: Any, assertion: Dict[str, Any]) -> None:
+    if locator.get_css_property(assertion["property"]) != assertion["value"]:
+        raise AssertionError(f"CSS属性不匹配: {assertion['property']}")
+
+@locator_assertions.register("count")
+def assert_count(locator: Any, assertion: Dict[str, Any]) -> None:
+    actual = locator.get_count()
+    if actual != assertion["value"]:
+        raise AssertionError(f"元素数量不匹配: 期望 {assertion['value']}, 实际 {actual}")
+
+@locator_assertions.register("contains_text")
+def assert_contains_text(locator: Any, assertion: Dict[str, Any]) -> None:
+    if assertion["value"] not in locator.get_text():
+        raise AssertionError(f"文本不包含: {assertion['value']}")
+
+@locator_assertions.register("contains_attribute")
+def assert_contains_attribute(locator: Any, assertion: Dict[str, Any]) -> None:
+    if assertion["value"] not in locator.get_attribute(assertion["attribute"]):
+        raise AssertionError(f"属性不包含: {assertion['attribute']}")
+
+@element_actions.register("click")
+async def element_click(executor: Any, element: Any, step: Dict[str, Any]) -> None:
+    await element.click()
+
+@element_actions.register("input")
+async def element_input(executor: Any, element: Any, step: Dict[str, Any]) -> None:
+    await element.clear()
+    await element.send_keys(step.get("value"))
+
+@element_actions.register("wait")
+async def element_wait(executor: Any, element: Any, step: Dict[str, Any]) -> None:
+    await asyncio.sleep(float(step.get("value")))
+
+@element_actions.register("assert")
+async def element_assert(executor: Any, element: Any, step: Dict[str, Any]) -> None:
+    await executor._perform_assertion(step)
+
+@element_assertions.register("text")
+async def element_assert_text(assertions: Any, step: Dict[str, Any]) -> bool:
+    if not step.get("value"):
+        raise Exception("断言文本内容时未指定预期值")
+    return await assertions.assert_element_text(step["element"], step["value"])
+
+@element_assertions.register("attribute")
+async def element_assert_attribute(assertions: Any, step: Dict[str, Any]) -> bool:
+    if not step.get("attribute") or not step.get("value"):
+        raise Exception("断言属性时未指定属性名或预期值")
+    return await assertions.assert_element_attribute(step["element"], step["attribute"], step["value"])
+
+@element_assertions.register("visible")
+async def element_assert_visible(assertions: Any, step: Dict[str, Any]) -> bool:
+    return await assertions.assert_element_visible(step["element"])
+
+@element_assertions.register("enabled")
+async def element_assert_enabled(assertions: Any, step: Dict[str, Any]) -> bool:
+    return await assertions.assert_element_enabled(step["element"])
+
+@element_assertions.register("selected")
+async def element_assert_selected(assertions: Any, step: Dict[str, Any]) -> bool:
+    return await assertions.assert_element_selected(step["element"])
+
+@element_assertions.register("count")
+async def element_assert_count(assertions: Any, step: Dict[str, Any]) -> bool:
+    if not step.get("value"):
+        raise Exception("断言元素数量时未指定预期值")
+    return await assertions.assert_element_count(step["element"], int(step["value"]))
+
+@element_assertions.register("page_source")
+async def element_assert_page_source(assertions: Any, step: Dict[str, Any]) -> bool:
+    if not step.get("value"):
+        raise Exception("断言页面源码时未指定预期值")
+    return await assertions.assert_page_source_contains(step["value"])
+
+@element_assertions.register("url")
+async def element_assert_url(assertions: Any, step: Dict[str, Any]) -> bool:
+    if not step.get("value"):
+        raise Exception("断言URL时未指定预期值")
+    return await assertions.assert_current_url(step["value"])
+
+def get_keyword_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    获取所有注册表的关键字调用统计
+    
+    Returns:
+        Dict[str, Dict[str, Dict[str, Any]]]: 注册表到各关键字统计
+    """
+    return {
+        "locator_actions": locator_actions.get_stats(),
+        "locator_assertions": locator_assertions.get_stats(),
+        "element_actions": element_actions.get_stats(),
+        "element_assertions": element_assertions.get_stats()
+    } 
\ No newline at end of file
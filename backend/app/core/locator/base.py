@@ -1,7 +1,8 @@
-from typing import Optional, Union, Dict, Any
+import time
+from typing import Optional, Union, Dict, Any, Callable
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import (
     TimeoutException,
     NoSuchElementException,
@@ -10,6 +11,8 @@ from selenium.common.exceptions import (
 )
 from app.core.logger import logger
 from app.core.enums.element import LocatorStrategy
+from app.core.locator.wait_stats import WaitStatsRecorder
+from app.core.locator.profiler import LocatorProfiler
 
 class BaseLocator:
     """元素定位器基类"""
@@ -20,7 +23,9 @@ class BaseLocator:
         locator_type: Union[str, LocatorStrategy],
         locator_value: str,
         timeout: int = 10,
-        poll_frequency: float = 0.5
+        poll_frequency: float = 0.5,
+        min_poll_interval: float = 0.05,
+        poll_backoff: float = 2.0
     ):
         """
         初始化元素定位器
@@ -30,14 +35,29 @@ class BaseLocator:
             locator_type: 定位类型
             locator_value: 定位值
             timeout: 等待超时时间（秒）
-            poll_frequency: 轮询频率（秒）
+            poll_frequency: 最大轮询间隔（秒）
+            min_poll_interval: 初始轮询间隔（秒）
+            poll_backoff: 轮询间隔增长倍数
         """
         self.driver = driver
         self.locator_type = LocatorStrategy(locator_type) if isinstance(locator_type, str) else locator_type
         self.locator_value = locator_value
         self.timeout = timeout
         self.poll_frequency = poll_frequency
+        self.min_poll_interval = min_poll_interval
+        self.poll_backoff = poll_backoff
+        # 等待统计，由LocatorManager注入，提供历史出现耗时用于调节初始轮询间隔
+        self.wait_stats: Optional[WaitStatsRecorder] = None
+        # 最近一次等待的耗时、轮询次数和是否超时
+        self.last_wait: Dict[str, Any] = {}
+        # 性能分析器及所属项目，由LocatorManager注入
+        self.profiler: Optional[LocatorProfiler] = None
+        self.project_id: Optional[int] = None
         self._element = None
+        # 页面变化回调，由LocatorManager注入，用于使元素缓存失效
+        self.on_page_change: Optional[Callable[[], None]] = None
+        # 按定位器字典获取其他定位器（如拖放目标），由LocatorManager注入，与本定位器共用缓存、统计和页面变化回调
+        self.locator_resolver: Optional[Callable[[Dict[str, Any]], "BaseLocator"]] = None
         
     @property
     def by(self) -> By:
@@ -54,6 +74,93 @@ class BaseLocator:
         }
         return mapping.get(self.locator_type)
     
+    def resolve(self, locator_dict: Dict[str, Any]) -> "BaseLocator":
+        """
+        获取与本定位器属于同一管理器的另一个定位器
+        
+        Args:
+            locator_dict: 定位器字典，包含type和value
+            
+        Returns:
+            BaseLocator: 定位器实例，未由LocatorManager创建时返回独立的基础定位器
+        """
+        if self.locator_resolver:
+            return self.locator_resolver(locator_dict)
+        return BaseLocator(self.driver, locator_dict["type"], locator_dict["value"])
+    
+    def _notify_page_change(self) -> None:
+        """通知页面已发生变化"""
+        if self.on_page_change:
+            self.on_page_change()
+    
+    def _initial_poll_interval(self) -> float:
+        """
+        计算初始轮询间隔
+        
+        有历史出现耗时时，让元素出现前大约轮询四次；否则从最小间隔开始。
+        
+        Returns:
+            float: 初始轮询间隔（秒）
+        """
+        expected_latency = None
+        if self.wait_stats:
+            expected_latency = self.wait_stats.get_expected_latency(self._stats_key())
+        if expected_latency is None:
+            return self.min_poll_interval
+        return min(max(expected_latency / 4, self.min_poll_interval), self.poll_frequency)
+    
+    def _stats_key(self) -> str:
+        """获取统计键"""
+        return f"{self.locator_type.value}:{self.locator_value}"
+    
+    def _record_wait(
+        self,
+        started: float,
+        polls: int,
+        timed_out: bool,
+        last_miss: float = 0.0,
+        found_at: Optional[float] = None
+    ) -> None:
+        """
+        记录一次等待
+        
+        Args:
+            started: 开始等待的单调时钟时间
+            polls: 轮询次数
+            timed_out: 是否超时
+            last_miss: 最后一次未找到的轮询开始时距开始等待的时间（秒）
+            found_at: 找到元素的轮询开始时距开始等待的时间（秒）
+        """
+        self.last_wait = {
+            "elapsed": time.monotonic() - started,
+            "polls": polls,
+            "timed_out": timed_out,
+            "last_miss": last_miss,
+            "found_at": found_at
+        }
+        if self.wait_stats:
+            self.wait_stats.record(self._stats_key(), **self.last_wait)
+        self._profile("wait", started, "timeout" if timed_out else "found")
+    
+    def _profile(self, operation: str, started: float, outcome: str) -> None:
+        """
+        向性能分析器记录一次定位
+        
+        Args:
+            operation: 操作类型，find或wait
+            started: 开始定位的单调时钟时间
+            outcome: 结果，found、not_found或timeout
+        """
+        if self.profiler:
+            self.profiler.record(
+                self.project_id,
+                self.locator_type.value,
+                self.locator_value,
+                operation,
+                time.monotonic() - started,
+                outcome
+            )
+    
     def find_element(self) -> Any:
         """
         查找元素
@@ -64,15 +171,18 @@ class BaseLocator:
         Raises:
             NoSuchElementException: 元素未找到
         """
+        started = time.monotonic()
         try:
             if self.by:
                 element = self.driver.find_element(self.by, self.locator_value)
             else:
                 # 移动端特定的定位方式
                 element = self.driver.find_element(self.locator_type.value, self.locator_value)
+            self._profile("find", started, "found")
             self._element = element
             return element
         except NoSuchElementException as e:
+            self._profile("find", started, "not_found")
             logger.error(f"元素未找到: {self.locator_type.value}={self.locator_value}")
             raise
     
@@ -99,27 +209,43 @@ class BaseLocator:
             TimeoutException: 等待超时
         """
         timeout = timeout or self.timeout
-        wait = WebDriverWait(
-            self.driver,
-            timeout,
-            poll_frequency=self.poll_frequency,
-            ignored_exceptions=(StaleElementReferenceException,)
-        )
         
         conditions = {
-            "presence": EC.presence_of_element_located((self.by, self.locator_value)),
-            "visible": EC.visibility_of_element_located((self.by, self.locator_value)),
-            "clickable": EC.element_to_be_clickable((self.by, self.locator_value)),
-            "selected": EC.element_located_to_be_selected((self.by, self.locator_value))
+            "presence": EC.presence_of_element_located,
+            "visible": EC.visibility_of_element_located,
+            "clickable": EC.element_to_be_clickable,
+            "selected": EC.element_located_to_be_selected
         }
+        method = conditions.get(condition, conditions["presence"])((self.by, self.locator_value))
         
-        try:
-            element = wait.until(conditions.get(condition, conditions["presence"]))
-            self._element = element
-            return element
-        except TimeoutException as e:
-            logger.error(f"等待元素超时: {self.locator_type.value}={self.locator_value}, condition={condition}")
-            raise
+        # 先快速轮询，之后按倍数退避，直到poll_frequency上限
+        started = time.monotonic()
+        deadline = started + timeout
+        interval = self._initial_poll_interval()
+        polls = 0
+        last_miss = 0.0
+        while True:
+            polls += 1
+            polled_at = time.monotonic() - started
+            try:
+                element = method(self.driver)
+                if element:
+                    self._record_wait(started, polls, False, last_miss, polled_at)
+                    self._element = element
+                    return element
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            last_miss = polled_at
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.poll_backoff, self.poll_frequency)
+        
+        self._record_wait(started, polls, True)
+        logger.error(f"等待元素超时: {self.locator_type.value}={self.locator_value}, condition={condition}")
+        raise TimeoutException(f"等待元素超时: {self.locator_type.value}={self.locator_value}")
     
     def is_present(self) -> bool:
         """
@@ -212,6 +338,7 @@ class BaseLocator:
         try:
             element = self.wait_for_element(condition="clickable")
             element.click()
+            self._notify_page_change()
         except (ElementNotInteractableException, StaleElementReferenceException) as e:
             logger.error(f"点击元素失败: {self.locator_type.value}={self.locator_value}")
             raise
@@ -230,6 +357,7 @@ class BaseLocator:
             element = self.wait_for_element(condition="visible")
             element.clear()
             element.send_keys(text)
+            self._notify_page_change()
         except (ElementNotInteractableException, StaleElementReferenceException) as e:
             logger.error(f"输入文本失败: {self.locator_type.value}={self.locator_value}, text={text}")
             raise
@@ -244,6 +372,7 @@ class BaseLocator:
         try:
             element = self.wait_for_element(condition="visible")
             element.clear()
+            self._notify_page_change()
         except (ElementNotInteractableException, StaleElementReferenceException) as e:
             logger.error(f"清除文本失败: {self.locator_type.value}={self.locator_value}")
             raise
@@ -258,6 +387,7 @@ class BaseLocator:
         try:
             element = self.wait_for_element(condition="visible")
             element.submit()
+            self._notify_page_change()
         except (ElementNotInteractableException, StaleElementReferenceException) as e:
             logger.error(f"提交表单失败: {self.locator_type.value}={self.locator_value}")
             raise
@@ -288,10 +418,59 @@ class BaseLocator:
         try:
             element = self.find_element()
             self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+            self._notify_page_change()
         except (NoSuchElementException, StaleElementReferenceException) as e:
             logger.error(f"滚动到元素失败: {self.locator_type.value}={self.locator_value}")
             raise
     
+    def hover(self) -> None:
+        """
+        鼠标悬停在元素上
+        
+        Raises:
+            TimeoutException: 元素未出现
+        """
+        element = self.wait_for_element(condition="visible")
+        ActionChains(self.driver).move_to_element(element).perform()
+        self._notify_page_change()
+    
+    def double_click(self) -> None:
+        """
+        双击元素
+        
+        Raises:
+            TimeoutException: 元素不可点击
+        """
+        element = self.wait_for_element(condition="clickable")
+        ActionChains(self.driver).double_click(element).perform()
+        self._notify_page_change()
+    
+    def right_click(self) -> None:
+        """
+        右键点击元素
+        
+        Raises:
+            TimeoutException: 元素不可点击
+        """
+        element = self.wait_for_element(condition="clickable")
+        ActionChains(self.driver).context_click(element).perform()
+        self._notify_page_change()
+    
+    def drag_and_drop(self, target: "BaseLocator") -> None:
+        """
+        将元素拖放到目标元素上
+        
+        Args:
+            target: 目标元素的定位器
+            
+        Raises:
+            TimeoutException: 元素或目标元素未出现
+        """
+        element = self.wait_for_element(condition="visible")
+        target_element = target.wait_for_element(condition="visible")
+        ActionChains(self.driver).drag_and_drop(element, target_element).perform()
+        self._notify_page_change()
+    
     def take_screenshot(self, filename: str) -> bool:
         """
         对元素进行截图
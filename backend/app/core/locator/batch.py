@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Tuple
+from app.core.enums.element import LocatorStrategy
+
+# 一次 execute_script 调用中依次解析多个定位器，找不到的位置返回 null
+BATCH_FIND_SCRIPT = """
+var specs = arguments[0], out = [];
+for (var i = 0; i < specs.length; i++) {
+    var type = specs[i][0], value = specs[i][1], el = null;
+    try {
+        if (type === 'xpath') {
+            el = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else if (type === 'css_selector') {
+            el = document.querySelector(value);
+        } else if (type === 'id') {
+            el = document.getElementById(value);
+        } else if (type === 'name') {
+            el = document.getElementsByName(value)[0] || null;
+        } else if (type === 'class_name') {
+            el = document.getElementsByClassName(value)[0] || null;
+        } else if (type === 'tag_name') {
+            el = document.getElementsByTagName(value)[0] || null;
+        } else if (type === 'link_text' || type === 'partial_link_text') {
+            var links = document.getElementsByTagName('a');
+            for (var j = 0; j < links.length; j++) {
+                var text = links[j].textContent.trim();
+                if (type === 'link_text' ? text === value : text.indexOf(value) !== -1) {
+                    el = links[j];
+                    break;
+                }
+            }
+        }
+    } catch (e) {
+        el = null;
+    }
+    out.push(el);
+}
+return out;
+"""
+
+# 批量脚本支持的定位方式，其余方式（移动端专用）需要逐个查找
+BATCH_SCRIPT_STRATEGIES = {
+    LocatorStrategy.XPATH,
+    LocatorStrategy.CSS_SELECTOR,
+    LocatorStrategy.ID,
+    LocatorStrategy.NAME,
+    LocatorStrategy.CLASS_NAME,
+    LocatorStrategy.TAG_NAME,
+    LocatorStrategy.LINK_TEXT,
+    LocatorStrategy.PARTIAL_LINK_TEXT,
+}
+
+def build_batch_specs(locators: List[Tuple[LocatorStrategy, str]]) -> List[List[str]]:
+    """
+    生成批量查找脚本的参数
+    
+    Args:
+        locators: (定位类型, 定位值) 列表
+    
+    Returns:
+        List[List[str]]: 脚本参数
+    """
+    return [[locator_type.value, locator_value] for locator_type, locator_value in locators]
+
+def is_mobile_driver(driver: Any) -> bool:
+    """
+    判断驱动是否为移动端会话
+    
+    Args:
+        driver: WebDriver实例
+    
+    Returns:
+        bool: 是否为Android/iOS会话
+    """
+    capabilities: Dict[str, Any] = getattr(driver, "capabilities", None) or {}
+    platform = str(capabilities.get("platformName", "")).lower()
+    return platform in ("android", "ios") 
\ No newline at end of file
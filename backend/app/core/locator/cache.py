@@ -1,20 +1,40 @@
+import time
+from collections import OrderedDict
 from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
 from app.core.logger import logger
 from app.core.locator.base import BaseLocator
+from app.core.locator.staleness import StalenessStrategy, PageGenerationStaleness
 
 class LocatorCache:
-    """定位器缓存类"""
+    """定位器缓存类（LRU + TTL）"""
     
-    def __init__(self, ttl: int = 300):
+    def __init__(
+        self,
+        ttl: int = 300,
+        max_size: int = 1000,
+        staleness: Optional[StalenessStrategy] = None
+    ):
         """
         初始化定位器缓存
         
         Args:
             ttl: 缓存生存时间（秒）
+            max_size: 最大缓存条目数，超出后按LRU淘汰
+            staleness: 元素失效判定策略，默认按页面代数判定，命中时不访问驱动；
+                页面会在定位器之外变化（返回、页面异步刷新）时可改用指纹或探测策略
         """
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        # 按访问顺序排列，队首为最久未使用的条目
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 按写入顺序排列，TTL统一，因此队首总是最先过期的条目
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
         self._ttl = ttl
+        self._max_size = max_size
+        self.staleness = staleness or PageGenerationStaleness()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._stale_rejections = 0
     
     def _get_cache_key(self, locator: BaseLocator) -> str:
         """
@@ -22,42 +42,62 @@ class LocatorCache:
         
         Args:
             locator: 定位器实例
-            
+        
         Returns:
             str: 缓存键
         """
         return f"{locator.locator_type.value}:{locator.locator_value}"
     
+    def _delete(self, cache_key: str) -> None:
+        """删除缓存条目"""
+        self._cache.pop(cache_key, None)
+        self._expiry.pop(cache_key, None)
+    
+    def _purge_expired(self, now: float) -> None:
+        """
+        清理已过期的条目
+        
+        Args:
+            now: 当前单调时钟时间
+        """
+        while self._expiry:
+            cache_key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._delete(cache_key)
+            self._expirations += 1
+    
     def get(self, locator: BaseLocator) -> Optional[Any]:
         """
         获取缓存的元素
         
         Args:
             locator: 定位器实例
-            
+        
         Returns:
             Optional[Any]: 缓存的元素，如果不存在或已过期则返回None
         """
+        self._purge_expired(time.monotonic())
+        
         cache_key = self._get_cache_key(locator)
         cache_data = self._cache.get(cache_key)
         
         if not cache_data:
+            self._misses += 1
             return None
         
-        # 检查缓存是否过期
-        if datetime.now() - cache_data["timestamp"] > timedelta(seconds=self._ttl):
-            del self._cache[cache_key]
-            return None
-        
-        try:
-            # 检查元素是否仍然有效
-            element = cache_data["element"]
-            element.is_enabled()  # 尝试访问元素属性
-            return element
-        except Exception:
+        # 检查元素是否仍然有效
+        element = cache_data["element"]
+        if not self.staleness.is_fresh(element, cache_data["stamp"]):
             # 如果元素无效，删除缓存
-            del self._cache[cache_key]
+            self._delete(cache_key)
+            self._stale_rejections += 1
+            self._misses += 1
             return None
+        
+        self._cache.move_to_end(cache_key)
+        self._hits += 1
+        return element
     
     def set(self, locator: BaseLocator, element: Any) -> None:
         """
@@ -67,16 +107,35 @@ class LocatorCache:
             locator: 定位器实例
             element: 要缓存的元素
         """
+        now = time.monotonic()
+        self._purge_expired(now)
+        
         cache_key = self._get_cache_key(locator)
         self._cache[cache_key] = {
             "element": element,
-            "timestamp": datetime.now()
+            "timestamp": now,
+            "stamp": self.staleness.stamp(element)
         }
+        self._cache.move_to_end(cache_key)
+        self._expiry[cache_key] = now + self._ttl
+        self._expiry.move_to_end(cache_key)
+        
+        while len(self._cache) > self._max_size:
+            evicted_key, _ = self._cache.popitem(last=False)
+            self._expiry.pop(evicted_key, None)
+            self._evictions += 1
+            logger.debug(f"淘汰缓存元素: {evicted_key}")
+        
         logger.debug(f"缓存元素: {cache_key}")
     
+    def invalidate(self) -> None:
+        """页面发生变化，使已缓存的元素全部失效"""
+        self.staleness.bump()
+    
     def clear(self) -> None:
         """清空缓存"""
         self._cache.clear()
+        self._expiry.clear()
         logger.debug("清空元素缓存")
     
     def remove(self, locator: BaseLocator) -> None:
@@ -88,7 +147,7 @@ class LocatorCache:
         """
         cache_key = self._get_cache_key(locator)
         if cache_key in self._cache:
-            del self._cache[cache_key]
+            self._delete(cache_key)
             logger.debug(f"移除缓存元素: {cache_key}")
     
     def get_cache_size(self) -> int:
@@ -100,6 +159,14 @@ class LocatorCache:
         """
         return len(self._cache)
     
+    def reset_stats(self) -> None:
+        """重置命中统计"""
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._stale_rejections = 0
+    
     def get_cache_info(self) -> Dict[str, Any]:
         """
         获取缓存信息
@@ -107,8 +174,17 @@ class LocatorCache:
         Returns:
             Dict[str, Any]: 缓存信息
         """
+        lookups = self._hits + self._misses
         return {
             "size": len(self._cache),
+            "max_size": self._max_size,
             "ttl": self._ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "stale_rejections": self._stale_rejections,
+            "staleness": self.staleness.get_stats(),
             "keys": list(self._cache.keys())
         } 
\ No newline at end of file
@@ -1,23 +1,69 @@
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Callable
+from selenium.common.exceptions import NoSuchElementException
 from app.core.logger import logger
 from app.core.locator.base import BaseLocator
 from app.core.locator.factory import LocatorFactory
 from app.core.locator.cache import LocatorCache
+from app.core.locator.staleness import create_staleness_strategy
+from app.core.locator.snapshot import SnapshotManager, SnapshotLocator, SnapshotMiss
+from app.core.locator.wait_stats import WaitStatsRecorder
+from app.core.locator.profiler import LocatorProfiler, locator_profiler
+from app.core.locator.batch import (
+    BATCH_FIND_SCRIPT,
+    BATCH_SCRIPT_STRATEGIES,
+    build_batch_specs,
+    is_mobile_driver
+)
 from app.core.enums.element import LocatorStrategy
 
 class LocatorManager:
     """定位器管理类"""
     
-    def __init__(self, driver: Any, cache_ttl: int = 300):
+    def __init__(
+        self,
+        driver: Any,
+        cache_ttl: int = 300,
+        cache_max_size: int = 1000,
+        staleness: Optional[str] = None,
+        snapshot_mode: bool = False,
+        snapshot_source: Optional[Callable[[], str]] = None,
+        profiler: Optional[LocatorProfiler] = None,
+        project_id: Optional[int] = None
+    ):
         """
         初始化定位器管理器
         
         Args:
             driver: WebDriver实例
             cache_ttl: 缓存生存时间（秒）
+            cache_max_size: 缓存最大条目数
+            staleness: 缓存失效判定策略，为空时Web会话使用generation，移动端会话使用fingerprint，可选值：
+                - generation: 点击、输入、跳转等操作后失效，命中时不访问驱动
+                - fingerprint: 操作后失效，并定期比对页面源码指纹，感知应用自身引起的页面变化
+                - probe: 操作后失效，其余每次命中访问一次元素，结果最准确但每次命中多一次往返
+            snapshot_mode: 是否启用快照模式，启用后只读查询在本地解析的页面快照上求值
+            snapshot_source: 获取页面快照源码的函数，默认读取driver.page_source，
+                uiautomator2设备可传入dump_hierarchy
+            profiler: 定位器性能分析器，默认使用进程级分析器
+            project_id: 所属项目ID，用于按项目汇总定位耗时
         """
         self.driver = driver
-        self.cache = LocatorCache(ttl=cache_ttl)
+        self.cache = LocatorCache(
+            ttl=cache_ttl,
+            max_size=cache_max_size,
+            staleness=create_staleness_strategy(
+                staleness or ("fingerprint" if is_mobile_driver(driver) else "generation"),
+                driver
+            )
+        )
+        self.snapshot_mode = snapshot_mode
+        self.snapshot = SnapshotManager(
+            snapshot_source or (lambda: self.driver.page_source),
+            lambda: self.cache.staleness.generation
+        )
+        self.wait_stats = WaitStatsRecorder()
+        self.profiler = profiler or locator_profiler
+        self.project_id = project_id
         self._locators: Dict[str, BaseLocator] = {}
     
     def create_locator(
@@ -43,9 +89,33 @@ class LocatorManager:
             locator_value,
             **kwargs
         )
+        locator.on_page_change = self.notify_page_change
+        locator.locator_resolver = self.create_locator_from_dict
+        locator.wait_stats = self.wait_stats
+        locator.profiler = self.profiler
+        locator.project_id = self.project_id
         self._locators[f"{locator_type.value}:{locator_value}"] = locator
         return locator
     
+    def create_locator_from_dict(self, locator_dict: Dict[str, Any]) -> BaseLocator:
+        """
+        根据字典创建定位器
+        
+        Args:
+            locator_dict: 定位器字典，包含type和value，其余字段作为定位器参数
+            
+        Returns:
+            BaseLocator: 定位器实例
+        """
+        options = dict(locator_dict)
+        locator_type = LocatorStrategy(options.pop("type"))
+        locator_value = options.pop("value")
+        return self.get_locator(locator_type, locator_value) or self.create_locator(
+            locator_type,
+            locator_value,
+            **options
+        )
+    
     def get_locator(
         self,
         locator_type: LocatorStrategy,
@@ -89,6 +159,7 @@ class LocatorManager:
         if use_cache:
             cached_element = self.cache.get(locator)
             if cached_element:
+                self._profile_cache_hit(locator)
                 return cached_element
         
         element = locator.find_element()
@@ -127,6 +198,7 @@ class LocatorManager:
         if use_cache:
             cached_element = self.cache.get(locator)
             if cached_element:
+                self._profile_cache_hit(locator)
                 return cached_element
         
         element = locator.wait_for_element(condition, timeout)
@@ -135,6 +207,192 @@ class LocatorManager:
         
         return element
     
+    def _profile_cache_hit(self, locator: BaseLocator) -> None:
+        """记录一次缓存命中"""
+        self.profiler.record(
+            self.project_id,
+            locator.locator_type.value,
+            locator.locator_value,
+            "cache_hit",
+            0.0
+        )
+    
+    def set_project(self, project_id: Optional[int]) -> None:
+        """
+        设置所属项目，之后的定位耗时按该项目汇总
+        
+        Args:
+            project_id: 项目ID
+        """
+        self.project_id = project_id
+        for locator in self._locators.values():
+            locator.project_id = project_id
+    
+    def get_locator_stats(self, limit: int = 10) -> Dict[str, Any]:
+        """
+        获取当前项目的定位器性能统计
+        
+        Args:
+            limit: 慢定位器排行数量
+        
+        Returns:
+            Dict[str, Any]: 定位器性能统计
+        """
+        return self.profiler.get_stats(self.project_id, limit)
+    
+    def notify_page_change(self) -> None:
+        """通知页面已发生变化（点击、输入、跳转等），使缓存的元素失效"""
+        self.cache.invalidate()
+    
+    def navigate(self, url: str) -> None:
+        """
+        打开页面
+        
+        Args:
+            url: 页面地址
+        """
+        self.driver.get(url)
+        self.notify_page_change()
+    
+    def get_snapshot_locator(
+        self,
+        locator_type: LocatorStrategy,
+        locator_value: str
+    ) -> Optional[SnapshotLocator]:
+        """
+        获取基于页面快照的只读定位器
+        
+        Args:
+            locator_type: 定位类型
+            locator_value: 定位值
+            
+        Returns:
+            Optional[SnapshotLocator]: 快照定位器，未启用快照模式或无法本地求值时返回None
+        """
+        if not self.snapshot_mode:
+            return None
+        return self.snapshot.get_locator(locator_type, locator_value)
+    
+    def invalidate_snapshot(self) -> None:
+        """使当前页面快照失效"""
+        self.snapshot.invalidate()
+    
+    def get_snapshot_stats(self) -> Dict[str, Any]:
+        """
+        获取快照统计
+        
+        Returns:
+            Dict[str, Any]: 快照统计信息
+        """
+        return self.snapshot.get_stats()
+    
+    def find_elements_batch(
+        self,
+        locators: List[Dict[str, Any]],
+        use_cache: bool = True
+    ) -> List[Optional[Any]]:
+        """
+        批量查找元素
+        
+        Web端通过一次execute_script解析所有定位器；移动端截取一次页面层级，
+        在本地求值后返回只读的快照元素。无法批量解析的定位器逐个在线查找。
+        
+        Args:
+            locators: 定位器字典列表，格式同create_locator_from_dict
+            use_cache: 是否使用缓存
+            
+        Returns:
+            List[Optional[Any]]: 与locators一一对应的元素，未找到的位置为None
+        """
+        results: List[Optional[Any]] = [None] * len(locators)
+        pending = []
+        for index, locator_dict in enumerate(locators):
+            locator = self.create_locator_from_dict(locator_dict)
+            cached_element = self.cache.get(locator) if use_cache else None
+            if cached_element:
+                results[index] = cached_element
+            else:
+                pending.append((index, locator))
+        
+        if not pending:
+            return results
+        
+        if is_mobile_driver(self.driver):
+            remaining = self._resolve_batch_from_snapshot(pending, results)
+        else:
+            remaining = self._resolve_batch_by_script(pending, results, use_cache)
+        
+        for index, locator in remaining:
+            try:
+                results[index] = locator.find_element()
+            except NoSuchElementException:
+                continue
+            if use_cache:
+                self.cache.set(locator, results[index])
+        
+        return results
+    
+    def _resolve_batch_by_script(
+        self,
+        pending: List[Any],
+        results: List[Optional[Any]],
+        use_cache: bool
+    ) -> List[Any]:
+        """
+        通过一次脚本调用解析Web定位器
+        
+        Args:
+            pending: 待解析的(索引, 定位器)列表
+            results: 结果列表
+            use_cache: 是否缓存找到的元素
+            
+        Returns:
+            List[Any]: 脚本无法处理、需要逐个查找的(索引, 定位器)列表
+        """
+        scripted = [item for item in pending if item[1].locator_type in BATCH_SCRIPT_STRATEGIES]
+        remaining = [item for item in pending if item[1].locator_type not in BATCH_SCRIPT_STRATEGIES]
+        if not scripted:
+            return remaining
+        
+        specs = build_batch_specs([(locator.locator_type, locator.locator_value) for _, locator in scripted])
+        elements = self.driver.execute_script(BATCH_FIND_SCRIPT, specs) or []
+        for (index, locator), element in zip(scripted, elements):
+            if element is None:
+                continue
+            results[index] = element
+            if use_cache:
+                self.cache.set(locator, element)
+        return remaining
+    
+    def _resolve_batch_from_snapshot(
+        self,
+        pending: List[Any],
+        results: List[Optional[Any]]
+    ) -> List[Any]:
+        """
+        在一次页面层级快照上解析移动端定位器
+        
+        Args:
+            pending: 待解析的(索引, 定位器)列表
+            results: 结果列表
+            
+        Returns:
+            List[Any]: 快照无法处理、需要逐个查找的(索引, 定位器)列表
+        """
+        snapshot = self.snapshot.get_snapshot()
+        if not snapshot:
+            return pending
+        
+        remaining = []
+        for index, locator in pending:
+            try:
+                matches = snapshot.find_all(locator.locator_type, locator.locator_value)
+            except SnapshotMiss:
+                remaining.append((index, locator))
+                continue
+            results[index] = matches[0] if matches else None
+        return remaining
+    
     def clear_cache(self) -> None:
         """清空缓存"""
         self.cache.clear()
@@ -164,6 +422,19 @@ class LocatorManager:
         """
         return self.cache.get_cache_info()
     
+    def get_wait_stats(self) -> Dict[str, Any]:
+        """
+        获取等待统计，包括自适应轮询相对固定间隔轮询节省的时间和轮询次数
+        
+        Returns:
+            Dict[str, Any]: 等待统计
+        """
+        return self.wait_stats.get_stats()
+    
+    def reset_wait_stats(self) -> None:
+        """清空等待计数，保留历史出现耗时"""
+        self.wait_stats.reset()
+    
     def get_all_locators(self) -> List[BaseLocator]:
         """
         获取所有定位器
@@ -176,4 +447,43 @@ class LocatorManager:
     def clear_locators(self) -> None:
         """清空所有定位器"""
         self._locators.clear()
-        self.clear_cache() 
\ No newline at end of file
+        self.clear_cache()
+        self.invalidate_snapshot()
+
+def benchmark(steps: int = 200, lookups_per_step: int = 3, action_every: int = 2) -> Dict[str, Any]:
+    """
+    对比各失效判定策略每个步骤的驱动往返次数
+    
+    每个步骤查找若干元素，每隔若干步骤执行一次会改变页面的操作，
+    驱动调用在模拟驱动上计数，不产生真实延迟。
+    
+    Args:
+        steps: 模拟的步骤数
+        lookups_per_step: 每个步骤查找的元素数
+        action_every: 每隔多少步骤页面变化一次
+    
+    Returns:
+        Dict[str, Any]: 各策略每步的往返次数及相对probe节省的往返次数
+    """
+    from app.core.simulated_driver import SimulatedDriver, SimulationProfile
+    
+    results: Dict[str, Any] = {}
+    for strategy in ("probe", "generation", "fingerprint"):
+        driver = SimulatedDriver(SimulationProfile(latency=0.0))
+        manager = LocatorManager(driver, staleness=strategy)
+        for step in range(steps):
+            for index in range(lookups_per_step):
+                manager.find_element(LocatorStrategy.ID, f"field_{index}")
+            if step % action_every == action_every - 1:
+                manager.notify_page_change()
+        results[strategy] = {
+            "round_trips_per_step": round(driver.backend.get_stats()["calls"] / steps, 3),
+            "hit_rate": manager.get_cache_info()["hit_rate"]
+        }
+    probe = results["probe"]["round_trips_per_step"]
+    for item in results.values():
+        item["saved_round_trips_per_step"] = round(probe - item["round_trips_per_step"], 3)
+    return {"steps": steps, "lookups_per_step": lookups_per_step, "action_every": action_every, "strategies": results}
+
+if __name__ == "__main__":
+    print(benchmark())
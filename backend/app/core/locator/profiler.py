@@ -0,0 +1,226 @@
+import bisect
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+# 延迟直方图桶上界（秒），最后一个桶收集超过10秒的记录
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class LocatorProfile:
+    """单个定位器的性能画像"""
+    
+    def __init__(self, project_id: Optional[int], strategy: str, value: str):
+        """
+        初始化定位器画像
+        
+        Args:
+            project_id: 所属项目ID
+            strategy: 定位类型
+            value: 定位值
+        """
+        self.project_id = project_id
+        self.strategy = strategy
+        self.value = value
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.timeouts = 0
+        self.not_found = 0
+        self.cache_hits = 0
+        self.operations: Dict[str, int] = {}
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def record(self, operation: str, elapsed: float, outcome: str) -> None:
+        """
+        记录一次定位
+        
+        Args:
+            operation: 操作类型，find、wait或cache_hit
+            elapsed: 耗时（秒）
+            outcome: 结果，found、not_found或timeout
+        """
+        self.operations[operation] = self.operations.get(operation, 0) + 1
+        if operation == "cache_hit":
+            self.cache_hits += 1
+            return
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        if outcome == "timeout":
+            self.timeouts += 1
+        elif outcome == "not_found":
+            self.not_found += 1
+    
+    def percentile(self, ratio: float) -> Optional[float]:
+        """
+        根据直方图估算分位数（取所在桶的上界）
+        
+        Args:
+            ratio: 分位比例，例如0.95
+        
+        Returns:
+            Optional[float]: 分位耗时（秒），没有记录时返回None
+        """
+        if not self.calls:
+            return None
+        target = ratio * self.calls
+        cumulative = 0
+        for index, count in enumerate(self.histogram):
+            cumulative += count
+            if cumulative >= target:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max_time
+        return self.max_time
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典
+        
+        Returns:
+            Dict[str, Any]: 画像信息
+        """
+        return {
+            "project_id": self.project_id,
+            "strategy": self.strategy,
+            "value": self.value,
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "operations": dict(self.operations),
+            "total_time": round(self.total_time, 4),
+            "avg_time": round(self.total_time / self.calls, 4) if self.calls else 0.0,
+            "p95_time": self.percentile(0.95),
+            "max_time": round(self.max_time, 4),
+            "timeouts": self.timeouts,
+            "not_found": self.not_found,
+            "histogram": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, self.histogram)},
+                "gt_10.0": self.histogram[-1]
+            }
+        }
+
+class LocatorProfiler:
+    """定位器性能分析器，按项目和定位器汇总定位耗时"""
+    
+    def __init__(self, max_size: int = 5000):
+        """
+        初始化定位器性能分析器
+        
+        Args:
+            max_size: 最多保留的定位器画像数，超出后按LRU淘汰，
+                避免包含动态文本或序号的定位器使画像无限增长
+        """
+        # 按记录顺序排列，队首为最久未记录的画像
+        self._profiles: "OrderedDict[Tuple[Optional[int], str, str], LocatorProfile]" = OrderedDict()
+        self._max_size = max_size
+        self._evictions = 0
+        self._lock = threading.Lock()
+    
+    def record(
+        self,
+        project_id: Optional[int],
+        strategy: str,
+        value: str,
+        operation: str,
+        elapsed: float,
+        outcome: str = "found"
+    ) -> None:
+        """
+        记录一次定位
+        
+        Args:
+            project_id: 所属项目ID
+            strategy: 定位类型
+            value: 定位值
+            operation: 操作类型，find、wait或cache_hit
+            elapsed: 耗时（秒）
+            outcome: 结果，found、not_found或timeout
+        """
+        key = (project_id, strategy, value)
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = LocatorProfile(project_id, strategy, value)
+                while len(self._profiles) > self._max_size:
+                    self._profiles.popitem(last=False)
+                    self._evictions += 1
+            else:
+                self._profiles.move_to_end(key)
+            profile.record(operation, elapsed, outcome)
+    
+    def _select(self, project_id: Optional[int]) -> List[LocatorProfile]:
+        """获取指定项目的画像，project_id为None时返回全部"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        if project_id is None:
+            return profiles
+        return [profile for profile in profiles if profile.project_id == project_id]
+    
+    def get_slow_locators(self, project_id: Optional[int] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        获取最慢的定位器排行，按累计耗时降序
+        
+        Args:
+            project_id: 项目ID，为None时统计全部项目
+            limit: 返回数量
+        
+        Returns:
+            List[Dict[str, Any]]: 定位器画像列表
+        """
+        profiles = sorted(
+            (profile for profile in self._select(project_id) if profile.calls),
+            key=lambda profile: (profile.total_time, profile.max_time),
+            reverse=True
+        )
+        return [profile.to_dict() for profile in profiles[:limit]]
+    
+    def get_stats(self, project_id: Optional[int] = None, limit: int = 10) -> Dict[str, Any]:
+        """
+        获取统计汇总
+        
+        Args:
+            project_id: 项目ID，为None时统计全部项目
+            limit: 慢定位器排行数量
+        
+        Returns:
+            Dict[str, Any]: 汇总、按定位类型的统计及慢定位器排行
+        """
+        profiles = self._select(project_id)
+        strategies: Dict[str, Dict[str, Any]] = {}
+        for profile in profiles:
+            item = strategies.setdefault(
+                profile.strategy,
+                {"locators": 0, "calls": 0, "total_time": 0.0, "timeouts": 0}
+            )
+            item["locators"] += 1
+            item["calls"] += profile.calls
+            item["total_time"] = round(item["total_time"] + profile.total_time, 4)
+            item["timeouts"] += profile.timeouts
+        return {
+            "project_id": project_id,
+            "locators": len(profiles),
+            "calls": sum(profile.calls for profile in profiles),
+            "cache_hits": sum(profile.cache_hits for profile in profiles),
+            "total_time": round(sum(profile.total_time for profile in profiles), 4),
+            "timeouts": sum(profile.timeouts for profile in profiles),
+            "evictions": self._evictions,
+            "strategies": strategies,
+            "slow_locators": self.get_slow_locators(project_id, limit)
+        }
+    
+    def reset(self, project_id: Optional[int] = None) -> None:
+        """
+        清空统计
+        
+        Args:
+            project_id: 项目ID，为None时清空全部
+        """
+        with self._lock:
+            if project_id is None:
+                self._profiles.clear()
+                return
+            for key in [key for key in self._profiles if key[0] == project_id]:
+                del self._profiles[key]
+
+# 进程级定位器性能分析器，供执行引擎记录、接口查询
+locator_profiler = LocatorProfiler(max_size=settings.LOCATOR_PROFILE_MAX_SIZE) 
\ No newline at end of file
@@ -0,0 +1,338 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+from lxml import etree, html
+from app.core.logger import logger
+from app.core.enums.element import LocatorStrategy
+
+try:
+    from lxml.cssselect import CSSSelector
+except ImportError:  # cssselect 未安装时 CSS 定位回退到在线查找
+    CSSSelector = None
+
+class SnapshotMiss(Exception):
+    """快照无法回答该查询，需要回退到在线查找"""
+    pass
+
+def xpath_literal(value: str) -> str:
+    """
+    将字符串转换为XPath字面量
+    
+    Args:
+        value: 原始字符串
+    
+    Returns:
+        str: XPath字面量
+    """
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+class SnapshotElement:
+    """快照中的只读元素"""
+    
+    def __init__(self, node: Any, platform: str):
+        """
+        初始化快照元素
+        
+        Args:
+            node: lxml节点
+            platform: 页面来源平台，android、ios或web
+        """
+        self.node = node
+        self.platform = platform
+    
+    def _flag(self, android_attr: str, ios_attr: str) -> bool:
+        """读取移动端布尔属性，Web页面源码中没有这类状态"""
+        if self.platform == "android":
+            value = self.node.get(android_attr)
+        elif self.platform == "ios":
+            value = self.node.get(ios_attr)
+        else:
+            value = None
+        if value is None:
+            raise SnapshotMiss(f"快照不包含属性: {android_attr}")
+        return value == "true"
+    
+    @property
+    def text(self) -> str:
+        """元素文本"""
+        if self.platform == "android":
+            return self.node.get("text") or ""
+        if self.platform == "ios":
+            return self.node.get("label") or self.node.get("value") or ""
+        return self.node.text_content().strip()
+    
+    def get_attribute(self, name: str) -> Optional[str]:
+        """获取属性值"""
+        return self.node.get(name)
+    
+    def is_displayed(self) -> bool:
+        """检查元素是否可见"""
+        return self._flag("displayed", "visible")
+    
+    def is_enabled(self) -> bool:
+        """检查元素是否可用"""
+        return self._flag("enabled", "enabled")
+    
+    def is_selected(self) -> bool:
+        """检查元素是否被选中"""
+        return self._flag("selected", "selected")
+
+class PageSnapshot:
+    """页面快照，在本地解析后的元素树上求值定位器"""
+    
+    def __init__(self, source: str, generation: int = 0):
+        """
+        初始化页面快照
+        
+        Args:
+            source: 页面源码或dump_hierarchy结果
+            generation: 截取快照时的页面代数
+        """
+        self.generation = generation
+        self.captured_at = time.monotonic()
+        self.platform, self.root = self._parse(source)
+    
+    @staticmethod
+    def _parse(source: str):
+        """解析页面源码，返回平台和根节点"""
+        data = source.encode("utf-8") if isinstance(source, str) else source
+        head = data.lstrip()[:200]
+        if head.startswith(b"<?xml") or head.startswith(b"<hierarchy") or head.startswith(b"<AppiumAUT"):
+            root = etree.fromstring(data, parser=etree.XMLParser(recover=True, huge_tree=True))
+            # 按根元素判断平台，带XML声明的XHTML页面仍按Web解析
+            tag = etree.QName(root).localname if root is not None else ""
+            if tag == "hierarchy":
+                return "android", root
+            if tag == "AppiumAUT" or tag.startswith("XCUIElementType"):
+                return "ios", root
+        return "web", html.document_fromstring(data)
+    
+    def _to_xpath(self, locator_type: LocatorStrategy, value: str) -> Optional[str]:
+        """
+        将定位器转换为XPath表达式
+        
+        Args:
+            locator_type: 定位类型
+            value: 定位值
+        
+        Returns:
+            Optional[str]: XPath表达式，不支持的定位方式返回None
+        """
+        literal = xpath_literal(value)
+        if locator_type == LocatorStrategy.XPATH:
+            return value
+        if locator_type == LocatorStrategy.CSS_SELECTOR:
+            if self.platform != "web" or CSSSelector is None:
+                return None
+            return CSSSelector(value).path
+        if locator_type == LocatorStrategy.ID:
+            if self.platform == "android":
+                return f"//*[@resource-id={literal} or substring-after(@resource-id, ':id/')={literal}]"
+            if self.platform == "ios":
+                return f"//*[@name={literal}]"
+            return f"//*[@id={literal}]"
+        if locator_type == LocatorStrategy.ACCESSIBILITY_ID:
+            if self.platform == "android":
+                return f"//*[@content-desc={literal}]"
+            if self.platform == "ios":
+                return f"//*[@name={literal}]"
+            return None
+        if locator_type == LocatorStrategy.CLASS_NAME:
+            if self.platform == "android":
+                return f"//*[@class={literal}]"
+            if self.platform == "ios":
+                return f"//*[@type={literal}]"
+            return f"//*[contains(concat(' ', normalize-space(@class), ' '), concat(' ', {literal}, ' '))]"
+        if self.platform != "web":
+            return None
+        if locator_type == LocatorStrategy.NAME:
+            return f"//*[@name={literal}]"
+        if locator_type == LocatorStrategy.TAG_NAME:
+            return f"//{value}"
+        if locator_type == LocatorStrategy.LINK_TEXT:
+            return f"//a[normalize-space(.)={literal}]"
+        if locator_type == LocatorStrategy.PARTIAL_LINK_TEXT:
+            return f"//a[contains(., {literal})]"
+        return None
+    
+    def find_all(self, locator_type: LocatorStrategy, value: str) -> List[SnapshotElement]:
+        """
+        在快照中查找所有匹配的元素
+        
+        Args:
+            locator_type: 定位类型
+            value: 定位值
+        
+        Returns:
+            List[SnapshotElement]: 匹配的元素列表
+        
+        Raises:
+            SnapshotMiss: 定位方式不支持本地求值
+        """
+        expression = self._to_xpath(locator_type, value)
+        if not expression:
+            raise SnapshotMiss(f"快照不支持的定位方式: {locator_type.value}")
+        try:
+            nodes = self.root.xpath(expression)
+        except etree.XPathError as e:
+            raise SnapshotMiss(f"快照XPath求值失败: {str(e)}")
+        return [
+            SnapshotElement(node, self.platform)
+            for node in nodes
+            if isinstance(node, etree._Element)
+        ]
+
+class SnapshotLocator:
+    """基于快照的只读定位器视图，接口与BaseLocator的查询方法一致"""
+    
+    def __init__(self, snapshot: PageSnapshot, locator_type: LocatorStrategy, locator_value: str):
+        """
+        初始化快照定位器
+        
+        Args:
+            snapshot: 页面快照
+            locator_type: 定位类型
+            locator_value: 定位值
+        """
+        self.locator_type = locator_type
+        self.locator_value = locator_value
+        self._matches = snapshot.find_all(locator_type, locator_value)
+    
+    def find_element(self) -> SnapshotElement:
+        """查找元素"""
+        # 快照中找不到时元素可能尚未渲染，交给在线查找去等待
+        if not self._matches:
+            raise SnapshotMiss(f"快照中未找到元素: {self.locator_type.value}={self.locator_value}")
+        return self._matches[0]
+    
+    def is_present(self) -> bool:
+        """检查元素是否存在"""
+        return self.find_element() is not None
+    
+    def is_visible(self) -> bool:
+        """检查元素是否可见"""
+        return self.find_element().is_displayed()
+    
+    def is_enabled(self) -> bool:
+        """检查元素是否可用"""
+        return self.find_element().is_enabled()
+    
+    def is_selected(self) -> bool:
+        """检查元素是否被选中"""
+        return self.find_element().is_selected()
+    
+    def get_text(self) -> str:
+        """获取元素文本"""
+        return self.find_element().text
+    
+    def get_attribute(self, name: str) -> Optional[str]:
+        """获取属性值"""
+        return self.find_element().get_attribute(name)
+    
+    def get_count(self) -> int:
+        """获取匹配元素数量"""
+        self.find_element()
+        return len(self._matches)
+    
+    def get_css_property(self, name: str) -> str:
+        """获取CSS属性值"""
+        raise SnapshotMiss("快照不包含计算样式")
+
+class SnapshotManager:
+    """页面快照管理：每屏截取一次，页面变化后失效"""
+    
+    def __init__(
+        self,
+        source_provider: Callable[[], str],
+        generation_provider: Callable[[], int],
+        max_age: float = 30.0
+    ):
+        """
+        初始化快照管理器
+        
+        Args:
+            source_provider: 获取页面源码的函数（page_source或dump_hierarchy）
+            generation_provider: 获取当前页面代数的函数
+            max_age: 快照最长有效时间（秒）
+        """
+        self._source_provider = source_provider
+        self._generation_provider = generation_provider
+        self.max_age = max_age
+        self._snapshot: Optional[PageSnapshot] = None
+        self._captures = 0
+        self._hits = 0
+        self._fallbacks = 0
+    
+    def invalidate(self) -> None:
+        """使当前快照失效"""
+        self._snapshot = None
+    
+    def get_snapshot(self) -> Optional[PageSnapshot]:
+        """
+        获取当前有效快照，失效时重新截取
+        
+        Returns:
+            Optional[PageSnapshot]: 页面快照，截取失败返回None
+        """
+        generation = self._generation_provider()
+        snapshot = self._snapshot
+        if (
+            snapshot is None
+            or snapshot.generation != generation
+            or time.monotonic() - snapshot.captured_at > self.max_age
+        ):
+            try:
+                snapshot = PageSnapshot(self._source_provider(), generation)
+            except Exception as e:
+                logger.error(f"截取页面快照失败: {str(e)}")
+                self._snapshot = None
+                return None
+            self._snapshot = snapshot
+            self._captures += 1
+        return snapshot
+    
+    def get_locator(self, locator_type: LocatorStrategy, locator_value: str) -> Optional[SnapshotLocator]:
+        """
+        获取快照定位器
+        
+        Args:
+            locator_type: 定位类型
+            locator_value: 定位值
+        
+        Returns:
+            Optional[SnapshotLocator]: 快照定位器，无法本地求值时返回None
+        """
+        snapshot = self.get_snapshot()
+        if not snapshot:
+            return None
+        try:
+            return SnapshotLocator(snapshot, locator_type, locator_value)
+        except SnapshotMiss as e:
+            logger.debug(str(e))
+            return None
+    
+    def record_hit(self) -> None:
+        """记录一次由快照回答的查询"""
+        self._hits += 1
+    
+    def record_fallback(self) -> None:
+        """记录一次回退到在线查找的查询"""
+        self._fallbacks += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取快照统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        return {
+            "captures": self._captures,
+            "hits": self._hits,
+            "fallbacks": self._fallbacks,
+            "platform": self._snapshot.platform if self._snapshot else None
+        } 
\ No newline at end of file
@@ -0,0 +1,153 @@
+import time
+import hashlib
+from typing import Any, Dict, Optional
+from app.core.logger import logger
+
+class StalenessStrategy:
+    """缓存元素失效判定策略基类"""
+    
+    name = "base"
+    
+    def __init__(self):
+        """初始化失效判定策略"""
+        self.generation = 0
+        self._checks = 0
+        self._remote_calls = 0
+    
+    def bump(self) -> None:
+        """页面发生变化，使之前缓存的所有元素失效"""
+        self.generation += 1
+    
+    def stamp(self, element: Any) -> Any:
+        """
+        生成元素写入缓存时的标记
+        
+        Args:
+            element: 要缓存的元素
+        
+        Returns:
+            Any: 缓存标记
+        """
+        return self.generation
+    
+    def is_fresh(self, element: Any, stamp: Any) -> bool:
+        """
+        判断缓存元素是否仍然有效
+        
+        Args:
+            element: 缓存的元素
+            stamp: 写入缓存时的标记
+        
+        Returns:
+            bool: 元素是否有效
+        """
+        self._checks += 1
+        return stamp == self.generation
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取判定统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        return {
+            "strategy": self.name,
+            "generation": self.generation,
+            "checks": self._checks,
+            "remote_calls": self._remote_calls,
+            "saved_round_trips": self._checks - self._remote_calls
+        }
+
+class PageGenerationStaleness(StalenessStrategy):
+    """页面代数策略：点击、输入、跳转等操作后页面代数加一，命中时不访问驱动"""
+    
+    name = "generation"
+
+class PageSourceFingerprintStaleness(StalenessStrategy):
+    """页面源码指纹策略：按固定间隔比对页面源码摘要，间隔内命中不访问驱动"""
+    
+    name = "fingerprint"
+    
+    def __init__(self, driver: Any, interval: float = 2.0):
+        """
+        初始化页面源码指纹策略
+        
+        Args:
+            driver: WebDriver实例
+            interval: 指纹检查间隔（秒）
+        """
+        super().__init__()
+        self.driver = driver
+        self.interval = interval
+        self._fingerprint: Optional[str] = None
+        self._checked_at = 0.0
+    
+    def _refresh(self) -> None:
+        """到达检查间隔时重新计算页面指纹"""
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return
+        self._checked_at = now
+        self._remote_calls += 1
+        try:
+            source = self.driver.page_source or ""
+        except Exception as e:
+            logger.error(f"获取页面源码失败: {str(e)}")
+            self.generation += 1
+            return
+        fingerprint = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        if self._fingerprint is not None and fingerprint != self._fingerprint:
+            self.generation += 1
+        self._fingerprint = fingerprint
+    
+    def bump(self) -> None:
+        """页面发生变化，并让下一次判定重新计算指纹"""
+        super().bump()
+        self._checked_at = 0.0
+    
+    def stamp(self, element: Any) -> Any:
+        self._refresh()
+        return self.generation
+    
+    def is_fresh(self, element: Any, stamp: Any) -> bool:
+        self._refresh()
+        return super().is_fresh(element, stamp)
+
+class DriverProbeStaleness(StalenessStrategy):
+    """驱动探测策略：每次命中都访问一次元素属性，结果最准确但开销最大"""
+    
+    name = "probe"
+    
+    def is_fresh(self, element: Any, stamp: Any) -> bool:
+        if not super().is_fresh(element, stamp):
+            return False
+        self._remote_calls += 1
+        try:
+            element.is_enabled()  # 尝试访问元素属性
+            return True
+        except Exception:
+            return False
+
+def create_staleness_strategy(name: str, driver: Any = None, **kwargs) -> StalenessStrategy:
+    """
+    创建失效判定策略
+    
+    Args:
+        name: 策略名称，可选值：generation、fingerprint、probe
+        driver: WebDriver实例
+        **kwargs: 其他参数
+    
+    Returns:
+        StalenessStrategy: 策略实例
+    
+    Raises:
+        ValueError: 不支持的策略
+    """
+    if name == PageGenerationStaleness.name:
+        return PageGenerationStaleness()
+    elif name == PageSourceFingerprintStaleness.name:
+        return PageSourceFingerprintStaleness(driver, **kwargs)
+    elif name == DriverProbeStaleness.name:
+        return DriverProbeStaleness()
+    raise ValueError(f"不支持的缓存失效策略: {name}") 
\ No newline at end of file
@@ -0,0 +1,159 @@
+import math
+from typing import Any, Dict, Optional
+
+class LocatorWaitStats:
+    """单个定位器的等待统计"""
+    
+    def __init__(self, smoothing: float = 0.3):
+        """
+        初始化等待统计
+        
+        Args:
+            smoothing: 出现耗时指数移动平均的平滑系数
+        """
+        self.smoothing = smoothing
+        self.expected_latency: Optional[float] = None
+        self.reset_counters()
+    
+    def reset_counters(self) -> None:
+        """清空计数，保留历史出现耗时"""
+        self.waits = 0
+        self.timeouts = 0
+        self.polls = 0
+        self.total_wait = 0.0
+        self.baseline_wait = 0.0
+        self.baseline_polls = 0
+    
+    def record(
+        self,
+        elapsed: float,
+        polls: int,
+        timed_out: bool,
+        baseline_interval: float,
+        last_miss: float = 0.0,
+        found_at: Optional[float] = None
+    ) -> None:
+        """
+        记录一次等待
+        
+        Args:
+            elapsed: 实际等待耗时（秒）
+            polls: 实际轮询次数
+            timed_out: 是否超时
+            baseline_interval: 对比用的固定轮询间隔（秒）
+            last_miss: 最后一次未找到的轮询开始时距等待开始的时间（秒）
+            found_at: 找到元素的轮询开始时距等待开始的时间（秒），为空时视为等于elapsed
+        """
+        self.waits += 1
+        self.polls += polls
+        self.total_wait += elapsed
+        if timed_out:
+            self.timeouts += 1
+            self.baseline_wait += elapsed
+            self.baseline_polls += math.ceil(elapsed / baseline_interval) + 1
+            return
+        if polls <= 1:
+            # 第一次轮询即找到，固定间隔轮询同样立即找到
+            self.baseline_wait += elapsed
+            self.baseline_polls += 1
+        else:
+            # 元素在最后一次未找到和找到的两次轮询之间出现，取中点作为出现时间；
+            # 固定间隔轮询要等到出现后的下一个轮询点才会发现，再加上一次查找本身的耗时
+            found_at = elapsed if found_at is None else found_at
+            appeared = (last_miss + found_at) / 2
+            ticks = math.ceil(appeared / baseline_interval - 1e-9)
+            self.baseline_wait += ticks * baseline_interval + (elapsed - found_at)
+            self.baseline_polls += ticks + 1
+        if self.expected_latency is None:
+            self.expected_latency = elapsed
+        else:
+            self.expected_latency += self.smoothing * (elapsed - self.expected_latency)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        return {
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "polls": self.polls,
+            "avg_wait": round(self.total_wait / self.waits, 4) if self.waits else 0.0,
+            "expected_latency": round(self.expected_latency, 4) if self.expected_latency is not None else None,
+            "saved_seconds": round(self.baseline_wait - self.total_wait, 4),
+            "saved_polls": self.baseline_polls - self.polls
+        }
+
+class WaitStatsRecorder:
+    """按定位器记录元素出现耗时，用于调节自适应轮询"""
+    
+    def __init__(self, baseline_interval: float = 0.5):
+        """
+        初始化等待统计记录器
+        
+        Args:
+            baseline_interval: 对比用的固定轮询间隔（秒），即原先的poll_frequency
+        """
+        self.baseline_interval = baseline_interval
+        self._stats: Dict[str, LocatorWaitStats] = {}
+    
+    def get_expected_latency(self, key: str) -> Optional[float]:
+        """
+        获取定位器的历史出现耗时
+        
+        Args:
+            key: 定位器键
+        
+        Returns:
+            Optional[float]: 历史出现耗时（秒），没有记录时返回None
+        """
+        stats = self._stats.get(key)
+        return stats.expected_latency if stats else None
+    
+    def record(
+        self,
+        key: str,
+        elapsed: float,
+        polls: int,
+        timed_out: bool,
+        last_miss: float = 0.0,
+        found_at: Optional[float] = None
+    ) -> None:
+        """
+        记录一次等待
+        
+        Args:
+            key: 定位器键
+            elapsed: 实际等待耗时（秒）
+            polls: 实际轮询次数
+            timed_out: 是否超时
+            last_miss: 最后一次未找到的轮询开始时距等待开始的时间（秒）
+            found_at: 找到元素的轮询开始时距等待开始的时间（秒）
+        """
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = LocatorWaitStats()
+        stats.record(elapsed, polls, timed_out, self.baseline_interval, last_miss, found_at)
+    
+    def reset(self) -> None:
+        """清空计数（例如每个测试用例开始时），保留用于调节轮询的历史出现耗时"""
+        for stats in self._stats.values():
+            stats.reset_counters()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计汇总
+        
+        Returns:
+            Dict[str, Any]: 汇总及每个定位器的统计
+        """
+        locators = {key: stats.to_dict() for key, stats in self._stats.items() if stats.waits}
+        return {
+            "waits": sum(item["waits"] for item in locators.values()),
+            "timeouts": sum(item["timeouts"] for item in locators.values()),
+            "saved_seconds": round(sum(item["saved_seconds"] for item in locators.values()), 4),
+            "saved_polls": sum(item["saved_polls"] for item in locators.values()),
+            "locators": locators
+        } 
\ No newline at end of file
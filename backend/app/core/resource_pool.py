@@ -275,6 +275,38 @@ class ResourcePool:
             resource.properties["allocated_to"] = user
         return resource
     
+    def allocate_resources(
+        self,
+        resource_type: ResourceType,
+        user: str,
+        count: int,
+        resource_ids: Optional[List[str]] = None
+    ) -> List[Resource]:
+        """
+        批量分配资源，检查状态和标记占用之间不让出事件循环，同一资源不会被分配两次
+        
+        Args:
+            resource_type: 资源类型
+            user: 用户标识
+            count: 最多分配的数量
+            resource_ids: 限定的资源ID列表，为空时从该类型的全部资源中分配
+            
+        Returns:
+            List[Resource]: 分配的资源，可用资源不足时少于count个
+        """
+        resources = []
+        for resource_id in self._type_resources[resource_type]:
+            if len(resources) >= count:
+                break
+            if resource_ids is not None and resource_id not in resource_ids:
+                continue
+            resource = self._resources[resource_id]
+            if resource.status == ResourceStatus.AVAILABLE:
+                resource.mark_as_used()
+                resource.properties["allocated_to"] = user
+                resources.append(resource)
+        return resources
+    
     def release_resource(self, resource_id: str) -> None:
         """
         释放资源
@@ -0,0 +1,391 @@
+import time
+import random
+import asyncio
+import threading
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from app.core.locator.batch import BATCH_FIND_SCRIPT
+
+# 1x1 透明PNG，模拟截图数据
+BLANK_SCREENSHOT = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+
+class SimulationProfile:
+    """模拟驱动配置：每次驱动调用的延迟和失败率"""
+    
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        latencies: Optional[Dict[str, float]] = None,
+        failure_rates: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        初始化模拟驱动配置
+        
+        Args:
+            latency: 每次驱动调用的默认延迟（秒），模拟一次WebDriver/UIAutomator往返
+            jitter: 延迟的随机浮动范围（秒）
+            failure_rate: 每次驱动调用的默认失败概率
+            latencies: 按命令覆盖的延迟，如 {"find_element": 0.2, "page_source": 0.5}
+            failure_rates: 按命令覆盖的失败概率
+            seed: 随机种子，相同种子的运行结果可重复
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.latencies = latencies or {}
+        self.failure_rates = failure_rates or {}
+        self.seed = seed
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典
+        
+        Returns:
+            Dict[str, Any]: 配置信息
+        """
+        return {
+            "latency": self.latency,
+            "jitter": self.jitter,
+            "failure_rate": self.failure_rate,
+            "latencies": dict(self.latencies),
+            "failure_rates": dict(self.failure_rates),
+            "seed": self.seed
+        }
+
+class SimulatedBackend:
+    """模拟后端：决定每次调用的延迟和是否失败，并统计调用次数和模拟耗时"""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, profile: Optional[SimulationProfile] = None):
+        """
+        初始化模拟后端
+        
+        Args:
+            profile: 模拟配置
+        """
+        self.profile = profile or SimulationProfile()
+        self._random = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.failures = 0
+        self.simulated_seconds = 0.0
+        self.elements: Dict[str, "SimulatedElementState"] = {}
+    
+    def begin(self, command: str) -> Tuple[float, bool]:
+        """
+        开始一次驱动调用
+        
+        Args:
+            command: 命令名称
+        
+        Returns:
+            Tuple[float, bool]: 本次调用的延迟和是否失败
+        """
+        profile = self.profile
+        with self._lock:
+            delay = profile.latencies.get(command, profile.latency)
+            if profile.jitter:
+                delay = max(0.0, delay + self._random.uniform(-profile.jitter, profile.jitter))
+            failed = self._random.random() < profile.failure_rates.get(command, profile.failure_rate)
+            self.calls[command] = self.calls.get(command, 0) + 1
+            self.simulated_seconds += delay
+            if failed:
+                self.failures += 1
+        return delay, failed
+    
+    @staticmethod
+    def error(command: str, detail: str = "") -> Exception:
+        """
+        生成模拟失败的异常，查找类命令抛出NoSuchElementException
+        
+        Args:
+            command: 命令名称
+            detail: 附加信息
+        
+        Returns:
+            Exception: 异常实例
+        """
+        if command.startswith("find_element"):
+            return NoSuchElementException(f"模拟未找到元素: {detail}")
+        return WebDriverException(f"模拟驱动调用失败: {command} {detail}".strip())
+    
+    def element(self, by: str, value: str) -> "SimulatedElementState":
+        """
+        获取定位器对应的元素状态，同一定位器总是返回同一个元素
+        
+        Args:
+            by: 定位方式
+            value: 定位值
+        
+        Returns:
+            SimulatedElementState: 元素状态
+        """
+        key = f"{by}:{value}"
+        with self._lock:
+            state = self.elements.get(key)
+            if state is None:
+                state = SimulatedElementState(f"sim-{next(self._ids)}", by, value)
+                self.elements[key] = state
+                self.elements[state.id] = state
+        return state
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取调用统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        with self._lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "by_command": dict(self.calls),
+                "failures": self.failures,
+                "simulated_seconds": round(self.simulated_seconds, 4)
+            }
+
+class SimulatedElementState:
+    """模拟元素的状态，同步和异步元素共用"""
+    
+    def __init__(self, element_id: str, by: str, value: str):
+        self.id = element_id
+        self.by = by
+        self.value = value
+        self.text = value
+        self.attributes: Dict[str, Any] = {"id": element_id}
+        self.selected = False
+
+class SimulatedElement:
+    """模拟WebElement（同步），每次调用阻塞模拟延迟"""
+    
+    def __init__(self, backend: SimulatedBackend, state: SimulatedElementState):
+        self._backend = backend
+        self._state = state
+    
+    @property
+    def id(self) -> str:
+        return self._state.id
+    
+    def _call(self, command: str, result: Any = None) -> Any:
+        delay, failed = self._backend.begin(command)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise self._backend.error(command, self._state.value)
+        return result
+    
+    @property
+    def text(self) -> str:
+        return self._call("text", self._state.text)
+    
+    @property
+    def rect(self) -> Dict[str, int]:
+        return self._call("rect", {"x": 0, "y": 0, "width": 100, "height": 40})
+    
+    @property
+    def screenshot_as_base64(self) -> str:
+        return self._call("screenshot", BLANK_SCREENSHOT)
+    
+    def click(self) -> None:
+        self._state.selected = not self._state.selected
+        self._call("click")
+    
+    def send_keys(self, *value: Any) -> None:
+        self._state.text += "".join(str(item) for item in value)
+        self._call("send_keys")
+    
+    def clear(self) -> None:
+        self._state.text = ""
+        self._call("clear")
+    
+    def submit(self) -> None:
+        self._call("submit")
+    
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self._call("get_attribute", self._state.attributes.get(name))
+    
+    def value_of_css_property(self, name: str) -> str:
+        return self._call("css_property", "")
+    
+    def is_displayed(self) -> bool:
+        return self._call("is_displayed", True)
+    
+    def is_enabled(self) -> bool:
+        return self._call("is_enabled", True)
+    
+    def is_selected(self) -> bool:
+        return self._call("is_selected", self._state.selected)
+    
+    def screenshot(self, filename: str) -> bool:
+        return self._call("screenshot", True)
+
+class SimulatedDriver:
+    """模拟WebDriver（同步），接口与TestEngine、LocatorManager使用的WebDriver一致"""
+    
+    def __init__(self, profile: Optional[SimulationProfile] = None, backend: Optional[SimulatedBackend] = None):
+        """
+        初始化模拟驱动
+        
+        Args:
+            profile: 模拟配置
+            backend: 共用的模拟后端，默认按配置新建
+        """
+        self.backend = backend or SimulatedBackend(profile)
+        self.current_url = "about:blank"
+        self.capabilities = {"platformName": "simulated"}
+        self.session_id = f"simulated-{id(self)}"
+    
+    def _call(self, command: str, result: Any = None, detail: str = "") -> Any:
+        delay, failed = self.backend.begin(command)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise self.backend.error(command, detail)
+        return result
+    
+    @property
+    def page_source(self) -> str:
+        return self._call("page_source", '<hierarchy rotation="0"></hierarchy>')
+    
+    def find_element(self, by: str = "id", value: Optional[str] = None) -> SimulatedElement:
+        state = self.backend.element(by, value)
+        return self._call("find_element", SimulatedElement(self.backend, state), f"{by}={value}")
+    
+    def find_elements(self, by: str = "id", value: Optional[str] = None) -> List[SimulatedElement]:
+        state = self.backend.element(by, value)
+        return self._call("find_elements", [SimulatedElement(self.backend, state)], f"{by}={value}")
+    
+    def execute_script(self, script: str, *args: Any) -> Any:
+        result = None
+        if script == BATCH_FIND_SCRIPT and args:
+            result = [
+                SimulatedElement(self.backend, self.backend.element(locator_type, locator_value))
+                for locator_type, locator_value in args[0]
+            ]
+        return self._call("execute_script", result)
+    
+    def get(self, url: str) -> None:
+        self.current_url = url
+        self._call("get")
+    
+    def execute(self, driver_command: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self._call(driver_command, {"value": None})
+    
+    def get_screenshot_as_base64(self) -> str:
+        return self._call("screenshot", BLANK_SCREENSHOT)
+    
+    def get_window_size(self) -> Dict[str, int]:
+        return self._call("window_size", {"width": 1080, "height": 1920})
+    
+    def quit(self) -> None:
+        self._call("quit")
+
+class AsyncSimulatedElement:
+    """模拟元素（异步），属性和方法都需要await，与TestExecutor、Assertions使用的驱动一致"""
+    
+    def __init__(self, backend: SimulatedBackend, state: SimulatedElementState):
+        self._backend = backend
+        self._state = state
+    
+    @property
+    def id(self) -> str:
+        return self._state.id
+    
+    async def _call(self, command: str, result: Any = None) -> Any:
+        delay, failed = self._backend.begin(command)
+        await asyncio.sleep(delay)
+        if failed:
+            raise self._backend.error(command, self._state.value)
+        return result
+    
+    @property
+    def text(self):
+        return self._call("text", self._state.text)
+    
+    async def click(self) -> None:
+        self._state.selected = not self._state.selected
+        await self._call("click")
+    
+    async def send_keys(self, *value: Any) -> None:
+        self._state.text += "".join(str(item) for item in value)
+        await self._call("send_keys")
+    
+    async def clear(self) -> None:
+        self._state.text = ""
+        await self._call("clear")
+    
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return await self._call("get_attribute", self._state.attributes.get(name))
+    
+    async def is_displayed(self) -> bool:
+        return await self._call("is_displayed", True)
+    
+    async def is_enabled(self) -> bool:
+        return await self._call("is_enabled", True)
+    
+    async def is_selected(self) -> bool:
+        return await self._call("is_selected", self._state.selected)
+
+class AsyncSimulatedDriver:
+    """模拟驱动（异步），用于TestExecutor的演练执行，延迟通过asyncio.sleep模拟，不占用线程"""
+    
+    def __init__(self, profile: Optional[SimulationProfile] = None, backend: Optional[SimulatedBackend] = None):
+        """
+        初始化异步模拟驱动
+        
+        Args:
+            profile: 模拟配置
+            backend: 共用的模拟后端，默认按配置新建
+        """
+        self.backend = backend or SimulatedBackend(profile)
+        self._current_url = "about:blank"
+        self.session_id = f"simulated-{id(self)}"
+    
+    async def _call(self, command: str, result: Any = None, detail: str = "") -> Any:
+        delay, failed = self.backend.begin(command)
+        await asyncio.sleep(delay)
+        if failed:
+            raise self.backend.error(command, detail)
+        return result
+    
+    @property
+    def page_source(self):
+        return self._call("page_source", '<hierarchy rotation="0"></hierarchy>')
+    
+    @property
+    def current_url(self):
+        return self._call("current_url", self._current_url)
+    
+    async def find_element(self, by: str = "id", value: Optional[str] = None) -> AsyncSimulatedElement:
+        state = self.backend.element(by, value)
+        return await self._call("find_element", AsyncSimulatedElement(self.backend, state), f"{by}={value}")
+    
+    async def find_elements(self, by: str = "id", value: Optional[str] = None) -> List[AsyncSimulatedElement]:
+        state = self.backend.element(by, value)
+        return await self._call("find_elements", [AsyncSimulatedElement(self.backend, state)], f"{by}={value}")
+    
+    def element(self, element_id: str) -> Optional[AsyncSimulatedElement]:
+        """按元素ID获取已查找过的元素"""
+        state = self.backend.elements.get(element_id)
+        return AsyncSimulatedElement(self.backend, state) if state else None
+    
+    async def get(self, url: str) -> None:
+        self._current_url = url
+        await self._call("get")
+    
+    async def execute(self, driver_command: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self._call(driver_command, {"value": None})
+    
+    async def get_screenshot_as_base64(self) -> str:
+        return await self._call("screenshot", BLANK_SCREENSHOT)
+    
+    async def get_window_size(self) -> Dict[str, int]:
+        return await self._call("window_size", {"width": 1080, "height": 1920})
+    
+    async def quit(self) -> None:
+        await self._call("quit") 
\ No newline at end of file
@@ -0,0 +1,164 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from app.core.keywords import step_field
+
+# 会切换页面的手势：点击后下一步的元素可能在新页面上，默认结束当前组
+SCREEN_CHANGING_ACTIONS = ("click", "double_click", "right_click", "drag_and_drop")
+
+# W3C Actions命令名，Selenium的Command.W3C_ACTIONS
+W3C_ACTIONS_COMMAND = "actions"
+
+class W3CActionsBuilder:
+    """W3C Actions负载构建器：指针和键盘两个输入源按时间片对齐，一次命令执行全部手势"""
+    
+    def __init__(self, pointer_type: str = "mouse"):
+        """
+        初始化构建器
+        
+        Args:
+            pointer_type: 指针类型，Web使用mouse，移动端使用touch
+        """
+        self.pointer_type = pointer_type
+        self._pointer: List[Dict[str, Any]] = []
+        self._keys: List[Dict[str, Any]] = []
+    
+    def _tick(self, pointer: Optional[Dict[str, Any]] = None, key: Optional[Dict[str, Any]] = None) -> None:
+        """添加一个时间片，另一个输入源补一个暂停"""
+        self._pointer.append(pointer or {"type": "pause", "duration": 0})
+        self._keys.append(key or {"type": "pause", "duration": 0})
+    
+    def move_to(self, element: Any) -> "W3CActionsBuilder":
+        self._tick(pointer={"type": "pointerMove", "duration": 0, "origin": element, "x": 0, "y": 0})
+        return self
+    
+    def press(self, button: int = 0) -> "W3CActionsBuilder":
+        self._tick(pointer={"type": "pointerDown", "button": button})
+        return self
+    
+    def release(self, button: int = 0) -> "W3CActionsBuilder":
+        self._tick(pointer={"type": "pointerUp", "button": button})
+        return self
+    
+    def click(self, element: Any, button: int = 0) -> "W3CActionsBuilder":
+        return self.move_to(element).press(button).release(button)
+    
+    def key(self, value: str) -> "W3CActionsBuilder":
+        self._tick(key={"type": "keyDown", "value": value})
+        self._tick(key={"type": "keyUp", "value": value})
+        return self
+    
+    def type_text(self, text: str) -> "W3CActionsBuilder":
+        for char in text:
+            self.key(char)
+        return self
+    
+    def __len__(self) -> int:
+        return len(self._pointer)
+    
+    def to_payload(self) -> List[Dict[str, Any]]:
+        """
+        生成W3C Actions负载
+        
+        Returns:
+            List[Dict[str, Any]]: actions参数，没有键盘操作时只包含指针输入源
+        """
+        sources = [{
+            "type": "pointer",
+            "id": "fusion-pointer",
+            "parameters": {"pointerType": self.pointer_type},
+            "actions": self._pointer
+        }]
+        if any(action["type"] != "pause" for action in self._keys):
+            sources.append({"type": "key", "id": "fusion-keyboard", "actions": self._keys})
+        return sources
+
+def _click(builder: W3CActionsBuilder, element: Any, step: Any, target: Any) -> None:
+    builder.click(element)
+
+def _double_click(builder: W3CActionsBuilder, element: Any, step: Any, target: Any) -> None:
+    builder.click(element).press().release()
+
+def _right_click(builder: W3CActionsBuilder, element: Any, step: Any, target: Any) -> None:
+    builder.click(element, button=2)
+
+def _hover(builder: W3CActionsBuilder, element: Any, step: Any, target: Any) -> None:
+    builder.move_to(element)
+
+def _drag_and_drop(builder: W3CActionsBuilder, element: Any, step: Any, target: Any) -> None:
+    builder.move_to(element).press().move_to(target).release()
+
+# 可合并的操作及其手势。移动端使用触摸指针，没有悬停和右键；
+# 清空和输入不合并：键盘模拟的全选删除与元素的clear()、send_keys触发的事件不同，
+# 在contenteditable、只读或带输入掩码的控件上结果也不同，仍逐个发送
+TOUCH_GESTURES: Dict[str, Callable[[W3CActionsBuilder, Any, Any, Any], None]] = {
+    "click": _click,
+    "double_click": _double_click,
+    "drag_and_drop": _drag_and_drop,
+}
+
+WEB_GESTURES: Dict[str, Callable[[W3CActionsBuilder, Any, Any, Any], None]] = {
+    **TOUCH_GESTURES,
+    "right_click": _right_click,
+    "hover": _hover,
+}
+
+def get_gestures(mobile: bool) -> Dict[str, Callable[[W3CActionsBuilder, Any, Any, Any], None]]:
+    """
+    获取可合并的手势表
+    
+    Args:
+        mobile: 是否为移动端会话
+    
+    Returns:
+        Dict[str, Callable]: 操作到手势构建函数
+    """
+    return TOUCH_GESTURES if mobile else WEB_GESTURES
+
+def fuse_steps(steps: Sequence[Any], mobile: bool = False) -> List[List[Any]]:
+    """
+    将相邻的可合并步骤分组，组内步骤合并为一个W3C Actions负载
+    
+    组内元素在提交手势前一次定位，只有确定在同一页面上的步骤才能合并：
+    点击、拖放等可能切换页面的步骤结束当前组，步骤设置same_screen为真时表示操作后仍停留在当前页面。
+    带断言的步骤只能作为组内最后一步，断言需要在手势执行完成后求值。
+    
+    Args:
+        steps: 步骤列表，字典或对象
+        mobile: 是否为移动端会话
+    
+    Returns:
+        List[List[Any]]: 分组后的步骤，不能合并的步骤单独成组
+    """
+    gestures = get_gestures(mobile)
+    groups: List[List[Any]] = []
+    open_group = False
+    for step in steps:
+        action = step_field(step, "action")
+        fusible = action in gestures
+        if fusible and open_group:
+            groups[-1].append(step)
+        else:
+            groups.append([step])
+        # 有断言或可能切换页面的步骤结束当前组
+        open_group = (
+            fusible
+            and not step_field(step, "assertions")
+            and (action not in SCREEN_CHANGING_ACTIONS or bool(step_field(step, "same_screen")))
+        )
+    return groups
+
+def build_actions(items: Sequence[Any], mobile: bool = False) -> List[Dict[str, Any]]:
+    """
+    生成一组步骤的W3C Actions负载
+    
+    Args:
+        items: (步骤, 元素, 目标元素) 列表
+        mobile: 是否为移动端会话，移动端使用触摸指针
+    
+    Returns:
+        List[Dict[str, Any]]: actions参数
+    """
+    gestures = get_gestures(mobile)
+    builder = W3CActionsBuilder("touch" if mobile else "mouse")
+    for step, element, target in items:
+        gestures[step_field(step, "action")](builder, element, step, target)
+    return builder.to_payload()
@@ -0,0 +1,145 @@
+import re
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+# 步骤模板中的变量占位符：${变量名}
+PLACEHOLDER_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+class StepTemplate:
+    """预编译的字符串模板，拆分为字面量片段和变量片段"""
+    
+    __slots__ = ("source", "literals", "names")
+    
+    def __init__(self, source: str):
+        """
+        编译模板
+        
+        Args:
+            source: 模板字符串
+        """
+        self.source = source
+        parts = PLACEHOLDER_PATTERN.split(source)
+        # split结果中偶数位是字面量，奇数位是变量名
+        self.literals: Tuple[str, ...] = tuple(parts[0::2])
+        self.names: Tuple[str, ...] = tuple(parts[1::2])
+    
+    def render(self, data: Mapping[str, Any]) -> str:
+        """
+        渲染模板，数据中不存在的变量保留原占位符
+        
+        Args:
+            data: 变量数据
+        
+        Returns:
+            str: 渲染结果
+        """
+        literals = self.literals
+        parts = [literals[0]]
+        for index, name in enumerate(self.names, 1):
+            parts.append(str(data[name]) if name in data else "${" + name + "}")
+            parts.append(literals[index])
+        return "".join(parts)
+
+class StepPlan:
+    """编译后的不可变步骤计划：每行数据只需渲染含变量的字段"""
+    
+    __slots__ = ("_steps", "templated_fields")
+    
+    def __init__(self, steps: Sequence[Dict[str, Any]]):
+        """
+        编译测试步骤
+        
+        Args:
+            steps: 测试步骤列表（TestCase.steps）
+        """
+        compiled = []
+        templated_fields = 0
+        for step in steps:
+            templates = tuple(
+                (key, StepTemplate(value))
+                for key, value in step.items()
+                if isinstance(value, str) and "${" in value
+            )
+            templated_fields += len(templates)
+            compiled.append((dict(step), templates))
+        self._steps: Tuple[Tuple[Dict[str, Any], Tuple[Tuple[str, StepTemplate], ...]], ...] = tuple(compiled)
+        self.templated_fields = templated_fields
+    
+    def __len__(self) -> int:
+        return len(self._steps)
+    
+    def render(self, data: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """
+        使用一行数据渲染步骤
+        
+        不含变量的步骤直接复用编译时的字典，调用方不应修改返回的步骤。
+        
+        Args:
+            data: 一行测试数据
+        
+        Returns:
+            List[Dict[str, Any]]: 渲染后的步骤列表
+        """
+        steps = []
+        for base, templates in self._steps:
+            if not templates:
+                steps.append(base)
+                continue
+            step = dict(base)
+            for key, template in templates:
+                step[key] = template.render(data)
+            steps.append(step)
+        return steps
+
+def benchmark(rows: int = 5000, steps: int = 40) -> Dict[str, Any]:
+    """
+    对比逐字段str.replace与编译计划渲染的耗时
+    
+    Args:
+        rows: 数据行数
+        steps: 每个用例的步骤数
+    
+    Returns:
+        Dict[str, Any]: 两种方式的总耗时及加速比
+    """
+    import time
+    
+    variables = [f"var_{i}" for i in range(8)]
+    test_steps = [
+        {
+            "step_number": i,
+            "action": "input" if i % 2 else "click",
+            "element": f"id:field_{i}",
+            "value": f"${{{variables[i % len(variables)]}}}-suffix" if i % 2 else None,
+            "description": f"step {i} for ${{{variables[(i + 1) % len(variables)]}}}",
+        }
+        for i in range(steps)
+    ]
+    data_rows = [{name: f"{name}_{row}" for name in variables} for row in range(rows)]
+    
+    started = time.perf_counter()
+    for data in data_rows:
+        for step in test_steps:
+            new_step = {}
+            for key, value in step.items():
+                if isinstance(value, str):
+                    for var_name, var_value in data.items():
+                        value = value.replace(f"${{{var_name}}}", str(var_value))
+                new_step[key] = value
+    naive = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    plan = StepPlan(test_steps)
+    for data in data_rows:
+        plan.render(data)
+    compiled = time.perf_counter() - started
+    
+    return {
+        "rows": rows,
+        "steps": steps,
+        "naive_seconds": round(naive, 3),
+        "compiled_seconds": round(compiled, 3),
+        "speedup": round(naive / compiled, 2) if compiled else None
+    }
+
+if __name__ == "__main__":
+    print(benchmark()) 
\ No newline at end of file
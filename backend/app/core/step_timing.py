@@ -0,0 +1,131 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# 步骤耗时阶段：定位、操作、断言由设备和被测应用决定，截图和持久化由平台决定
+STEP_PHASES = ("locate", "action", "assertion", "screenshot", "persist")
+DEVICE_PHASES = ("locate", "action", "assertion")
+# 估算的阶段：持久化在后台批量完成，按已写入批次的平均每行耗时折算，不是步骤内的实测值
+ESTIMATED_PHASES = ("persist",)
+
+class StepTimer:
+    """单个步骤的分阶段计时"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        # 不在步骤内发生、折算到步骤的耗时，如后台批量写入
+        self.deferred = 0.0
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        记录一个阶段的耗时，同名阶段累加
+        
+        Args:
+            name: 阶段名称
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+    
+    def add(self, name: str, seconds: float, deferred: bool = False) -> None:
+        """
+        累加阶段耗时
+        
+        Args:
+            name: 阶段名称
+            seconds: 耗时（秒）
+            deferred: 是否为步骤之外折算进来的耗时，折算的耗时同时计入步骤总耗时
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if deferred:
+            self.deferred += seconds
+    
+    def divide(self, count: int) -> "StepTimer":
+        """
+        将合并执行的一组步骤的耗时平均分给每一步
+        
+        Args:
+            count: 步骤数
+        
+        Returns:
+            StepTimer: 单步计时
+        """
+        timer = StepTimer()
+        timer.started = time.perf_counter() - (time.perf_counter() - self.started) / count
+        timer.phases = {name: seconds / count for name, seconds in self.phases.items()}
+        timer.deferred = self.deferred / count
+        return timer
+    
+    def elapsed_ms(self) -> int:
+        """步骤总耗时（毫秒）"""
+        return int((time.perf_counter() - self.started + self.deferred) * 1000)
+    
+    def to_dict(self) -> Dict[str, float]:
+        """
+        转换为紧凑的毫秒字典
+        
+        Returns:
+            Dict[str, float]: 阶段名称到耗时（毫秒）
+        """
+        return {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+
+def summarize_timings(rows: Iterable[Any]) -> Dict[str, Any]:
+    """
+    汇总步骤耗时，区分设备/应用耗时和平台耗时
+    
+    Args:
+        rows: 步骤结果，需包含action、duration和timings
+    
+    Returns:
+        Dict[str, Any]: 各阶段总耗时及占比、按操作的平均耗时，估算的阶段标记estimated
+    """
+    phases = {name: 0.0 for name in STEP_PHASES}
+    phases["other"] = 0.0
+    actions: Dict[str, Dict[str, Any]] = {}
+    steps = 0
+    total = 0.0
+    for row in rows:
+        timings: Optional[Dict[str, float]] = row.timings
+        if not timings or row.duration is None:
+            continue
+        steps += 1
+        total += row.duration
+        measured = 0.0
+        for name, value in timings.items():
+            phases[name] = phases.get(name, 0.0) + value
+            measured += value
+        # 阶段之外的耗时（调度、日志等）计入平台耗时
+        phases["other"] += max(0.0, row.duration - measured)
+        stats = actions.setdefault(row.action, {"count": 0, "total_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += row.duration
+    device_ms = sum(phases[name] for name in DEVICE_PHASES)
+    framework_ms = sum(value for name, value in phases.items() if name not in DEVICE_PHASES)
+    measured_total = device_ms + framework_ms
+    return {
+        "steps": steps,
+        "total_ms": round(total, 1),
+        "phases": {
+            name: {
+                "total_ms": round(value, 1),
+                "avg_ms": round(value / steps, 2) if steps else 0.0,
+                "share": round(value / measured_total, 4) if measured_total else 0.0,
+                "estimated": name in ESTIMATED_PHASES
+            }
+            for name, value in phases.items()
+        },
+        "device_ms": round(device_ms, 1),
+        "framework_ms": round(framework_ms, 1),
+        "framework_share": round(framework_ms / measured_total, 4) if measured_total else 0.0,
+        "actions": {
+            action: {
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2)
+            }
+            for action, stats in sorted(actions.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        }
+    } 
\ No newline at end of file
@@ -1,9 +1,19 @@
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import NoSuchElementException, UnknownMethodException
 from abc import ABC, abstractmethod
 
 from app.core.locator.manager import LocatorManager
+from app.core.locator.snapshot import SnapshotMiss
+from app.core.locator.batch import is_mobile_driver
+from app.core.driver_executor import DriverExecutor, driver_executors
+from app.core.simulated_driver import SimulatedDriver, SimulationProfile
+from app.core.keywords import Keyword, locator_actions, locator_assertions
+from app.core.step_plan import StepPlan
+from app.core.step_fusion import W3C_ACTIONS_COMMAND, fuse_steps, build_actions
+from app.core.step_timing import StepTimer
+from app.core.config import settings
 from app.core.logger import logger
 from app.models.project import TestExecution, TestStepResult, TestCase
 from app.schemas.project import TestStep
@@ -11,6 +21,11 @@ from app.schemas.project import TestStep
 from app.schemas.test_execution import TestStepResultCreate
 from app.core.exceptions import TestExecutionError, TestStepError
 
+# Web会话可在快照上求值的断言：只依赖文档结构。
+# 文本、属性、可见、选中等状态在快照中是序列化的HTML，与浏览器渲染后的文本和DOM属性
+# （如输入后的value、点击后的checked）不一致，一律在线查询
+WEB_SNAPSHOT_ASSERTIONS = ("present", "count")
+
 class TestEngine(ABC):
     """测试引擎基类"""
     
@@ -58,26 +73,67 @@ class DataDrivenTestEngine(TestEngine):
 class KeywordDrivenTestEngine(TestEngine):
     """关键字驱动测试引擎"""
     
+    def __init__(self, driver: Any = None, simulation: Optional[SimulationProfile] = None):
+        """
+        初始化关键字驱动测试引擎
+        
+        Args:
+            driver: WebDriver实例
+            simulation: 模拟驱动配置，未传入driver时使用模拟驱动演练执行
+        """
+        if driver is None and simulation is not None:
+            driver = SimulatedDriver(simulation)
+        self.driver = driver
+        self.locator_manager = LocatorManager(driver) if driver is not None else None
+    
+    @staticmethod
+    def resolve_keyword(keyword: Dict[str, Any]) -> Any:
+        """
+        解析关键字，assert关键字按type解析为断言
+        
+        Args:
+            keyword: 关键字配置
+        
+        Returns:
+            Keyword: 关键字处理函数
+        """
+        if keyword["keyword"] == "assert":
+            return locator_assertions.resolve(keyword["type"])
+        return locator_actions.resolve(keyword["keyword"])
+    
     def execute(self, test_case: Dict[str, Any], data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         执行关键字驱动测试用例
         
         Args:
-            test_case: 测试用例数据
-            data: 关键字参数
+            test_case: 测试用例数据，keywords为关键字列表，
+                每项包含keyword、locator及value等参数，断言使用 {"keyword": "assert", "type": ...}
+            data: 关键字参数，替换关键字中的 ${变量}
         
         Returns:
             执行结果
+        
+        Raises:
+            TestExecutionError: 未提供驱动
+            ValueError: 不支持的关键字
         """
         if not data:
             data = {}
+        if self.locator_manager is None:
+            raise TestExecutionError("关键字驱动执行需要提供驱动")
+        
+        # 渲染变量并解析关键字，不支持的关键字在执行前报错
+        keywords = StepPlan(test_case.get("keywords", [])).render(data)
+        compiled = [(keyword, self.resolve_keyword(keyword)) for keyword in keywords]
         
-        # 解析关键字
-        keywords = test_case.get("keywords", [])
         results = []
-        for keyword in keywords:
+        for keyword, handler in compiled:
             try:
-                # 执行关键字逻辑（示例）
+                locator = self.locator_manager.create_locator_from_dict(keyword["locator"])
+                handler(locator, keyword)
+                if keyword["keyword"] != "assert":
+                    # 操作可能改变页面，缓存的元素需要重新判定
+                    locator._notify_page_change()
                 result = {"keyword": keyword, "status": "passed", "message": "关键字执行成功"}
             except Exception as e:
                 result = {"keyword": keyword, "status": "failed", "message": str(e)}
@@ -88,20 +144,56 @@ class KeywordDrivenTestEngine(TestEngine):
 class TestEngine:
     """测试执行引擎"""
     
-    def __init__(self, driver: WebDriver):
+    def __init__(
+        self,
+        driver: Optional[WebDriver] = None,
+        snapshot_mode: bool = True,
+        device_id: Optional[str] = None,
+        executor: Optional[DriverExecutor] = None,
+        simulation: Optional[SimulationProfile] = None,
+        fuse_gestures: Optional[bool] = None
+    ):
         """
         初始化测试执行引擎
         
         Args:
             driver: WebDriver实例
+            snapshot_mode: 断言是否优先在页面快照上求值
+            device_id: 设备ID，用于获取该设备的驱动调用执行器
+            executor: 驱动调用执行器，默认在第一次驱动调用时按设备ID从注册表获取
+            simulation: 模拟驱动配置，未传入driver时使用模拟驱动演练执行
+            fuse_gestures: 是否将相邻的点击、悬停等手势步骤合并为一次W3C Actions调用，默认使用settings.STEP_FUSION
         """
+        if driver is None and simulation is not None:
+            driver = SimulatedDriver(simulation)
         self.driver = driver
-        self.locator_manager = LocatorManager()
-        self.locator_manager.set_driver(driver)
+        self.fuse_gestures = settings.STEP_FUSION if fuse_gestures is None else fuse_gestures
+        self.mobile = is_mobile_driver(driver)
+        self.device_id = device_id
+        self._executor = executor
+        self.locator_manager = LocatorManager(driver, snapshot_mode=snapshot_mode)
         self.current_execution: Optional[TestExecution] = None
         self.current_step: Optional[TestStep] = None
         self.step_results: List[TestStepResult] = []
+        self.wait_stats: Dict[str, Any] = {}
+        # 执行前解析的操作和断言关键字，按步骤和断言对象查找，执行中不再重复解析
+        self.action_keywords: Dict[int, Keyword] = {}
+        self.assertion_keywords: Dict[int, Keyword] = {}
         
+    @property
+    def executor(self) -> DriverExecutor:
+        """
+        驱动调用执行器，阻塞的驱动调用在设备专属线程池中执行，避免阻塞事件循环
+        
+        Raises:
+            TestExecutionError: 未指定设备ID也未传入执行器
+        """
+        if self._executor is None:
+            if self.device_id is None:
+                raise TestExecutionError("未指定设备，无法获取驱动调用执行器")
+            self._executor = driver_executors.get(self.device_id)
+        return self._executor
+    
     async def execute_test_case(self, test_case: TestCase) -> TestExecution:
         """
         执行测试用例
@@ -112,6 +204,8 @@ class TestEngine:
         Returns:
             TestExecution: 测试执行记录
         """
+        self.locator_manager.reset_wait_stats()
+        self.locator_manager.set_project(test_case.project_id)
         try:
             # 创建测试执行记录
             self.current_execution = TestExecution(
@@ -121,9 +215,22 @@ class TestEngine:
                 start_time=datetime.now()
             )
             
-            # 执行测试步骤
-            for step in test_case.steps:
-                await self.execute_step(step)
+            # 执行前解析所有关键字，不支持的操作和断言在第一次驱动调用前报错
+            self.action_keywords = {id(step): locator_actions.resolve(step.action) for step in test_case.steps}
+            self.assertion_keywords = {
+                id(assertion): locator_assertions.resolve(assertion["type"])
+                for step in test_case.steps
+                for assertion in step.assertions or []
+            }
+            
+            # 执行测试步骤，相邻的可合并步骤一次提交
+            groups = fuse_steps(test_case.steps, self.mobile) if self.fuse_gestures else [[step] for step in test_case.steps]
+            for group in groups:
+                if len(group) > 1 and self.fuse_gestures:
+                    await self.execute_fused_steps(group)
+                else:
+                    for step in group:
+                        await self.execute_step(step)
                 
             # 更新执行状态
             self.current_execution.status = "completed"
@@ -138,6 +245,12 @@ class TestEngine:
                 self.current_execution.error_message = str(e)
                 self.current_execution.end_time = datetime.now()
             raise TestExecutionError(f"测试用例执行失败: {str(e)}")
+        finally:
+            self.wait_stats = self.locator_manager.get_wait_stats()
+            logger.info(
+                f"测试用例 {test_case.id} 元素等待 {self.wait_stats['waits']} 次, "
+                f"自适应轮询节省 {self.wait_stats['saved_seconds']} 秒"
+            )
             
     async def execute_step(self, step: TestStep) -> TestStepResult:
         """
@@ -149,28 +262,28 @@ class TestEngine:
         Returns:
             TestStepResult: 步骤执行结果
         """
+        step_result = None
+        timer = StepTimer()
         try:
             self.current_step = step
             logger.info(f"开始执行步骤: {step.name}")
             
             # 创建步骤结果记录
-            step_result = TestStepResult(
-                test_execution_id=self.current_execution.id,
-                test_step_id=step.id,
-                status="running",
-                start_time=datetime.now()
-            )
+            step_result = self._new_step_result(step)
             
-            # 执行步骤操作
-            await self.execute_step_action(step)
+            # 执行步骤操作，定位器操作内部完成元素等待，定位耗时计入操作
+            with timer.phase("action"):
+                await self.execute_step_action(step)
             
             # 执行断言
             if step.assertions:
-                await self.execute_assertions(step.assertions)
+                with timer.phase("assertion"):
+                    await self.execute_assertions(step.assertions)
                 
             # 更新步骤状态
             step_result.status = "passed"
             step_result.end_time = datetime.now()
+            self._record_timings(step_result, timer)
             
             self.step_results.append(step_result)
             return step_result
@@ -179,10 +292,120 @@ class TestEngine:
             logger.error(f"步骤执行失败: {str(e)}")
             if step_result:
                 step_result.status = "failed"
-                step_result.error_message = str(e)
+                step_result.message = str(e)
                 step_result.end_time = datetime.now()
+                self._record_timings(step_result, timer)
             raise TestStepError(f"步骤执行失败: {str(e)}")
             
+    def _new_step_result(self, step: TestStep) -> TestStepResult:
+        """
+        创建步骤结果记录
+        
+        Args:
+            step: 测试步骤对象
+            
+        Returns:
+            TestStepResult: 运行中的步骤结果
+        """
+        step_result = TestStepResult(
+            execution_id=self.current_execution.id,
+            step_number=getattr(step, "step_number", step.id),
+            action=step.action,
+            element=str(step.locator),
+            value=step.value,
+            status="running"
+        )
+        step_result.start_time = datetime.now()
+        return step_result
+    
+    def _record_timings(self, step_result: TestStepResult, timer: StepTimer) -> None:
+        """
+        将步骤计时写入步骤结果
+        
+        Args:
+            step_result: 步骤结果
+            timer: 步骤计时
+        """
+        step_result.duration = timer.elapsed_ms()
+        step_result.timings = timer.to_dict()
+    
+    async def execute_fused_steps(self, steps: List[TestStep]) -> List[TestStepResult]:
+        """
+        合并执行相邻的手势步骤，整组只发送一次W3C Actions命令
+        
+        Args:
+            steps: 可合并的步骤，只有最后一步可以带断言
+            
+        Returns:
+            List[TestStepResult]: 各步骤的执行结果
+        """
+        step_results = [self._new_step_result(step) for step in steps]
+        names = ", ".join(str(step.name) for step in steps)
+        logger.info(f"合并执行步骤: {names}")
+        timer = StepTimer()
+        try:
+            with timer.phase("action"):
+                await self.executor.run(self.perform_fused_actions, steps)
+        except UnknownMethodException:
+            # 驱动不支持W3C Actions，命令未执行，本会话改为逐步执行
+            logger.warning("驱动不支持W3C Actions，关闭步骤合并")
+            self.fuse_gestures = False
+            return [await self.execute_step(step) for step in steps]
+        except Exception as e:
+            for step_result in step_results:
+                step_result.status = "failed"
+                step_result.message = str(e)
+                step_result.end_time = datetime.now()
+                self._record_timings(step_result, timer.divide(len(steps)))
+            raise TestStepError(f"合并步骤执行失败 [{names}]: {str(e)}")
+        
+        # 整组只有一次驱动调用，耗时平均分给各步骤
+        for step_result in step_results:
+            step_result.status = "passed"
+            step_result.end_time = datetime.now()
+            self._record_timings(step_result, timer.divide(len(steps)))
+            self.step_results.append(step_result)
+        
+        self.current_step = steps[-1]
+        if steps[-1].assertions:
+            await self.execute_assertions(steps[-1].assertions)
+        return step_results
+    
+    def perform_fused_actions(self, steps: List[TestStep]) -> None:
+        """
+        定位一组步骤的元素并合并为W3C Actions执行（阻塞调用，在驱动调用执行器中运行）
+        
+        后续步骤的元素未找到时，说明它依赖前面的手势，先提交已合并的部分再等待该元素。
+        
+        Args:
+            steps: 可合并的步骤
+        """
+        items = []
+        locator = None
+        for step in steps:
+            locator = self.locator_manager.create_locator_from_dict(step.locator)
+            element = None
+            if items:
+                try:
+                    element = locator.find_element()
+                except NoSuchElementException:
+                    self._dispatch_actions(items, locator)
+                    items = []
+            if element is None:
+                element = locator.wait_for_element(condition="visible")
+            target = None
+            if step.target_locator:
+                target = self.locator_manager.create_locator_from_dict(step.target_locator).wait_for_element(
+                    condition="visible"
+                )
+            items.append((step, element, target))
+        self._dispatch_actions(items, locator)
+    
+    def _dispatch_actions(self, items: List[Any], locator: Any) -> None:
+        """发送合并后的W3C Actions，并使元素缓存失效"""
+        self.driver.execute(W3C_ACTIONS_COMMAND, {"actions": build_actions(items, self.mobile)})
+        locator._notify_page_change()
+    
     async def execute_step_action(self, step: TestStep) -> None:
         """
         执行步骤操作
@@ -194,79 +417,81 @@ class TestEngine:
             # 获取元素定位器
             locator = self.locator_manager.create_locator_from_dict(step.locator)
             
-            # 执行操作
-            if step.action == "click":
-                locator.click()
-            elif step.action == "input":
-                locator.input_text(step.value)
-            elif step.action == "clear":
-                locator.clear()
-            elif step.action == "submit":
-                locator.submit()
-            elif step.action == "scroll":
-                locator.scroll_to()
-            elif step.action == "hover":
-                locator.hover()
-            elif step.action == "double_click":
-                locator.double_click()
-            elif step.action == "right_click":
-                locator.right_click()
-            elif step.action == "drag_and_drop":
-                locator.drag_and_drop(step.target_locator)
-            else:
-                raise ValueError(f"不支持的操作类型: {step.action}")
+            # 操作包含多次驱动调用，整体提交到执行器，只切换一次线程
+            await self.executor.run(self.perform_action, locator, step)
                 
         except Exception as e:
             raise TestStepError(f"步骤操作执行失败: {str(e)}")
+    
+    def perform_action(self, locator: Any, step: TestStep) -> None:
+        """
+        对定位器执行步骤操作（阻塞调用，在驱动调用执行器中运行）
+        
+        Args:
+            locator: 元素定位器
+            step: 测试步骤对象
+        """
+        keyword = self.action_keywords.get(id(step)) or locator_actions.resolve(step.action)
+        keyword(locator, step)
+        # 滚动、悬停等操作不经过定位器的点击和输入，同样可能改变页面
+        locator._notify_page_change()
             
     async def execute_assertions(self, assertions: List[Dict[str, Any]]) -> None:
         """
         执行断言
         
+        只读断言优先在页面快照上求值，同一屏的多个断言只需一次页面源码请求；
+        快照无法回答或断言在快照上不成立时回退到在线查找。
+        
         Args:
             assertions: 断言列表
         """
         for assertion in assertions:
             try:
-                # 获取元素定位器
-                locator = self.locator_manager.create_locator_from_dict(assertion["locator"])
-                
-                # 执行断言
-                if assertion["type"] == "present":
-                    if not locator.is_present():
-                        raise AssertionError("元素不存在")
-                elif assertion["type"] == "visible":
-                    if not locator.is_visible():
-                        raise AssertionError("元素不可见")
-                elif assertion["type"] == "enabled":
-                    if not locator.is_enabled():
-                        raise AssertionError("元素不可用")
-                elif assertion["type"] == "selected":
-                    if not locator.is_selected():
-                        raise AssertionError("元素未选中")
-                elif assertion["type"] == "text":
-                    if locator.get_text() != assertion["value"]:
-                        raise AssertionError(f"文本不匹配: 期望 {assertion['value']}, 实际 {locator.get_text()}")
-                elif assertion["type"] == "attribute":
-                    if locator.get_attribute(assertion["attribute"]) != assertion["value"]:
-                        raise AssertionError(f"属性不匹配: {assertion['attribute']}")
-                elif assertion["type"] == "css_property":
-                    if locator.get_css_property(assertion["property"]) != assertion["value"]:
-                        raise AssertionError(f"CSS属性不匹配: {assertion['property']}")
-                elif assertion["type"] == "count":
-                    if locator.get_count() != assertion["value"]:
-                        raise AssertionError(f"元素数量不匹配: 期望 {assertion['value']}, 实际 {locator.get_count()}")
-                elif assertion["type"] == "contains_text":
-                    if assertion["value"] not in locator.get_text():
-                        raise AssertionError(f"文本不包含: {assertion['value']}")
-                elif assertion["type"] == "contains_attribute":
-                    if assertion["value"] not in locator.get_attribute(assertion["attribute"]):
-                        raise AssertionError(f"属性不包含: {assertion['attribute']}")
-                else:
-                    raise ValueError(f"不支持的断言类型: {assertion['type']}")
-                    
+                await self.executor.run(self.evaluate_assertion, assertion)
             except Exception as e:
                 raise TestStepError(f"断言执行失败: {str(e)}")
+    
+    def evaluate_assertion(self, assertion: Dict[str, Any]) -> None:
+        """
+        执行单个断言（阻塞调用，在驱动调用执行器中运行）
+        
+        Args:
+            assertion: 断言配置
+        """
+        # 获取元素定位器
+        locator = self.locator_manager.create_locator_from_dict(assertion["locator"])
+        
+        snapshot_locator = None
+        if self.mobile or assertion["type"] in WEB_SNAPSHOT_ASSERTIONS:
+            snapshot_locator = self.locator_manager.get_snapshot_locator(
+                locator.locator_type,
+                locator.locator_value
+            )
+        if snapshot_locator:
+            try:
+                self.check_assertion(snapshot_locator, assertion)
+                self.locator_manager.snapshot.record_hit()
+                return
+            except (SnapshotMiss, AssertionError):
+                # 快照可能已过时，断言失败时以在线查找的结果为准
+                self.locator_manager.snapshot.record_fallback()
+        
+        self.check_assertion(locator, assertion)
+    
+    def check_assertion(self, locator: Any, assertion: Dict[str, Any]) -> None:
+        """
+        对定位器执行单个断言
+        
+        Args:
+            locator: 定位器（在线定位器或快照定位器）
+            assertion: 断言配置
+            
+        Raises:
+            AssertionError: 断言失败
+        """
+        keyword = self.assertion_keywords.get(id(assertion)) or locator_assertions.resolve(assertion["type"])
+        keyword(locator, assertion)
                 
     def take_screenshot(self, step_result: TestStepResult) -> None:
         """
@@ -1,10 +1,10 @@
 from typing import List, Optional, Dict, Any, Union
 from sqlalchemy.orm import Session
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud.base import CRUDBase
-from app.models.project import TestExecution, TestStepResult
+from app.models.project import TestExecution, TestStepResult, ExecutionCheckpoint
 from app.schemas.project import TestExecutionCreate, TestExecutionUpdate, TestStepResultCreate, TestStepResultUpdate
 from app.core.enums.project import TestExecutionStatus, TestStepStatus
 
@@ -71,7 +71,9 @@ class CRUDTestExecution(CRUDBase[TestExecution, TestExecutionCreate, TestExecuti
             
         db_obj.status = status
         db_obj.end_time = datetime.utcnow()
-        db_obj.duration = int((db_obj.end_time - db_obj.start_time).total_seconds())
+        # 排队中被停止的执行没有开始时间
+        if db_obj.start_time:
+            db_obj.duration = int((db_obj.end_time - db_obj.start_time).total_seconds())
         if error_message:
             db_obj.error_message = error_message
             
@@ -92,6 +94,82 @@ class CRUDTestExecution(CRUDBase[TestExecution, TestExecutionCreate, TestExecuti
         await db.refresh(db_obj)
         return db_obj
     
+    async def create_step_results_bulk(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]]
+    ) -> int:
+        """批量创建测试步骤结果，一次插入、一次提交"""
+        if not rows:
+            return 0
+        await db.execute(insert(TestStepResult), rows)
+        await db.commit()
+        return len(rows)
+    
+    async def get_step_timings(
+        self,
+        db: AsyncSession,
+        *,
+        project_id: Optional[int] = None,
+        execution_id: Optional[int] = None,
+        since: Optional[datetime] = None
+    ) -> List[Any]:
+        """获取有耗时记录的步骤结果的操作、总耗时和各阶段耗时"""
+        query = select(
+            TestStepResult.action,
+            TestStepResult.duration,
+            TestStepResult.timings
+        ).where(TestStepResult.timings.isnot(None))
+        if execution_id is not None:
+            query = query.where(TestStepResult.execution_id == execution_id)
+        if project_id is not None:
+            query = query.join(TestExecution, TestStepResult.execution_id == TestExecution.id).where(
+                TestExecution.project_id == project_id
+            )
+        if since is not None:
+            query = query.where(TestStepResult.created_at >= since)
+        result = await db.execute(query)
+        return result.all()
+    
+    async def get_checkpoint(
+        self,
+        db: AsyncSession,
+        execution_id: int
+    ) -> Optional[ExecutionCheckpoint]:
+        """获取执行检查点"""
+        query = select(ExecutionCheckpoint).where(
+            ExecutionCheckpoint.execution_id == execution_id
+        )
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+    
+    async def save_checkpoint(
+        self,
+        db: AsyncSession,
+        execution_id: int,
+        data: Dict[str, Any]
+    ) -> ExecutionCheckpoint:
+        """创建或更新执行检查点"""
+        db_obj = await self.get_checkpoint(db, execution_id)
+        if not db_obj:
+            db_obj = ExecutionCheckpoint(execution_id=execution_id)
+            db.add(db_obj)
+        for field in data:
+            setattr(db_obj, field, data[field])
+        await db.commit()
+        return db_obj
+    
+    async def delete_checkpoint(
+        self,
+        db: AsyncSession,
+        execution_id: int
+    ) -> None:
+        """删除执行检查点"""
+        db_obj = await self.get_checkpoint(db, execution_id)
+        if db_obj:
+            await db.delete(db_obj)
+            await db.commit()
+    
     async def get_step_results(
         self,
         db: AsyncSession,
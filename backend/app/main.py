@@ -1,7 +1,11 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.services.execution_queue import execution_queue
+from app.services.device_presence import device_presence
+from app.utils.device_manager import DeviceManager
 
 app = FastAPI(
     title="UI自动化测试平台",
@@ -21,6 +25,33 @@ app.add_middleware(
 # 注册路由
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def resume_execution_queue():
+    """恢复执行队列中未完成的待执行记录"""
+    await execution_queue.resume()
+
+@app.on_event("startup")
+async def start_device_presence():
+    """启动设备在线状态跟踪"""
+    if settings.DEVICE_PRESENCE_TRACKING:
+        device_presence.start()
+
+@app.on_event("shutdown")
+async def stop_device_presence():
+    """停止设备在线状态跟踪"""
+    await device_presence.stop()
+
+@app.on_event("startup")
+async def warm_up_sessions():
+    """为已配置设备预先创建驱动会话"""
+    if settings.SESSION_POOL_WARMUP:
+        asyncio.ensure_future(DeviceManager.warm_up())
+
+@app.on_event("shutdown")
+async def release_sessions():
+    """关闭会话池中的全部驱动会话"""
+    await DeviceManager.release_all_devices()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
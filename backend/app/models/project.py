@@ -89,6 +89,10 @@ class TestExecution(Base):
     end_time = Column(DateTime)
     duration = Column(Integer)  # 执行时长（秒）
     error_message = Column(Text)
+    row_results = Column(JSON)  # 数据驱动逐行结果汇总
+    priority = Column(Enum(TestPriority), default=TestPriority.P2)  # 排队优先级，取自测试用例
+    estimated_duration = Column(Integer)  # 预计执行时长（秒）
+    queued_at = Column(DateTime)  # 进入队列时间
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -97,6 +101,7 @@ class TestExecution(Base):
     test_case = relationship("TestCase", back_populates="executions")
     test_suite = relationship("TestSuite", back_populates="executions")
     step_results = relationship("TestStepResult", back_populates="execution")
+    checkpoint = relationship("ExecutionCheckpoint", back_populates="execution", uselist=False)
 
 class TestStepResult(Base):
     """测试步骤结果模型"""
@@ -111,11 +116,29 @@ class TestStepResult(Base):
     status = Column(Enum(TestStepStatus), default=TestStepStatus.PENDING, nullable=False)
     message = Column(Text)
     screenshot = Column(String(500))  # 截图路径
+    duration = Column(Integer)  # 步骤总耗时（毫秒）
+    timings = Column(JSON)  # 各阶段耗时（毫秒）：locate、action、assertion、screenshot、persist
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # 关联
     execution = relationship("TestExecution", back_populates="step_results")
 
+class ExecutionCheckpoint(Base):
+    """执行检查点模型"""
+    __tablename__ = "execution_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    execution_id = Column(Integer, ForeignKey("test_executions.id"), nullable=False, unique=True)
+    last_row = Column(Integer, default=-1, nullable=False)  # 最后完成的数据行，-1表示没有
+    last_step = Column(Integer, default=-1, nullable=False)  # 当前行中最后完成的步骤序号
+    completed_rows = Column(JSON)  # 分片执行时已完成的数据行
+    variables = Column(JSON)  # 变量快照
+    device_id = Column(String(100))  # 写入检查点的设备
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # 关联
+    execution = relationship("TestExecution", back_populates="checkpoint")
+
 # 测试套件和测试用例的多对多关系表
 test_suite_cases = Table(
     "test_suite_cases",
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel
 
 from enum import Enum
@@ -93,6 +93,8 @@ class TestStepResultBase(BaseModel):
     status: TestStepStatus
     message: Optional[str] = None
     screenshot: Optional[str] = None
+    duration: Optional[int] = None
+    timings: Optional[Dict[str, float]] = None
 
 class TestStepResultCreate(TestStepResultBase):
     execution_id: int
@@ -13,6 +13,7 @@ class TestStepResultBase(BaseModel):
     end_time: Optional[datetime] = Field(None, description="结束时间")
     error_message: Optional[str] = Field(None, description="错误信息")
     screenshot_path: Optional[str] = Field(None, description="截图路径")
+    timings: Optional[Dict[str, float]] = Field(None, description="各阶段耗时（毫秒）")
     logs: Optional[List[str]] = Field(None, description="日志列表")
 
 class TestStepResultCreate(TestStepResultBase):
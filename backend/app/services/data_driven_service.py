@@ -10,6 +10,7 @@ from app.core.exceptions import (
     DataParameterError,
     TestExecutionError
 )
+from app.core.data_sharding import run_sharded, merge_row_results
 from app.models.project import TestExecution, TestCase
 from app.schemas.project import TestStep
 
@@ -79,6 +80,63 @@ class DataDrivenService:
             if self.data_driven:
                 self.data_driven.cleanup_data()
                 
+    async def execute_sharded_data_driven_test(
+        self,
+        test_case: TestCase,
+        data_source_path: str,
+        data_schema: Dict[str, Any],
+        engines: List[TestEngine]
+    ) -> TestExecution:
+        """
+        分片执行数据驱动测试：数据行分发到多个设备的执行引擎并发执行，结果合并为一条执行记录
+        
+        Args:
+            test_case: 测试用例
+            data_source_path: 数据源文件路径
+            data_schema: 数据模式
+            engines: 执行引擎列表，每个引擎绑定一台设备
+            
+        Returns:
+            TestExecution: 合并后的测试执行记录，逐行结果保存在row_results中
+        """
+        if not engines:
+            raise TestExecutionError("分片执行至少需要一个执行引擎")
+        try:
+            # 创建数据驱动测试实例
+            self.data_driven = DataDrivenTest(data_source_path)
+            self.data_driven.load_data()
+            self.data_driven.validate_data(data_schema)
+            
+            async def run_row(engine: TestEngine, index: int, data: Dict[str, Any]) -> None:
+                # 按行参数化，不依赖共享的当前行
+                await engine.execute_test_case(self.parameterize_test_case(test_case, data))
+            
+            start_time = datetime.now()
+            summary = merge_row_results(
+                await run_sharded(self.data_driven.get_test_data(), engines, run_row)
+            )
+            end_time = datetime.now()
+            
+            return TestExecution(
+                project_id=test_case.project_id,
+                test_case_id=test_case.id,
+                device_id=",".join(str(engine.executor.device_id) for engine in engines),
+                status="passed" if summary["status"] == "passed" else "failed",
+                start_time=start_time,
+                end_time=end_time,
+                duration=int((end_time - start_time).total_seconds()),
+                error_message=summary["error_message"],
+                row_results=summary
+            )
+            
+        except Exception as e:
+            logger.error(f"分片执行数据驱动测试失败: {str(e)}")
+            raise TestExecutionError(f"分片执行数据驱动测试失败: {str(e)}")
+            
+        finally:
+            if self.data_driven:
+                self.data_driven.cleanup_data()
+                
     def parameterize_test_case(self, test_case: TestCase, data: Dict[str, Any]) -> TestCase:
         """
         参数化测试用例
@@ -125,7 +183,7 @@ class DataDrivenService:
             # 创建测试步骤副本
             parameterized_step = TestStep(
                 action=step.action,
-                value=self.data_driven.parameterize(step.value) if step.value else None
+                value=self.data_driven.parameterize(step.value, data) if step.value else None
             )
             
             return parameterized_step
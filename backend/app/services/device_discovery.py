@@ -0,0 +1,297 @@
+import re
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import logger
+
+# getprop输出格式：[ro.product.model]: [Pixel 7]
+GETPROP_PATTERN = re.compile(r"^\[(?P<key>[^\]]+)\]:\s*\[(?P<value>.*)\]\s*$")
+# 一次adb shell调用中分隔getprop和wm size输出的标记
+SECTION_MARKER = "__autoui_wm_size__"
+
+async def run_command(*args: str, timeout: float = 10.0) -> Tuple[str, str]:
+    """
+    运行命令并返回输出，超时时结束进程
+    
+    Args:
+        *args: 命令及参数，不经过本地shell
+        timeout: 超时时间（秒）
+    
+    Returns:
+        Tuple[str, str]: 标准输出和标准错误
+    
+    Raises:
+        asyncio.TimeoutError: 命令超时
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+def parse_getprop(output: str) -> Dict[str, str]:
+    """
+    解析getprop的全部输出
+    
+    Args:
+        output: getprop输出
+    
+    Returns:
+        Dict[str, str]: 属性名到属性值
+    """
+    props = {}
+    for line in output.splitlines():
+        match = GETPROP_PATTERN.match(line.strip())
+        if match:
+            props[match.group("key")] = match.group("value")
+    return props
+
+def parse_wm_size(output: str) -> str:
+    """
+    解析wm size输出，存在覆盖分辨率时优先使用
+    
+    Args:
+        output: wm size输出，如 Physical size: 1080x2400
+    
+    Returns:
+        str: 分辨率，如 1080x2400
+    """
+    sizes = {}
+    for line in output.splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            sizes[key.strip().lower()] = value.strip()
+    return sizes.get("override size") or sizes.get("physical size") or output.strip()
+
+def parse_ideviceinfo(output: str) -> Dict[str, str]:
+    """
+    解析ideviceinfo的全部输出
+    
+    Args:
+        output: ideviceinfo输出，每行 Key: Value
+    
+    Returns:
+        Dict[str, str]: 键到值，只保留顶层键
+    """
+    info = {}
+    for line in output.splitlines():
+        if line.startswith(" ") or ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        info[key.strip()] = value.strip()
+    return info
+
+class DeviceDiscovery:
+    """设备发现：并发探测各设备，每台设备一次命令取全部属性，结果按TTL缓存"""
+    
+    def __init__(
+        self,
+        concurrency: int = settings.DEVICE_PROBE_CONCURRENCY,
+        ttl: float = settings.DEVICE_INFO_TTL,
+        timeout: float = settings.DEVICE_PROBE_TIMEOUT
+    ):
+        """
+        初始化设备发现
+        
+        Args:
+            concurrency: 同时探测的设备数上限，避免大量adb/usbmuxd连接同时建立
+            ttl: 设备属性缓存时间（秒）
+            timeout: 单条命令超时时间（秒）
+        """
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._probing: Dict[str, asyncio.Future] = {}
+        self._probes = 0
+        self._hits = 0
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 在事件循环内创建，模块导入时还没有事件循环
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+    
+    async def _cached(self, key: str, probe: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存，过期时探测；同一设备的并发探测只执行一次
+        
+        Args:
+            key: 缓存键
+            probe: 探测协程函数
+        
+        Returns:
+            Optional[Dict[str, Any]]: 设备属性，探测失败时为None
+        """
+        entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._hits += 1
+            return entry[1]
+        if key in self._probing:
+            return await asyncio.shield(self._probing[key])
+        
+        async def run() -> Optional[Dict[str, Any]]:
+            try:
+                async with self._get_semaphore():
+                    self._probes += 1
+                    info = await probe()
+                # 探测失败不缓存，下次发现时重试
+                if info is not None:
+                    self._cache[key] = (time.monotonic() + self.ttl, info)
+                return info
+            finally:
+                self._probing.pop(key, None)
+        
+        self._probing[key] = asyncio.ensure_future(run())
+        return await asyncio.shield(self._probing[key])
+    
+    async def list_android_serials(self) -> List[str]:
+        """
+        列出已授权且在线的Android设备
+        
+        Returns:
+            List[str]: 设备序列号列表
+        """
+        stdout, stderr = await run_command("adb", "devices", timeout=self.timeout)
+        serials = []
+        for line in stdout.splitlines()[1:]:  # 跳过第一行
+            parts = line.split()
+            # offline、unauthorized状态的设备无法读取属性
+            if len(parts) >= 2 and parts[1] == "device":
+                serials.append(parts[0])
+        if not serials and stderr.strip():
+            logger.error(f"Android设备检测错误: {stderr.strip()}")
+        return serials
+    
+    async def list_ios_udids(self) -> List[str]:
+        """
+        列出已连接的iOS设备
+        
+        Returns:
+            List[str]: 设备UDID列表
+        """
+        stdout, stderr = await run_command("idevice_id", "-l", timeout=self.timeout)
+        udids = [line.strip() for line in stdout.splitlines() if line.strip()]
+        if not udids and stderr.strip():
+            logger.error(f"iOS设备检测错误: {stderr.strip()}")
+        return udids
+    
+    async def get_android_info(self, serial: str) -> Optional[Dict[str, Any]]:
+        """
+        获取Android设备属性，一次adb shell调用读取全部getprop和屏幕分辨率
+        
+        Args:
+            serial: 设备序列号
+        
+        Returns:
+            Optional[Dict[str, Any]]: 型号、版本、分辨率等属性，失败时为None
+        """
+        async def probe() -> Optional[Dict[str, Any]]:
+            try:
+                stdout, _ = await run_command(
+                    "adb", "-s", serial, "shell", f"getprop; echo {SECTION_MARKER}; wm size",
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                logger.error(f"获取Android设备 {serial} 信息异常: {str(e)}")
+                return None
+            props_output, _, size_output = stdout.partition(SECTION_MARKER)
+            props = parse_getprop(props_output)
+            if not props:
+                return None
+            return {
+                "model": props.get("ro.product.model", ""),
+                "manufacturer": props.get("ro.product.manufacturer", ""),
+                "version": props.get("ro.build.version.release", ""),
+                "sdk": props.get("ro.build.version.sdk", ""),
+                "abi": props.get("ro.product.cpu.abi", ""),
+                "resolution": parse_wm_size(size_output)
+            }
+        return await self._cached(f"android:{serial}", probe)
+    
+    async def get_ios_info(self, udid: str) -> Optional[Dict[str, Any]]:
+        """
+        获取iOS设备属性，一次ideviceinfo调用读取全部键
+        
+        Args:
+            udid: 设备UDID
+        
+        Returns:
+            Optional[Dict[str, Any]]: 名称、版本、分辨率等属性，失败时为None
+        """
+        async def probe() -> Optional[Dict[str, Any]]:
+            try:
+                stdout, _ = await run_command("ideviceinfo", "-u", udid, timeout=self.timeout)
+            except Exception as e:
+                logger.error(f"获取iOS设备 {udid} 信息异常: {str(e)}")
+                return None
+            info = parse_ideviceinfo(stdout)
+            if not info:
+                return None
+            return {
+                "name": info.get("DeviceName", ""),
+                "version": info.get("ProductVersion", ""),
+                "product_type": info.get("ProductType", ""),
+                "resolution": info.get("ScreenResolution", "")
+            }
+        return await self._cached(f"ios:{udid}", probe)
+    
+    async def discover_android(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        并发探测全部Android设备
+        
+        Returns:
+            List[Tuple[str, Dict[str, Any]]]: (序列号, 属性) 列表，探测失败的设备不在其中
+        """
+        serials = await self.list_android_serials()
+        infos = await asyncio.gather(*[self.get_android_info(serial) for serial in serials])
+        return [(serial, info) for serial, info in zip(serials, infos) if info]
+    
+    async def discover_ios(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        并发探测全部iOS设备
+        
+        Returns:
+            List[Tuple[str, Dict[str, Any]]]: (UDID, 属性) 列表，探测失败的设备不在其中
+        """
+        udids = await self.list_ios_udids()
+        infos = await asyncio.gather(*[self.get_ios_info(udid) for udid in udids])
+        return [(udid, info) for udid, info in zip(udids, infos) if info]
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        清除缓存
+        
+        Args:
+            key: 设备序列号或UDID，为空时清除全部
+        """
+        if key is None:
+            self._cache.clear()
+            return
+        self._cache.pop(f"android:{key}", None)
+        self._cache.pop(f"ios:{key}", None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取探测统计
+        
+        Returns:
+            Dict[str, Any]: 缓存设备数、探测次数和缓存命中次数
+        """
+        return {
+            "cached": len(self._cache),
+            "probes": self._probes,
+            "cache_hits": self._hits
+        }
+
+# 全局设备发现实例
+device_discovery = DeviceDiscovery() 
\ No newline at end of file
@@ -0,0 +1,283 @@
+import asyncio
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import and_, case, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.deps import async_session_factory
+from app.core.enums.device import DeviceStatus, DeviceType
+from app.core.logger import logger
+from app.models.device import Device
+from app.services.device_discovery import run_command
+
+# 设备配置中保存设备标识的字段
+IDENTIFIER_FIELDS = {DeviceType.ANDROID: "serial", DeviceType.IOS: "udid"}
+# 设备出现时只恢复离线或未知状态，不覆盖占用中、维护中的状态
+RECOVERABLE_STATUSES = (DeviceStatus.OFFLINE, DeviceStatus.UNKNOWN)
+
+def parse_track_devices(buffer: bytes) -> Tuple[Optional[Dict[str, str]], bytes]:
+    """
+    从adb track-devices输出中取出一条完整的设备列表消息
+    
+    每条消息是4位十六进制长度加上 序列号\\t状态 行，每次变化都发送完整列表。
+    
+    Args:
+        buffer: 已读取但未解析的输出
+    
+    Returns:
+        Tuple[Optional[Dict[str, str]], bytes]: 序列号到状态（消息不完整时为None）和剩余的输出
+    
+    Raises:
+        ValueError: 长度前缀不是十六进制
+    """
+    if len(buffer) < 4:
+        return None, buffer
+    length = int(buffer[:4], 16)
+    if len(buffer) < 4 + length:
+        return None, buffer
+    states = {}
+    for line in buffer[4:4 + length].decode(errors="replace").splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            states[parts[0]] = parts[1]
+    return states, buffer[4 + length:]
+
+class DevicePresenceTracker:
+    """设备在线状态跟踪：一个长连接监听Android设备变化，定期一次命令列出iOS设备，只批量写入变化的状态"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        ios_interval: float = settings.IOS_PRESENCE_INTERVAL,
+        debounce: float = 0.2,
+        restart_delay: float = 1.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0
+    ):
+        """
+        初始化设备在线状态跟踪
+        
+        Args:
+            session_factory: 数据库会话工厂
+            ios_interval: 列出iOS设备的间隔（秒）
+            debounce: 变化写入前的合并等待时间（秒），设备批量插拔时合并为一次写入
+            restart_delay: adb track-devices退出后重新连接的等待时间（秒）
+            retry_delay: 写入失败后第一次重试的等待时间（秒），之后每次失败加倍
+            max_retry_delay: 写入重试的最长等待时间（秒）
+        """
+        self.session_factory = session_factory
+        self.ios_interval = ios_interval
+        self.debounce = debounce
+        self.restart_delay = restart_delay
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # 各平台当前在线的设备标识，未收到第一次列表前为None
+        self._present: Dict[DeviceType, Optional[Set[str]]] = {DeviceType.ANDROID: None, DeviceType.IOS: None}
+        self._pending: Dict[Tuple[DeviceType, str], bool] = {}
+        self._excluded: Set[str] = set()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._updates = 0
+        self._writes = 0
+        self._write_failures = 0
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+    
+    def start(self) -> None:
+        """启动Android设备监听和iOS设备轮询"""
+        if self._tasks:
+            return
+        self._tasks = {
+            "android": asyncio.ensure_future(self._track_android()),
+            "ios": asyncio.ensure_future(self._poll_ios())
+        }
+        logger.info("设备在线状态跟踪已启动")
+    
+    async def stop(self) -> None:
+        """停止跟踪并写入尚未写入的变化"""
+        tasks = list(self._tasks.values())
+        self._tasks = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+    
+    def exclude(self, device_id: str) -> None:
+        """不再更新指定设备的状态"""
+        self._excluded.add(device_id)
+    
+    def include(self, device_id: str) -> None:
+        """恢复更新指定设备的状态"""
+        self._excluded.discard(device_id)
+    
+    async def _track_android(self) -> None:
+        """消费adb track-devices输出，adb服务重启或命令退出后重新连接"""
+        while True:
+            proc = None
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    "adb", "track-devices",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                buffer = b""
+                while True:
+                    chunk = await proc.stdout.read(4096)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    while True:
+                        states, buffer = parse_track_devices(buffer)
+                        if states is None:
+                            break
+                        self.update(
+                            DeviceType.ANDROID,
+                            (serial for serial, state in states.items() if state == "device")
+                        )
+            except asyncio.CancelledError:
+                raise
+            except FileNotFoundError:
+                logger.info("未安装adb，不跟踪Android设备")
+                return
+            except Exception as e:
+                logger.error(f"Android设备监听异常: {str(e)}")
+            finally:
+                if proc is not None and proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+            await asyncio.sleep(self.restart_delay)
+    
+    async def _poll_ios(self) -> None:
+        """定期一次列出全部iOS设备"""
+        while True:
+            try:
+                stdout, _ = await run_command("idevice_id", "-l", timeout=settings.DEVICE_PROBE_TIMEOUT)
+                self.update(DeviceType.IOS, (line.strip() for line in stdout.splitlines() if line.strip()))
+            except asyncio.CancelledError:
+                raise
+            except FileNotFoundError:
+                logger.info("未安装libimobiledevice，不跟踪iOS设备")
+                return
+            except Exception as e:
+                logger.error(f"iOS设备列表获取异常: {str(e)}")
+            await asyncio.sleep(self.ios_interval)
+    
+    def update(self, platform: DeviceType, present: Iterable[str]) -> None:
+        """
+        与上一次的设备列表比较，记录变化并安排写入
+        
+        Args:
+            platform: 设备平台
+            present: 当前在线的设备标识
+        """
+        current = set(present)
+        previous = self._present[platform]
+        self._present[platform] = current
+        if previous is None:
+            # 第一次列表：列表中的设备上线，数据库中其余设备在写入时置为离线
+            changes = {identifier: True for identifier in current}
+            changes[None] = False
+        else:
+            changes = {identifier: True for identifier in current - previous}
+            changes.update({identifier: False for identifier in previous - current})
+        if not changes:
+            return
+        for identifier, online in changes.items():
+            self._pending[(platform, identifier)] = online
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_later())
+    
+    async def _flush_later(self) -> None:
+        """合并等待后写入，失败时按指数退避重试，直到写入成功，期间的新变化一起写入"""
+        delay = self.debounce
+        retry_delay = self.retry_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                return
+            except Exception as e:
+                self._write_failures += 1
+                logger.error(f"设备状态写入失败, {retry_delay:.1f} 秒后重试: {str(e)}")
+                delay = retry_delay
+                retry_delay = min(retry_delay * 2, self.max_retry_delay)
+    
+    async def flush(self) -> int:
+        """
+        将累积的状态变化一次写入数据库
+        
+        Returns:
+            int: 状态发生变化的设备数
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with self.session_factory() as db:
+                rows = (await db.execute(
+                    select(Device.id, Device.type, Device.config)
+                    .where(Device.type.in_(list(IDENTIFIER_FIELDS)))
+                )).all()
+                statuses: Dict[str, DeviceStatus] = {}
+                for device_id, device_type, config in rows:
+                    if device_id in self._excluded:
+                        continue
+                    identifier = (config or {}).get(IDENTIFIER_FIELDS[device_type])
+                    online = pending.get((device_type, identifier))
+                    if online is None and (device_type, None) in pending:
+                        # 第一次列表中没有的设备
+                        online = identifier in (self._present[device_type] or set())
+                    if online is not None:
+                        statuses[device_id] = DeviceStatus.ONLINE if online else DeviceStatus.OFFLINE
+                if not statuses:
+                    return 0
+                online_ids = [device_id for device_id, status in statuses.items() if status == DeviceStatus.ONLINE]
+                offline_ids = [device_id for device_id, status in statuses.items() if status == DeviceStatus.OFFLINE]
+                result = await db.execute(
+                    update(Device)
+                    .where(or_(
+                        and_(Device.id.in_(online_ids), Device.status.in_(RECOVERABLE_STATUSES)),
+                        and_(Device.id.in_(offline_ids), Device.status != DeviceStatus.OFFLINE)
+                    ))
+                    # 状态值按列的枚举类型绑定，与ORM写入的存储形式一致
+                    .values(status=case(
+                        {device_id: literal(status, Device.status.type) for device_id, status in statuses.items()},
+                        value=Device.id
+                    ))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception:
+            # 写入失败时放回，由写入协程重试时与新的变化一起写入
+            for key, online in pending.items():
+                self._pending.setdefault(key, online)
+            raise
+        self._writes += 1
+        self._updates += result.rowcount or 0
+        if result.rowcount:
+            logger.info(f"设备状态更新: {result.rowcount} 台")
+        return result.rowcount or 0
+    
+    def get_stats(self) -> Dict[str, object]:
+        """
+        获取跟踪统计
+        
+        Returns:
+            Dict[str, object]: 各平台在线设备数、写入次数和更新的设备数
+        """
+        return {
+            "running": self.running,
+            "android_online": len(self._present[DeviceType.ANDROID] or ()),
+            "ios_online": len(self._present[DeviceType.IOS] or ()),
+            "pending": len(self._pending),
+            "writes": self._writes,
+            "write_failures": self._write_failures,
+            "updated": self._updates
+        }
+
+# 全局设备在线状态跟踪
+device_presence = DevicePresenceTracker() 
\ No newline at end of file
@@ -10,6 +10,8 @@ from app.models.device import Device, DeviceType, DeviceStatus
 from app.schemas.device import DeviceCreate, DevicePropertyCreate, DeviceUpdate, DeviceResponse
 from app.core.logger import logger
 from app.core.enums.device import DeviceType, DeviceStatus
+from app.services.device_discovery import device_discovery
+from app.services.device_presence import device_presence
 
 
 logger = logging.getLogger(__name__)
@@ -17,7 +19,6 @@ logger = logging.getLogger(__name__)
 class DeviceService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self._device_monitors = {}  # 设备监控任务字典
 
     async def get_devices(
         self,
@@ -50,59 +51,27 @@ class DeviceService:
         return result.scalars().all()
 
     async def detect_devices(self) -> List[Device]:
-        """检测所有可用设备"""
-        detected_devices = []
-        
-        # 检测Android设备
-        android_devices = await self._detect_android_devices()
-        detected_devices.extend(android_devices)
-        
-        # 检测iOS设备
-        ios_devices = await self._detect_ios_devices()
-        detected_devices.extend(ios_devices)
-        
-        # 检测Web浏览器
-        web_browsers = await self._detect_web_browsers()
-        detected_devices.extend(web_browsers)
-        
-        return detected_devices
+        """检测所有可用设备，Android、iOS和Web同时检测"""
+        detected = await asyncio.gather(
+            self._detect_android_devices(),
+            self._detect_ios_devices(),
+            self._detect_web_browsers()
+        )
+        return [device_create for devices in detected for device_create in devices]
 
     async def _detect_android_devices(self) -> List[Device]:
-        """检测Android设备"""
+        """检测Android设备，各设备并发探测，属性在缓存有效期内不重复读取"""
         try:
-            # 使用adb命令检测设备
-            proc = await asyncio.create_subprocess_shell(
-                "adb devices",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await proc.communicate()
-            
-            if stderr:
-                logger.error(f"Android设备检测错误: {stderr.decode()}")
-                return []
-            
             devices = []
-            for line in stdout.decode().splitlines()[1:]:  # 跳过第一行
-                if line.strip():
-                    serial = line.split()[0]
-                    if serial != "List":
-                        # 获取设备详细信息
-                        device_info = await self._get_android_device_info(serial)
-                        if device_info:
-                            # 创建设备
-                            device_create = DeviceCreate(
-                                name=device_info["model"],
-                                type=DeviceType.ANDROID,
-                                status=DeviceStatus.ONLINE,
-                                config={
-                                    "serial": serial,
-                                    "model": device_info["model"],
-                                    "version": device_info["version"],
-                                    "resolution": device_info["resolution"]
-                                }
-                            )
-                            devices.append(device_create)
+            for serial, device_info in await device_discovery.discover_android():
+                # 创建设备
+                device_create = DeviceCreate(
+                    name=device_info["model"],
+                    type=DeviceType.ANDROID,
+                    status=DeviceStatus.ONLINE,
+                    config={"serial": serial, **device_info}
+                )
+                devices.append(device_create)
             
             return devices
         except Exception as e:
@@ -111,77 +80,21 @@ class DeviceService:
 
     async def _get_android_device_info(self, serial: str) -> Optional[Dict]:
         """获取Android设备详细信息"""
-        try:
-            # 获取设备型号
-            model_proc = await asyncio.create_subprocess_shell(
-                f"adb -s {serial} shell getprop ro.product.model",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            model_stdout, _ = await model_proc.communicate()
-            model = model_stdout.decode().strip()
-            
-            # 获取Android版本
-            version_proc = await asyncio.create_subprocess_shell(
-                f"adb -s {serial} shell getprop ro.build.version.release",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            version_stdout, _ = await version_proc.communicate()
-            version = version_stdout.decode().strip()
-            
-            # 获取屏幕分辨率
-            resolution_proc = await asyncio.create_subprocess_shell(
-                f"adb -s {serial} shell wm size",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            resolution_stdout, _ = await resolution_proc.communicate()
-            resolution = resolution_stdout.decode().strip()
-            
-            return {
-                "model": model,
-                "version": version,
-                "resolution": resolution
-            }
-        except Exception as e:
-            logger.error(f"获取Android设备信息异常: {str(e)}")
-            return None
+        return await device_discovery.get_android_info(serial)
 
     async def _detect_ios_devices(self) -> List[Device]:
-        """检测iOS设备"""
+        """检测iOS设备，各设备并发探测，属性在缓存有效期内不重复读取"""
         try:
-            # 使用libimobiledevice检测设备
-            proc = await asyncio.create_subprocess_shell(
-                "idevice_id -l",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await proc.communicate()
-            
-            if stderr:
-                logger.error(f"iOS设备检测错误: {stderr.decode()}")
-                return []
-            
             devices = []
-            for udid in stdout.decode().splitlines():
-                if udid.strip():
-                    # 获取设备详细信息
-                    device_info = await self._get_ios_device_info(udid)
-                    if device_info:
-                        # 创建设备
-                        device_create = DeviceCreate(
-                            name=device_info["name"],
-                            type=DeviceType.IOS,
-                            status=DeviceStatus.ONLINE,
-                            config={
-                                "udid": udid,
-                                "name": device_info["name"],
-                                "version": device_info["version"],
-                                "resolution": device_info["resolution"]
-                            }
-                        )
-                        devices.append(device_create)
+            for udid, device_info in await device_discovery.discover_ios():
+                # 创建设备
+                device_create = DeviceCreate(
+                    name=device_info["name"],
+                    type=DeviceType.IOS,
+                    status=DeviceStatus.ONLINE,
+                    config={"udid": udid, **device_info}
+                )
+                devices.append(device_create)
             
             return devices
         except Exception as e:
@@ -190,42 +103,7 @@ class DeviceService:
 
     async def _get_ios_device_info(self, udid: str) -> Optional[Dict]:
         """获取iOS设备详细信息"""
-        try:
-            # 获取设备名称
-            name_proc = await asyncio.create_subprocess_shell(
-                f"ideviceinfo -u {udid} -s DeviceName",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            name_stdout, _ = await name_proc.communicate()
-            name = name_stdout.decode().strip()
-            
-            # 获取iOS版本
-            version_proc = await asyncio.create_subprocess_shell(
-                f"ideviceinfo -u {udid} -s ProductVersion",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            version_stdout, _ = await version_proc.communicate()
-            version = version_stdout.decode().strip()
-            
-            # 获取屏幕分辨率
-            resolution_proc = await asyncio.create_subprocess_shell(
-                f"ideviceinfo -u {udid} -s ScreenResolution",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            resolution_stdout, _ = await resolution_proc.communicate()
-            resolution = resolution_stdout.decode().strip()
-            
-            return {
-                "name": name,
-                "version": version,
-                "resolution": resolution
-            }
-        except Exception as e:
-            logger.error(f"获取iOS设备信息异常: {str(e)}")
-            return None
+        return await device_discovery.get_ios_info(udid)
 
     async def _detect_web_browsers(self) -> List[Device]:
         """检测Web浏览器"""
@@ -252,93 +130,17 @@ class DeviceService:
         return [DeviceCreate(**browser) for browser in browsers]
 
     async def start_device_monitor(self, device_id: int):
-        """启动设备监控"""
-        if device_id in self._device_monitors:
-            return
-        
+        """启动设备监控，设备状态由全局在线状态跟踪更新"""
         device_obj = await device.get(self.db, id=device_id)
         if not device_obj:
             raise ValueError("设备不存在")
         
-        monitor_task = asyncio.create_task(self._monitor_device(device_id))
-        self._device_monitors[device_id] = monitor_task
+        device_presence.include(device_id)
+        device_presence.start()
 
     async def stop_device_monitor(self, device_id: int):
-        """停止设备监控"""
-        if device_id in self._device_monitors:
-            self._device_monitors[device_id].cancel()
-            del self._device_monitors[device_id]
-
-    async def _monitor_device(self, device_id: int):
-        """监控设备状态"""
-        try:
-            while True:
-                device_obj = await device.get(self.db, id=device_id)
-                if not device_obj:
-                    break
-                
-                # 检查设备状态
-                is_online = await self._check_device_status(device_obj)
-                if not is_online and device_obj.status != DeviceStatus.OFFLINE:
-                    await device.update_status(
-                        self.db,
-                        device_id=device_id,
-                        status=DeviceStatus.OFFLINE
-                    )
-                elif is_online and device_obj.status == DeviceStatus.OFFLINE:
-                    await device.update_status(
-                        self.db,
-                        device_id=device_id,
-                        status=DeviceStatus.ONLINE
-                    )
-                
-                await asyncio.sleep(30)  # 每30秒检查一次
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"设备监控异常: {str(e)}")
-
-    async def _check_device_status(self, device_obj: Device) -> bool:
-        """检查设备状态"""
-        try:
-            if device_obj.type == DeviceType.ANDROID:
-                # 检查Android设备
-                serial = next(
-                    (p.value for p in device_obj.properties if p.key == "serial"),
-                    None
-                )
-                if serial:
-                    proc = await asyncio.create_subprocess_shell(
-                        f"adb -s {serial} get-state",
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    stdout, _ = await proc.communicate()
-                    return stdout.decode().strip() == "device"
-            
-            elif device_obj.type == DeviceType.IOS:
-                # 检查iOS设备
-                udid = next(
-                    (p.value for p in device_obj.properties if p.key == "udid"),
-                    None
-                )
-                if udid:
-                    proc = await asyncio.create_subprocess_shell(
-                        f"ideviceinfo -u {udid} -s DeviceName",
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE
-                    )
-                    stdout, _ = await proc.communicate()
-                    return bool(stdout.decode().strip())
-            
-            elif device_obj.type == DeviceType.WEB:
-                # Web浏览器始终在线
-                return True
-            
-            return False
-        except Exception as e:
-            logger.error(f"检查设备状态异常: {str(e)}")
-            return False
+        """停止设备监控，在线状态跟踪不再更新该设备的状态"""
+        device_presence.exclude(device_id)
 
     async def add_device(
         self,
@@ -390,8 +192,7 @@ class DeviceService:
             raise ValueError(f"设备不存在: {device_id}")
         
         # 停止设备监控
-        if device_id in self._device_monitors:
-            await self.stop_device_monitor(device_id)
+        await self.stop_device_monitor(device_id)
         
         # 删除设备
         await device.remove(self.db, id=device_id)
@@ -0,0 +1,240 @@
+import time
+import asyncio
+import argparse
+import statistics
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import async_session_factory
+from app.core.driver_executor import driver_executors
+from app.core.simulated_driver import SimulatedDriver, SimulationProfile
+from app.core.test_engine import TestEngine
+from app.core.enums.project import TestStepStatus
+from app.models.project import TestStepResult
+
+def build_test_case(case_id: int, steps: int) -> Any:
+    """
+    生成演练用的测试用例，点击和输入交替，每步带一个可见性断言
+    
+    Args:
+        case_id: 用例ID
+        steps: 步骤数
+    
+    Returns:
+        Any: 与TestEngine使用的测试用例结构一致的对象
+    """
+    return SimpleNamespace(
+        id=case_id,
+        project_id=None,
+        device_id=f"simulated-{case_id}",
+        steps=[
+            SimpleNamespace(
+                id=index + 1,
+                step_number=index + 1,
+                name=f"step-{index + 1}",
+                action="input" if index % 2 else "click",
+                value=f"value-{index}",
+                locator={"type": "id", "value": f"element-{index}"},
+                target_locator=None,
+                assertions=[{"type": "visible", "locator": {"type": "id", "value": f"element-{index}"}}]
+            )
+            for index in range(steps)
+        ]
+    )
+
+async def monitor_loop_lag(stop: asyncio.Event, samples: List[float], interval: float = 0.01) -> None:
+    """
+    采样事件循环延迟：定时休眠，实际唤醒时间超出休眠时间的部分即为延迟
+    
+    Args:
+        stop: 停止采样的事件
+        samples: 采样结果（秒）
+        interval: 采样间隔（秒）
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - started - interval))
+
+async def run_simulated_execution(case_id: int, steps: int, profile: SimulationProfile) -> Dict[str, Any]:
+    """
+    使用模拟驱动执行一次测试用例
+    
+    Args:
+        case_id: 用例ID
+        steps: 步骤数
+        profile: 模拟配置
+    
+    Returns:
+        Dict[str, Any]: 执行耗时、模拟驱动耗时和是否成功
+    """
+    device_id = f"simulated-{case_id}"
+    driver = SimulatedDriver(profile)
+    engine = TestEngine(driver, device_id=device_id)
+    started = time.perf_counter()
+    passed = True
+    try:
+        await engine.execute_test_case(build_test_case(case_id, steps))
+    except Exception:
+        passed = False
+    finally:
+        elapsed = time.perf_counter() - started
+        driver_executors.release(device_id, wait=False)
+    return {
+        "elapsed": elapsed,
+        "simulated_seconds": driver.backend.simulated_seconds,
+        "steps": len(engine.step_results),
+        "driver_calls": sum(driver.backend.calls.values()),
+        "passed": passed
+    }
+
+async def run_level(concurrency: int, steps: int, profile: SimulationProfile, repeat: int = 1) -> Dict[str, Any]:
+    """
+    以指定并发数运行模拟执行
+    
+    Args:
+        concurrency: 并发执行数
+        steps: 每个用例的步骤数
+        profile: 模拟配置
+        repeat: 每个并发槽位依次执行的次数
+    
+    Returns:
+        Dict[str, Any]: 每分钟执行数、每步框架开销和事件循环延迟
+    """
+    stop = asyncio.Event()
+    lag: List[float] = []
+    monitor = asyncio.ensure_future(monitor_loop_lag(stop, lag))
+    
+    async def slot(index: int) -> List[Dict[str, Any]]:
+        return [
+            await run_simulated_execution(index * repeat + round_index, steps, profile)
+            for round_index in range(repeat)
+        ]
+    
+    started = time.perf_counter()
+    results = [result for batch in await asyncio.gather(*[slot(index) for index in range(concurrency)]) for result in batch]
+    wall = time.perf_counter() - started
+    stop.set()
+    await monitor
+    
+    executed_steps = sum(result["steps"] for result in results) or 1
+    overhead = sum(result["elapsed"] - result["simulated_seconds"] for result in results)
+    lag_ms = sorted(sample * 1000 for sample in lag) or [0.0]
+    return {
+        "concurrency": concurrency,
+        "executions": len(results),
+        "passed": sum(1 for result in results if result["passed"]),
+        "wall_seconds": round(wall, 3),
+        "executions_per_minute": round(len(results) / wall * 60, 2) if wall else 0.0,
+        "driver_calls_per_step": round(sum(result["driver_calls"] for result in results) / executed_steps, 2),
+        "step_overhead_ms": round(max(0.0, overhead) / executed_steps * 1000, 3),
+        "loop_lag_p95_ms": round(lag_ms[int(len(lag_ms) * 0.95) - 1 if len(lag_ms) > 1 else 0], 3),
+        "loop_lag_max_ms": round(lag_ms[-1], 3)
+    }
+
+async def measure_db_writes(
+    execution_id: int,
+    rows: int = 500,
+    batch_size: int = 50,
+    session_factory: Callable[[], AsyncSession] = async_session_factory
+) -> Dict[str, Any]:
+    """
+    测量步骤结果批量插入的开销，写入在事务内完成后回滚，不留下数据
+    
+    Args:
+        execution_id: 用于挂载步骤结果的已有执行记录ID
+        rows: 插入的总行数
+        batch_size: 每批行数，与StepResultBuffer的默认批量一致
+        session_factory: 数据库会话工厂
+    
+    Returns:
+        Dict[str, Any]: 每行和每批的写入耗时
+    """
+    payload = [
+        {
+            "execution_id": execution_id,
+            "step_number": index + 1,
+            "action": "click",
+            "element": f"id:element-{index}",
+            "status": TestStepStatus.PASSED,
+            "message": "步骤执行成功"
+        }
+        for index in range(rows)
+    ]
+    batches: List[float] = []
+    async with session_factory() as db:
+        try:
+            for offset in range(0, rows, batch_size):
+                started = time.perf_counter()
+                await db.execute(insert(TestStepResult), payload[offset:offset + batch_size])
+                await db.flush()
+                batches.append(time.perf_counter() - started)
+        finally:
+            await db.rollback()
+    total = sum(batches)
+    return {
+        "rows": rows,
+        "batch_size": batch_size,
+        "per_row_ms": round(total / rows * 1000, 3) if rows else 0.0,
+        "per_batch_ms": round(statistics.mean(batches) * 1000, 3) if batches else 0.0
+    }
+
+async def run_benchmark(
+    levels: Sequence[int] = (1, 10, 100),
+    steps: int = 20,
+    profile: Optional[SimulationProfile] = None,
+    repeat: int = 1,
+    execution_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    运行演练基准测试，衡量平台自身开销
+    
+    Args:
+        levels: 并发执行数列表
+        steps: 每个用例的步骤数
+        profile: 模拟配置，默认每次驱动调用50毫秒、不失败
+        repeat: 每个并发槽位依次执行的次数
+        execution_id: 已有执行记录ID，传入时测量数据库写入开销
+    
+    Returns:
+        Dict[str, Any]: 各并发数的结果及数据库写入开销
+    """
+    profile = profile or SimulationProfile(seed=0)
+    report = {
+        "profile": profile.to_dict(),
+        "steps": steps,
+        "levels": [await run_level(concurrency, steps, profile, repeat) for concurrency in levels],
+        "db_writes": None
+    }
+    if execution_id is not None:
+        report["db_writes"] = await measure_db_writes(execution_id)
+    return report
+
+def benchmark(**kwargs) -> Dict[str, Any]:
+    """同步运行演练基准测试，参数同run_benchmark"""
+    return asyncio.run(run_benchmark(**kwargs))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="模拟驱动演练基准测试")
+    parser.add_argument("--levels", default="1,10,100", help="并发执行数，逗号分隔")
+    parser.add_argument("--steps", type=int, default=20, help="每个用例的步骤数")
+    parser.add_argument("--repeat", type=int, default=1, help="每个并发槽位依次执行的次数")
+    parser.add_argument("--latency", type=float, default=0.05, help="每次驱动调用的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟随机浮动范围（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="每次驱动调用的失败概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--execution-id", type=int, default=None, help="测量数据库写入开销时使用的执行记录ID")
+    args = parser.parse_args()
+    print(benchmark(
+        levels=[int(level) for level in args.levels.split(",")],
+        steps=args.steps,
+        profile=SimulationProfile(
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            seed=args.seed
+        ),
+        repeat=args.repeat,
+        execution_id=args.execution_id
+    )) 
\ No newline at end of file
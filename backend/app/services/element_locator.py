@@ -1,6 +1,7 @@
 import asyncio
+import inspect
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from abc import ABC, abstractmethod
 from app.models.device import Device, DeviceType
 from appium.webdriver.common.appiumby import AppiumBy
@@ -14,6 +15,11 @@ from selenium.common.exceptions import (
 )
 from app.core.logger import logger
 from app.core.enums.locator import LocatorType
+from app.core.enums.element import LocatorStrategy
+from app.core.locator.snapshot import PageSnapshot, SnapshotMiss, xpath_literal
+from app.core.locator.batch import BATCH_FIND_SCRIPT, BATCH_SCRIPT_STRATEGIES, build_batch_specs
+from app.core.simulated_driver import AsyncSimulatedDriver, AsyncSimulatedElement
+from app.utils.locator_parser import parse_locator
 
 
 logger = logging.getLogger(__name__)
@@ -51,6 +57,38 @@ class ElementLocator(ABC):
         """获取元素树"""
         pass
     
+    async def get_page_source(self) -> Optional[Union[str, bytes]]:
+        """
+        获取页面源码，用于解析页面快照
+        
+        元素树为源码或 {"source": 源码} 时直接使用，没有元素树时读取驱动的page_source。
+        
+        Returns:
+            Optional[Union[str, bytes]]: 页面源码，获取失败时返回None
+        """
+        try:
+            tree = await self.get_element_tree()
+        except Exception as e:
+            logger.error(f"获取元素树失败: {str(e)}")
+            tree = None
+        if isinstance(tree, dict):
+            tree = tree.get("source")
+        if tree and isinstance(tree, (str, bytes)):
+            return tree
+        try:
+            return await self._read_page_source()
+        except Exception as e:
+            logger.error(f"获取页面源码失败: {str(e)}")
+            return None
+    
+    async def _read_page_source(self) -> Optional[Union[str, bytes]]:
+        """读取驱动的page_source，兼容同步和异步驱动"""
+        driver = getattr(self, "_driver", None)
+        if driver is None:
+            return None
+        source = driver.page_source
+        return await source if inspect.isawaitable(source) else source
+    
     @abstractmethod
     async def find_element(self, locator: Dict[str, Any]) -> Optional[Dict]:
         """查找元素"""
@@ -61,6 +99,38 @@ class ElementLocator(ABC):
         """查找多个元素"""
         pass
     
+    async def find_elements_batch(self, locators: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """
+        批量查找元素，默认逐个查找，子类可覆盖为一次调用
+        
+        Args:
+            locators: 定位器列表
+            
+        Returns:
+            List[Optional[Dict]]: 与locators一一对应的元素，未找到的位置为None。
+                每个元素为 {"id": 元素ID, "attributes": 属性}，id可传给click_element等方法，
+                只在页面快照中找到的元素没有id；attributes为查找时已读取的属性，未读取时为空
+        """
+        results = []
+        for locator in locators:
+            element = await self.find_element(locator)
+            results.append(await self._describe_element(element) if element is not None else None)
+        return results
+    
+    async def _describe_element(self, element: Any) -> Dict[str, Any]:
+        """
+        将find_element的结果转换为批量查找的元素结构
+        
+        Args:
+            element: find_element返回的元素
+            
+        Returns:
+            Dict[str, Any]: {"id": 元素ID, "attributes": 属性}
+        """
+        if isinstance(element, dict):
+            return {"id": element.get("id"), "attributes": dict(element)}
+        return {"id": getattr(element, "id", None), "attributes": {}}
+    
     @abstractmethod
     async def get_element_attributes(self, element_id: str) -> Dict[str, Any]:
         """获取元素属性"""
@@ -192,6 +262,39 @@ class AndroidElementLocator(ElementLocator):
             logger.error(f"查找多个元素失败: {str(e)}")
             return []
     
+    async def find_elements_batch(self, locators: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """只获取一次层级结构，在本地求值所有定位器"""
+        try:
+            snapshot = PageSnapshot(await self._uiautomator.dump_hierarchy())
+        except Exception as e:
+            logger.error(f"获取元素树失败: {str(e)}")
+            return await super().find_elements_batch(locators)
+        
+        results = []
+        for locator in locators:
+            xpath = _uiautomator_selector_to_xpath(locator)
+            try:
+                if not xpath:
+                    raise SnapshotMiss(f"无法转换的定位器: {locator}")
+                matches = snapshot.find_all(LocatorStrategy.XPATH, xpath)
+            except SnapshotMiss:
+                element = await self.find_element(locator)
+                results.append(await self._describe_element(element) if element is not None else None)
+                continue
+            results.append({"id": None, "attributes": dict(matches[0].node.attrib)} if matches else None)
+        return results
+    
+    async def _describe_element(self, element: Any) -> Dict[str, Any]:
+        """读取uiautomator元素的属性，与快照中找到的元素结构一致"""
+        if isinstance(element, dict):
+            return await super()._describe_element(element)
+        try:
+            attributes = await element.attributes()
+        except Exception as e:
+            logger.error(f"获取元素属性失败: {str(e)}")
+            attributes = {}
+        return {"id": getattr(element, "id", None), "attributes": attributes}
+    
     async def get_element_attributes(self, element_id: str) -> Dict[str, Any]:
         try:
             element = await self._uiautomator.element(element_id)
@@ -338,6 +441,12 @@ class IOSElementLocator(ElementLocator):
         if self._wda:
             await self._wda.quit()
     
+    async def _read_page_source(self) -> Optional[Union[str, bytes]]:
+        """读取WebDriverAgent的页面源码，WDA客户端为同步调用，在线程池中执行"""
+        if self._wda is None:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self._wda.source)
+    
     # TODO: 实现iOS元素定位器的其他方法
 
 class WebElementLocator(ElementLocator):
@@ -369,10 +478,164 @@ class WebElementLocator(ElementLocator):
         if self._driver:
             await self._driver.quit()
     
+    async def find_elements_batch(self, locators: List[Dict[str, Any]]) -> List[Optional[Dict]]:
+        """通过一次execute_script解析所有定位器"""
+        try:
+            pairs = [(LocatorStrategy(locator["type"]), locator["value"]) for locator in locators]
+        except (KeyError, ValueError):
+            return await super().find_elements_batch(locators)
+        if any(locator_type not in BATCH_SCRIPT_STRATEGIES for locator_type, _ in pairs):
+            return await super().find_elements_batch(locators)
+        
+        try:
+            elements = await self._driver.execute_script(BATCH_FIND_SCRIPT, build_batch_specs(pairs))
+        except Exception as e:
+            logger.error(f"批量查找元素失败: {str(e)}")
+            return [None] * len(locators)
+        return [
+            {"id": element.id, "attributes": {}} if element is not None else None
+            for element in (elements or [None] * len(locators))
+        ]
+    
     # TODO: 实现Web元素定位器的其他方法
 
+class SimulatedElementLocator(ElementLocator):
+    """模拟设备元素定位器，用于演练执行和吞吐量基准测试"""
+    
+    def __init__(self, device: AsyncSimulatedDriver):
+        super().__init__(device)
+        self._driver = device
+    
+    def _to_by(self, locator: Any) -> Tuple[str, str]:
+        """将 "定位方式:定位值" 字符串或 {"type", "value"} 字典转换为定位方式和定位值"""
+        if isinstance(locator, dict):
+            if "type" in locator:
+                return locator["type"], locator.get("value")
+            key, value = next(iter(locator.items()))
+            return key, value
+        return parse_locator(locator, AppiumBy.XPATH)
+    
+    async def _element(self, element_id: str) -> AsyncSimulatedElement:
+        element = self._driver.element(element_id)
+        if not element:
+            raise NoSuchElementException(f"元素不存在: {element_id}")
+        return element
+    
+    async def connect(self) -> bool:
+        return True
+    
+    async def disconnect(self):
+        await self._driver.quit()
+    
+    async def get_screen_size(self) -> Tuple[int, int]:
+        size = await self._driver.get_window_size()
+        return size["width"], size["height"]
+    
+    async def take_screenshot(self) -> bytes:
+        return await self._driver.get_screenshot_as_base64()
+    
+    async def get_element_tree(self) -> Dict:
+        return {"source": await self._driver.page_source}
+    
+    async def find_element(self, locator: Any) -> Optional[AsyncSimulatedElement]:
+        try:
+            return await self._driver.find_element(*self._to_by(locator))
+        except Exception as e:
+            logger.error(f"查找元素失败: {str(e)}")
+            return None
+    
+    async def find_elements(self, locator: Any) -> List[AsyncSimulatedElement]:
+        try:
+            return await self._driver.find_elements(*self._to_by(locator))
+        except Exception as e:
+            logger.error(f"查找多个元素失败: {str(e)}")
+            return []
+    
+    async def get_element_attributes(self, element_id: str) -> Dict[str, Any]:
+        element = await self._element(element_id)
+        return {"id": element.id, "text": await element.text}
+    
+    async def click_element(self, element_id: str) -> bool:
+        await (await self._element(element_id)).click()
+        return True
+    
+    async def input_text(self, element_id: str, text: str) -> bool:
+        await (await self._element(element_id)).send_keys(text)
+        return True
+    
+    async def clear_text(self, element_id: str) -> bool:
+        await (await self._element(element_id)).clear()
+        return True
+    
+    async def get_text(self, element_id: str) -> str:
+        return await (await self._element(element_id)).text
+    
+    async def is_element_displayed(self, element_id: str) -> bool:
+        return await (await self._element(element_id)).is_displayed()
+    
+    async def is_element_enabled(self, element_id: str) -> bool:
+        return await (await self._element(element_id)).is_enabled()
+    
+    async def get_element_location(self, element_id: str) -> Dict[str, int]:
+        await self._element(element_id)
+        return {"x": 0, "y": 0}
+    
+    async def get_element_size(self, element_id: str) -> Dict[str, int]:
+        await self._element(element_id)
+        return {"width": 100, "height": 40}
+    
+    async def scroll_to_element(self, element_id: str) -> bool:
+        await self._element(element_id)
+        return True
+    
+    async def wait_for_element(self, locator: Any, timeout: int = 10) -> Optional[AsyncSimulatedElement]:
+        return await self.find_element(locator)
+    
+    async def wait_for_element_disappear(self, locator: Any, timeout: int = 10) -> bool:
+        return False
+
+# uiautomator2 选择器参数与层级结构属性的对应关系
+_UIAUTOMATOR_ATTRIBUTES = {
+    "resourceId": "resource-id",
+    "text": "text",
+    "description": "content-desc",
+    "className": "class",
+    "packageName": "package",
+}
+
+_UIAUTOMATOR_CONTAINS_ATTRIBUTES = {
+    "textContains": "text",
+    "descriptionContains": "content-desc",
+}
+
+def _uiautomator_selector_to_xpath(locator: Dict[str, Any]) -> Optional[str]:
+    """
+    将uiautomator2选择器转换为XPath
+    
+    Args:
+        locator: uiautomator2选择器参数
+        
+    Returns:
+        Optional[str]: XPath表达式，包含无法转换的参数时返回None
+    """
+    if "xpath" in locator:
+        return locator["xpath"] if len(locator) == 1 else None
+    conditions = []
+    for key, value in locator.items():
+        if key in _UIAUTOMATOR_ATTRIBUTES:
+            conditions.append(f"@{_UIAUTOMATOR_ATTRIBUTES[key]}={xpath_literal(str(value))}")
+        elif key in _UIAUTOMATOR_CONTAINS_ATTRIBUTES:
+            conditions.append(f"contains(@{_UIAUTOMATOR_CONTAINS_ATTRIBUTES[key]}, {xpath_literal(str(value))})")
+        else:
+            return None
+    if not conditions:
+        return None
+    return f"//*[{' and '.join(conditions)}]"
+
 def create_element_locator(device: Device) -> Optional[ElementLocator]:
     """创建元素定位器"""
+    if isinstance(device, AsyncSimulatedDriver):
+        return SimulatedElementLocator(device)
     if device.type == DeviceType.ANDROID:
         return AndroidElementLocator(device)
     elif device.type == DeviceType.IOS:
@@ -772,7 +1035,7 @@ class ElementLocator:
             raise ValueError(f"不支持的定位方式: {self.locator_type}")
 
 
-def create_element_locator(
+def create_driver_locator(
     driver,
     locator_type: LocatorType,
     locator_value: str,
@@ -0,0 +1,185 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.deps import async_session_factory
+from app.core.enums.project import TestExecutionStatus
+from app.core.exceptions import ExecutionCancelledError, ExecutionTimeoutError
+from app.core.logger import logger
+from app.models.project import TestExecution
+
+class CancellationToken:
+    """执行取消令牌：本进程内直接通知，其他工作进程发起的停止通过轮询数据库状态发现"""
+    
+    def __init__(
+        self,
+        execution_id: int,
+        timeout: Optional[float] = None,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        poll_interval: float = settings.CANCEL_POLL_INTERVAL
+    ):
+        """
+        初始化取消令牌
+        
+        Args:
+            execution_id: 执行记录ID
+            timeout: 整次执行的时间预算（秒），为空时不限制
+            session_factory: 数据库会话工厂，轮询使用独立会话
+            poll_interval: 轮询数据库状态的间隔（秒）
+        """
+        self.execution_id = execution_id
+        self.timeout = timeout
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.reason: Optional[str] = None
+        self._event = asyncio.Event()
+        self._deadline: Optional[float] = None
+        self._watcher: Optional[asyncio.Task] = None
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def start(self) -> None:
+        """开始计时并启动数据库状态轮询"""
+        if self.timeout:
+            self._deadline = time.monotonic() + self.timeout
+        if self._watcher is None and self.poll_interval > 0:
+            self._watcher = asyncio.ensure_future(self._watch())
+    
+    async def close(self) -> None:
+        """停止数据库状态轮询，执行结束时调用"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+    
+    async def _watch(self) -> None:
+        """轮询执行状态，被其他工作进程置为已取消时通知本进程"""
+        while not self.cancelled:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                async with self.session_factory() as db:
+                    status = (await db.execute(
+                        select(TestExecution.status).where(TestExecution.id == self.execution_id)
+                    )).scalar_one_or_none()
+            except Exception as e:
+                logger.error(f"查询执行记录 {self.execution_id} 状态失败: {str(e)}")
+                continue
+            if status == TestExecutionStatus.CANCELLED:
+                self.cancel("执行已停止")
+    
+    def cancel(self, reason: str = "执行已停止") -> None:
+        """
+        取消执行，正在运行的步骤被中断
+        
+        Args:
+            reason: 取消原因
+        """
+        if not self.cancelled:
+            self.reason = reason
+            self._event.set()
+            logger.info(f"执行记录 {self.execution_id} 已取消: {reason}")
+    
+    def remaining(self) -> Optional[float]:
+        """
+        获取剩余时间预算
+        
+        Returns:
+            Optional[float]: 剩余秒数，不限制时为None
+        """
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+    
+    async def check(self) -> None:
+        """
+        检查是否可以继续执行，在步骤和数据行之间调用
+        
+        Raises:
+            ExecutionCancelledError: 执行已取消
+            ExecutionTimeoutError: 超出整次执行的时间预算
+        """
+        if self.cancelled:
+            raise ExecutionCancelledError(self.reason)
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise ExecutionTimeoutError(f"执行超出时间预算 {self.timeout} 秒")
+    
+    async def run(self, awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        在时间预算内运行，取消或超时时中断
+        
+        Args:
+            awaitable: 要运行的协程
+            timeout: 本次运行的时间预算（秒），与整次执行的剩余预算取较小值
+        
+        Returns:
+            Any: 协程的返回值
+        
+        Raises:
+            ExecutionCancelledError: 执行已取消
+            ExecutionTimeoutError: 超出时间预算
+        """
+        task = asyncio.ensure_future(awaitable)
+        try:
+            await self.check()
+        except Exception:
+            task.cancel()
+            raise
+        remaining = self.remaining()
+        limit = timeout
+        if remaining is not None and (limit is None or remaining < limit):
+            limit = remaining
+        waiter = asyncio.ensure_future(self._event.wait())
+        try:
+            done, _ = await asyncio.wait({task, waiter}, timeout=limit, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        if task in done:
+            return task.result()
+        # 驱动调用挂起时不等待其返回，中断后由调用方释放设备
+        task.cancel()
+        if self.cancelled:
+            raise ExecutionCancelledError(self.reason)
+        if limit == timeout:
+            raise ExecutionTimeoutError(f"步骤超出时间预算 {timeout} 秒")
+        raise ExecutionTimeoutError(f"执行超出时间预算 {self.timeout} 秒")
+
+class CancellationRegistry:
+    """本进程内运行中的执行的取消令牌"""
+    
+    def __init__(self):
+        self._tokens: Dict[int, CancellationToken] = {}
+    
+    def register(self, token: CancellationToken) -> None:
+        self._tokens[token.execution_id] = token
+    
+    def unregister(self, token: CancellationToken) -> None:
+        if self._tokens.get(token.execution_id) is token:
+            del self._tokens[token.execution_id]
+    
+    def cancel(self, execution_id: int, reason: str = "执行已停止") -> bool:
+        """
+        取消本进程内的执行
+        
+        Args:
+            execution_id: 执行记录ID
+            reason: 取消原因
+        
+        Returns:
+            bool: 执行是否在本进程内运行
+        """
+        token = self._tokens.get(execution_id)
+        if token is None:
+            return False
+        token.cancel(reason)
+        return True
+
+# 全局取消令牌注册表
+cancellation_tokens = CancellationRegistry() 
\ No newline at end of file
@@ -0,0 +1,129 @@
+import time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import async_session_factory
+from app.core.logger import logger
+from app.crud.test_execution import test_execution_crud
+
+class ExecutionCheckpointer:
+    """执行检查点记录器：记录最后完成的数据行和步骤，定期写入数据库"""
+    
+    def __init__(
+        self,
+        execution_id: int,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        every_rows: int = 10,
+        every_seconds: float = 30.0
+    ):
+        """
+        初始化检查点记录器
+        
+        Args:
+            execution_id: 执行记录ID
+            session_factory: 数据库会话工厂，写入使用独立会话
+            every_rows: 每完成多少行写入一次
+            every_seconds: 距上次写入超过多少秒时写入
+        """
+        self.execution_id = execution_id
+        self.session_factory = session_factory
+        self.every_rows = every_rows
+        self.every_seconds = every_seconds
+        self.last_row = -1
+        self.last_step = -1
+        self.completed_rows: List[int] = []
+        self.variables: Dict[str, Any] = {}
+        self.device_id: Optional[str] = None
+        self._dirty = False
+        self._rows_since_save = 0
+        self._saved_at = time.monotonic()
+    
+    async def load(self) -> bool:
+        """
+        读取已有检查点
+        
+        Returns:
+            bool: 是否存在检查点
+        """
+        async with self.session_factory() as db:
+            checkpoint = await test_execution_crud.get_checkpoint(db, self.execution_id)
+        if not checkpoint:
+            return False
+        self.last_row = checkpoint.last_row
+        self.last_step = checkpoint.last_step
+        self.completed_rows = list(checkpoint.completed_rows or [])
+        self.variables = dict(checkpoint.variables or {})
+        logger.info(
+            f"执行记录 {self.execution_id} 从检查点恢复: 最后完成行 {self.last_row}, 最后完成步骤 {self.last_step}"
+        )
+        return True
+    
+    def is_row_done(self, index: int) -> bool:
+        """
+        判断数据行是否已在之前的执行中完成
+        
+        Args:
+            index: 行号
+        
+        Returns:
+            bool: 是否已完成
+        """
+        return index <= self.last_row or index in self.completed_rows
+    
+    async def record_step(self, step_index: int, variables: Dict[str, Any]) -> None:
+        """
+        记录完成一个步骤
+        
+        Args:
+            step_index: 步骤在用例中的序号
+            variables: 当前变量
+        """
+        self.last_step = step_index
+        self.variables = dict(variables)
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.every_seconds:
+            await self.save()
+    
+    async def record_row(self, index: int, variables: Dict[str, Any], sharded: bool = False) -> None:
+        """
+        记录完成一行数据
+        
+        Args:
+            index: 行号
+            variables: 当前变量
+            sharded: 是否为分片执行，分片执行时各行完成顺序不连续
+        """
+        if sharded:
+            self.completed_rows.append(index)
+        else:
+            self.last_row = index
+        self.last_step = -1
+        self.variables = dict(variables)
+        self._dirty = True
+        self._rows_since_save += 1
+        if self._rows_since_save >= self.every_rows or time.monotonic() - self._saved_at >= self.every_seconds:
+            await self.save()
+    
+    async def save(self) -> None:
+        """写入检查点，没有变化时跳过"""
+        if not self._dirty:
+            return
+        try:
+            async with self.session_factory() as db:
+                await test_execution_crud.save_checkpoint(db, self.execution_id, {
+                    "last_row": self.last_row,
+                    "last_step": self.last_step,
+                    "completed_rows": sorted(self.completed_rows),
+                    "variables": self.variables,
+                    "device_id": self.device_id
+                })
+        except Exception as e:
+            logger.error(f"写入执行检查点失败: {str(e)}")
+            return
+        self._dirty = False
+        self._rows_since_save = 0
+        self._saved_at = time.monotonic()
+    
+    async def clear(self) -> None:
+        """执行成功后删除检查点"""
+        async with self.session_factory() as db:
+            await test_execution_crud.delete_checkpoint(db, self.execution_id) 
\ No newline at end of file
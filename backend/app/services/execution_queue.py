@@ -0,0 +1,279 @@
+import asyncio
+import statistics
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.deps import async_session_factory
+from app.core.logger import logger
+from app.core.enums.project import TestExecutionStatus, TestPriority
+from app.crud.test_case import test_case_crud
+from app.models.project import TestExecution
+from app.services.suite_scheduler import suite_scheduler
+from app.services.test_executor import TestExecutor
+
+# 优先级序号，数值越小越先执行
+PRIORITY_RANKS = {priority: rank for rank, priority in enumerate(TestPriority)}
+
+def queue_score(
+    priority: Optional[TestPriority],
+    estimated_duration: Optional[float],
+    queued_at: Optional[datetime],
+    now: datetime,
+    aging_interval: float = 300.0,
+    duration_scale: float = 600.0
+) -> float:
+    """
+    计算排队分数，分数越小越先执行
+    
+    优先级每差一级分数差1；每等待aging_interval秒提升一级，防止低优先级饿死；
+    同优先级内短用例优先，时长项取值在[0, 1)之间，不会越过优先级。
+    
+    Args:
+        priority: 优先级
+        estimated_duration: 预计执行时长（秒）
+        queued_at: 进入队列时间
+        now: 当前时间
+        aging_interval: 提升一级所需的等待时间（秒）
+        duration_scale: 时长项的归一化尺度（秒）
+    
+    Returns:
+        float: 排队分数
+    """
+    rank = PRIORITY_RANKS.get(priority, PRIORITY_RANKS[TestPriority.P2])
+    waited = (now - queued_at).total_seconds() if queued_at else 0.0
+    estimate = max(estimated_duration or 0.0, 0.0)
+    return rank - waited / aging_interval + estimate / (estimate + duration_scale)
+
+class ExecutionQueue:
+    """
+    持久化的执行优先级队列：待执行记录保存在数据库中，重启后继续按优先级出队
+    
+    只有经enqueue入队（queued_at不为空）的记录属于队列，套件调度器等直接执行的记录不会被出队。
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        aging_interval: float = 300.0,
+        history_size: int = 500,
+        stale_after: float = settings.EXECUTION_TIMEOUT + 300
+    ):
+        """
+        初始化执行队列
+        
+        Args:
+            session_factory: 数据库会话工厂
+            aging_interval: 等待多少秒提升一个优先级
+            history_size: 保留的出队等待时间记录数
+            stale_after: 运行中的记录开始执行超过该时间（秒）视为工作进程崩溃遗留，
+                默认比整次执行的时间预算多5分钟，仍在运行的执行早已被预算中断
+        """
+        self.session_factory = session_factory
+        self.aging_interval = aging_interval
+        self.stale_after = stale_after
+        self._waits: Dict[str, Deque[float]] = {}
+        self._history_size = history_size
+        self._dispatchers: Dict[str, asyncio.Task] = {}
+    
+    async def enqueue(self, db: AsyncSession, execution: TestExecution) -> TestExecution:
+        """
+        执行记录入队，记录优先级、预计时长和入队时间
+        
+        Args:
+            db: 数据库会话
+            execution: 执行记录
+        
+        Returns:
+            TestExecution: 执行记录
+        """
+        test_case = await test_case_crud.get(db, execution.test_case_id)
+        durations = await suite_scheduler.get_historical_durations(db, [execution.test_case_id])
+        execution.priority = test_case.priority if test_case else TestPriority.P2
+        execution.estimated_duration = int(durations.get(execution.test_case_id, suite_scheduler.default_duration))
+        execution.status = TestExecutionStatus.PENDING
+        execution.queued_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(execution)
+        return execution
+    
+    async def dequeue(self, db: AsyncSession, device_id: Optional[str] = None) -> Optional[TestExecution]:
+        """
+        取出分数最小的待执行记录并标记为运行中
+        
+        Args:
+            db: 数据库会话
+            device_id: 设备ID，只取该设备的执行记录
+        
+        Returns:
+            Optional[TestExecution]: 执行记录，队列为空时返回None
+        """
+        query = select(TestExecution).where(
+            TestExecution.status == TestExecutionStatus.PENDING,
+            TestExecution.queued_at.isnot(None)
+        )
+        if device_id:
+            query = query.where(TestExecution.device_id == device_id)
+        candidates = list((await db.execute(query)).scalars().all())
+        now = datetime.utcnow()
+        candidates.sort(key=lambda execution: queue_score(
+            execution.priority,
+            execution.estimated_duration,
+            execution.queued_at or execution.created_at,
+            now,
+            self.aging_interval
+        ))
+        for execution in candidates:
+            # 条件更新认领，多个调度协程或进程同时出队时只有一个成功
+            result = await db.execute(
+                update(TestExecution)
+                .where(TestExecution.id == execution.id, TestExecution.status == TestExecutionStatus.PENDING)
+                .values(status=TestExecutionStatus.RUNNING, start_time=now)
+            )
+            await db.commit()
+            if result.rowcount == 1:
+                self._record_wait(execution, now)
+                await db.refresh(execution)
+                return execution
+        return None
+    
+    def _record_wait(self, execution: TestExecution, now: datetime) -> None:
+        """记录出队等待时间"""
+        queued_at = execution.queued_at or execution.created_at
+        if not queued_at:
+            return
+        priority = getattr(execution.priority, "value", execution.priority) or TestPriority.P2.value
+        waits = self._waits.setdefault(priority, deque(maxlen=self._history_size))
+        waits.append((now - queued_at).total_seconds())
+    
+    def ensure_dispatcher(self, device_id: str) -> None:
+        """
+        确保设备有调度协程在运行，队列中该设备的记录按优先级依次执行
+        
+        Args:
+            device_id: 设备ID
+        """
+        if device_id in self._dispatchers:
+            return
+        self._dispatchers[device_id] = asyncio.ensure_future(self._dispatch(device_id))
+    
+    async def _dispatch(self, device_id: str) -> None:
+        """设备调度协程：依次出队执行，队列为空时退出"""
+        try:
+            while True:
+                async with self.session_factory() as db:
+                    execution = await self.dequeue(db, device_id)
+                    if execution is None:
+                        return
+                    try:
+                        await TestExecutor(db, execution.id).execute()
+                    except Exception as e:
+                        logger.error(f"执行记录 {execution.id} 执行失败: {str(e)}")
+        finally:
+            self._dispatchers.pop(device_id, None)
+    
+    async def reclaim_stale(self, db: AsyncSession) -> int:
+        """
+        将工作进程崩溃后遗留的运行中记录放回队列，恢复执行时从检查点继续
+        
+        Args:
+            db: 数据库会话
+        
+        Returns:
+            int: 放回队列的记录数
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        result = await db.execute(
+            update(TestExecution)
+            .where(
+                TestExecution.status == TestExecutionStatus.RUNNING,
+                TestExecution.queued_at.isnot(None),
+                TestExecution.start_time < cutoff
+            )
+            .values(status=TestExecutionStatus.PENDING)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount:
+            logger.warning(f"{result.rowcount} 条运行中的执行记录超过 {self.stale_after} 秒未结束，已放回队列")
+        return result.rowcount or 0
+    
+    async def resume(self) -> int:
+        """
+        服务启动时回收遗留的运行中记录，并为队列中已有的待执行记录启动调度协程
+        
+        Returns:
+            int: 启动调度的设备数
+        """
+        async with self.session_factory() as db:
+            await self.reclaim_stale(db)
+            result = await db.execute(
+                select(TestExecution.device_id)
+                .where(
+                    TestExecution.status == TestExecutionStatus.PENDING,
+                    TestExecution.queued_at.isnot(None)
+                )
+                .distinct()
+            )
+            device_ids = [device_id for device_id in result.scalars().all() if device_id]
+        for device_id in device_ids:
+            self.ensure_dispatcher(device_id)
+        return len(device_ids)
+    
+    async def get_stats(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        获取队列深度和等待时间统计
+        
+        Args:
+            db: 数据库会话
+        
+        Returns:
+            Dict[str, Any]: 按优先级的排队数、最长等待、预计排空时间及历史等待时间
+        """
+        now = datetime.utcnow()
+        result = await db.execute(
+            select(
+                TestExecution.priority,
+                func.count(TestExecution.id),
+                func.min(TestExecution.queued_at),
+                func.sum(TestExecution.estimated_duration)
+            )
+            .where(TestExecution.status == TestExecutionStatus.PENDING, TestExecution.queued_at.isnot(None))
+            .group_by(TestExecution.priority)
+        )
+        running = await db.execute(
+            select(func.count(func.distinct(TestExecution.device_id)))
+            .where(TestExecution.status == TestExecutionStatus.RUNNING)
+        )
+        busy_devices = running.scalar() or 0
+        
+        priorities: Dict[str, Dict[str, Any]] = {}
+        for priority, depth, oldest, estimated in result.all():
+            key = getattr(priority, "value", priority) or TestPriority.P2.value
+            priorities[key] = {
+                "depth": depth,
+                "oldest_wait": round((now - oldest).total_seconds(), 1) if oldest else None,
+                "estimated_work": int(estimated or 0)
+            }
+        for key, waits in self._waits.items():
+            item = priorities.setdefault(key, {"depth": 0, "oldest_wait": None, "estimated_work": 0})
+            values = sorted(waits)
+            item["dequeued"] = len(values)
+            item["avg_wait"] = round(statistics.mean(values), 1) if values else None
+            item["p95_wait"] = round(values[int(0.95 * (len(values) - 1))], 1) if values else None
+        
+        estimated_work = sum(item["estimated_work"] for item in priorities.values())
+        return {
+            "depth": sum(item["depth"] for item in priorities.values()),
+            "busy_devices": busy_devices,
+            "estimated_work": estimated_work,
+            # 以当前忙碌设备数排空队列的预计时间，用于评估设备规模
+            "estimated_drain_time": round(estimated_work / busy_devices, 1) if busy_devices else None,
+            "aging_interval": self.aging_interval,
+            "priorities": dict(sorted(priorities.items()))
+        }
+
+# 进程级执行队列
+execution_queue = ExecutionQueue() 
\ No newline at end of file
@@ -7,7 +7,13 @@ from app.crud.test_suite import test_suite_crud
 from app.models.project import TestExecution
 from app.schemas.project import TestExecutionCreate, TestExecutionUpdate, TestStepResultCreate
 from app.core.enums.project import TestExecutionStatus, TestStepStatus, ExecutionStatus
-from app.services.test_executor import execute_test_case
+from app.services.suite_scheduler import suite_scheduler
+from app.services.execution_queue import execution_queue
+from app.services.execution_cancellation import cancellation_tokens
+from app.core.keywords import get_keyword_stats
+from app.core.step_timing import summarize_timings
+from app.core.resource_pool import resource_pool
+from app.core.enums.resource import ResourceType, ResourceStatus
 from app.core.exceptions import ExecutionError
 from app.services.device_service import DeviceService
 from app.services.report_service import ReportService
@@ -15,7 +21,7 @@ from app.core.config import settings
 import asyncio
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 class ExecutionService:
     def __init__(self, db: AsyncSession):
@@ -25,8 +31,7 @@ class ExecutionService:
         self,
         test_id: str,
         device_id: str,
-        environment: str,
-        background_tasks: BackgroundTasks
+        environment: str
     ) -> TestExecution:
         """
         运行测试
@@ -35,7 +40,6 @@ class ExecutionService:
             test_id: 测试ID
             device_id: 设备ID
             environment: 环境名称
-            background_tasks: 后台任务
             
         Returns:
             TestExecution: 执行记录
@@ -49,56 +53,122 @@ class ExecutionService:
             status=ExecutionStatus.PENDING
         )
         
-        # 添加后台任务
-        background_tasks.add_task(execute_test_case, self.db, execution.id)
+        # 按优先级排队，由设备调度协程依次执行
+        await execution_queue.enqueue(self.db, execution)
+        execution_queue.ensure_dispatcher(device_id)
         
         return execution
 
     async def run_test_suite(
         self,
         suite_id: str,
-        device_id: str,
+        device_id: Optional[str],
         environment: str,
         background_tasks: BackgroundTasks
-    ) -> List[TestExecution]:
+    ) -> Dict[str, Any]:
         """
         运行测试套件
         
+        用例按历史执行时长从长到短分发到资源池中所有匹配的设备并行执行。
+        
         Args:
             suite_id: 套件ID
-            device_id: 设备ID
+            device_id: 限定的设备ID，为空时使用资源池中全部可用设备
             environment: 环境名称
             background_tasks: 后台任务
             
         Returns:
-            List[TestExecution]: 执行记录列表
+            Dict[str, Any]: 调度计划
         """
         # 获取套件中的测试用例
         suite = await test_suite_crud.get(self.db, suite_id)
         if not suite:
             raise ExecutionError(f"测试套件不存在: {suite_id}")
             
-        executions = []
-        for test_case in suite.test_cases:
-            # 为每个测试用例创建执行记录
-            execution = await test_execution_crud.create(
-                self.db,
-                test_id=test_case.id,
-                device_id=device_id,
-                environment=environment,
-                status=ExecutionStatus.PENDING
-            )
-            executions.append(execution)
+        plan = await suite_scheduler.plan(
+            self.db,
+            list(suite.test_cases),
+            device_ids=[device_id] if device_id else None
+        )
+        if not plan["devices"]:
+            raise ExecutionError("资源池中没有可用的设备")
             
-            # 添加后台任务
-            background_tasks.add_task(execute_test_case, self.db, execution.id)
+        # 添加后台任务，每个用例在调度器中使用独立的数据库会话
+        background_tasks.add_task(suite_scheduler.run_suite, suite_id, plan, environment)
+        
+        return plan
+
+    def get_suite_report(self, suite_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取套件最近一次执行报告
+        
+        Args:
+            suite_id: 套件ID
             
-        return executions
+        Returns:
+            Optional[Dict[str, Any]]: 执行报告，包含总完成时间和设备利用率
+        """
+        return suite_scheduler.get_report(suite_id)
+
+    async def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        获取执行队列统计
+        
+        Returns:
+            Dict[str, Any]: 队列深度和等待时间统计
+        """
+        return await execution_queue.get_stats(self.db)
+
+    def get_keyword_stats(self) -> Dict[str, Any]:
+        """
+        获取关键字调用统计
+        
+        Returns:
+            Dict[str, Any]: 各注册表中每个关键字的调用次数、失败次数和耗时
+        """
+        return get_keyword_stats()
+
+    async def get_execution_timings(self, execution_id: str) -> Dict[str, Any]:
+        """
+        获取单次执行的步骤耗时分解
+        
+        Args:
+            execution_id: 执行ID
+            
+        Returns:
+            Dict[str, Any]: 各阶段耗时及占比、按操作的平均耗时
+        """
+        execution = await test_execution_crud.get(self.db, execution_id)
+        if not execution:
+            raise ExecutionError(f"执行记录不存在: {execution_id}")
+        rows = await test_execution_crud.get_step_timings(self.db, execution_id=execution.id)
+        return {"execution_id": execution.id, **summarize_timings(rows)}
+
+    async def get_project_timings(self, project_id: int, days: int = 7) -> Dict[str, Any]:
+        """
+        获取项目最近一段时间的步骤耗时分解，用于判断执行慢在被测应用还是平台本身
+        
+        Args:
+            project_id: 项目ID
+            days: 统计最近多少天
+            
+        Returns:
+            Dict[str, Any]: 各阶段耗时及占比、按操作的平均耗时
+        """
+        rows = await test_execution_crud.get_step_timings(
+            self.db,
+            project_id=project_id,
+            since=datetime.utcnow() - timedelta(days=days)
+        )
+        return {"project_id": project_id, "days": days, **summarize_timings(rows)}
 
     async def stop_execution(self, execution_id: str) -> None:
         """
         停止执行
         
+        排队中的执行不再出队；本进程内运行的执行立即中断，其他工作进程中的执行
+        由其取消令牌轮询到已取消状态后中断，设备随之释放。
+        
         Args:
             execution_id: 执行ID
         """
@@ -106,15 +176,62 @@ class ExecutionService:
         if not execution:
             raise ExecutionError(f"执行记录不存在: {execution_id}")
             
-        if execution.status not in [ExecutionStatus.RUNNING, ExecutionStatus.PENDING]:
+        if execution.status not in [TestExecutionStatus.RUNNING, TestExecutionStatus.PENDING]:
             raise ExecutionError(f"执行状态不允许停止: {execution.status}")
             
-        await test_execution_crud.update_status(
+        cancellation_tokens.cancel(execution.id, "执行已停止")
+        await test_execution_crud.update_execution_status(
             self.db,
-            execution_id,
-            ExecutionStatus.STOPPED
+            execution.id,
+            TestExecutionStatus.CANCELLED,
+            "执行已停止"
         )
 
+    async def resume_execution(self, execution_id: str, device_id: Optional[str] = None) -> TestExecution:
+        """
+        从检查点恢复执行
+        
+        已完成的数据行和步骤不再执行，从失败的位置继续。未指定设备时在资源池中选择平台匹配的可用设备。
+        
+        Args:
+            execution_id: 执行ID
+            device_id: 指定的设备ID
+            
+        Returns:
+            TestExecution: 重新排队的执行记录
+        """
+        execution = await test_execution_crud.get(self.db, execution_id)
+        if not execution:
+            raise ExecutionError(f"执行记录不存在: {execution_id}")
+            
+        if execution.status not in [TestExecutionStatus.FAILED, TestExecutionStatus.ERROR, TestExecutionStatus.CANCELLED]:
+            raise ExecutionError(f"执行状态不允许恢复: {execution.status}")
+            
+        checkpoint = await test_execution_crud.get_checkpoint(self.db, execution.id)
+        if not checkpoint:
+            raise ExecutionError(f"执行记录没有检查点: {execution_id}")
+            
+        if not device_id:
+            test_case = await test_case_crud.get(self.db, execution.test_case_id)
+            platform = test_case.platform.value if test_case and test_case.platform else None
+            for resource in resource_pool.get_resources_by_type(ResourceType.DEVICE):
+                device_platform = resource.properties.get("platform")
+                if resource.status == ResourceStatus.AVAILABLE and (
+                    not platform or not device_platform or device_platform == platform
+                ):
+                    device_id = resource.resource_id
+                    break
+            else:
+                # 没有其他兼容设备时回到原设备
+                device_id = execution.device_id
+                
+        execution.device_id = device_id
+        execution.error_message = None
+        await execution_queue.enqueue(self.db, execution)
+        execution_queue.ensure_dispatcher(device_id)
+        
+        return execution
+
     async def get_execution(self, execution_id: str) -> Optional[TestExecution]:
         """
         获取执行记录
@@ -172,7 +289,9 @@ class ExecutionService:
                     "value": result.value,
                     "status": result.status,
                     "message": result.message,
-                    "screenshot": result.screenshot
+                    "screenshot": result.screenshot,
+                    "duration": result.duration,
+                    "timings": result.timings
                 }
                 for result in execution.step_results
             ]
@@ -0,0 +1,218 @@
+import time
+import statistics
+from typing import Any, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.logger import logger
+from app.core.enums.element import LocatorStrategy
+from app.core.locator.snapshot import PageSnapshot, SnapshotMiss
+from app.core.locator.profiler import locator_profiler
+from app.models.element import Element
+from app.services.element_locator import ElementLocator
+
+# 各平台可作为快速定位器的属性，按优先级排列
+FAST_LOCATOR_ATTRIBUTES = {
+    "android": [("resource-id", LocatorStrategy.ID), ("content-desc", LocatorStrategy.ACCESSIBILITY_ID)],
+    "ios": [("name", LocatorStrategy.ACCESSIBILITY_ID)],
+    "web": [("id", LocatorStrategy.ID), ("name", LocatorStrategy.NAME)],
+}
+
+def suggest_fast_locator(snapshot: PageSnapshot, xpath: str) -> Dict[str, Any]:
+    """
+    为XPath定位器推荐等价的快速定位器，并在快照上验证唯一性
+    
+    Args:
+        snapshot: 页面快照
+        xpath: 原XPath表达式
+    
+    Returns:
+        Dict[str, Any]: 推荐结果，包含原定位器、候选定位器及未推荐原因
+    """
+    result: Dict[str, Any] = {
+        "original": {"type": LocatorStrategy.XPATH.value, "value": xpath},
+        "suggestion": None,
+        "reason": None
+    }
+    try:
+        matches = snapshot.find_all(LocatorStrategy.XPATH, xpath)
+    except SnapshotMiss as e:
+        result["reason"] = str(e)
+        return result
+    if len(matches) != 1:
+        result["reason"] = f"XPath在快照中匹配到{len(matches)}个元素"
+        return result
+    
+    node = matches[0].node
+    for attribute, strategy in FAST_LOCATOR_ATTRIBUTES.get(snapshot.platform, []):
+        value = node.get(attribute)
+        if not value:
+            continue
+        try:
+            candidates = snapshot.find_all(strategy, value)
+        except SnapshotMiss:
+            continue
+        # 候选定位器必须唯一且指向同一个元素
+        if len(candidates) == 1 and candidates[0].node is node:
+            result["suggestion"] = {"type": strategy.value, "value": value}
+            return result
+    result["reason"] = "元素没有唯一的id、accessibility_id或resource-id"
+    return result
+
+def to_device_locator(platform: str, locator: Dict[str, str]) -> Dict[str, Any]:
+    """
+    将定位器转换为设备元素定位器的参数格式
+    
+    Args:
+        platform: 页面来源平台
+        locator: 定位器，包含type和value
+    
+    Returns:
+        Dict[str, Any]: 设备元素定位器参数
+    """
+    if platform == "android":
+        keys = {
+            LocatorStrategy.XPATH.value: "xpath",
+            LocatorStrategy.ID.value: "resourceId",
+            LocatorStrategy.ACCESSIBILITY_ID.value: "description",
+        }
+        return {keys[locator["type"]]: locator["value"]}
+    return dict(locator)
+
+class LocatorOptimizer:
+    """定位器优化分析：为慢XPath定位器推荐快速定位器并实测加速比"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _get_xpath_locators(
+        self,
+        device_id: Any,
+        project_id: Optional[int],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        收集待优化的XPath定位器：按累计耗时排行的慢定位器优先，其次是设备的元素记录
+        
+        Args:
+            device_id: 设备ID
+            project_id: 项目ID
+            limit: 最多返回数量
+        
+        Returns:
+            List[Dict[str, Any]]: 定位器列表，包含value及对应的元素记录
+        """
+        result = await self.db.execute(
+            select(Element).where(Element.device_id == device_id, Element.locator_type == LocatorStrategy.XPATH.value)
+        )
+        elements = {element.locator: element for element in result.scalars().all()}
+        
+        locators: Dict[str, Dict[str, Any]] = {}
+        for profile in locator_profiler.get_slow_locators(project_id, limit=limit * 4):
+            if profile["strategy"] == LocatorStrategy.XPATH.value:
+                locators.setdefault(profile["value"], {"value": profile["value"], "profile": profile})
+        for value in elements:
+            locators.setdefault(value, {"value": value, "profile": None})
+        
+        for item in locators.values():
+            item["element"] = elements.get(item["value"])
+        return list(locators.values())[:limit]
+    
+    async def _measure(
+        self,
+        element_locator: ElementLocator,
+        locator: Dict[str, Any],
+        repeat: int
+    ) -> Optional[float]:
+        """
+        在设备上重复查找元素，返回耗时中位数（秒），未找到时返回None
+        
+        Args:
+            element_locator: 设备元素定位器
+            locator: 设备元素定位器参数
+            repeat: 重复次数
+        """
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            element = await element_locator.find_element(locator)
+            if not element:
+                return None
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+    
+    async def analyze(
+        self,
+        element_locator: ElementLocator,
+        device_id: Any,
+        project_id: Optional[int] = None,
+        limit: int = 10,
+        repeat: int = 3,
+        apply: bool = False
+    ) -> Dict[str, Any]:
+        """
+        分析慢XPath定位器并推荐快速定位器
+        
+        Args:
+            element_locator: 已连接的设备元素定位器
+            device_id: 设备ID
+            project_id: 项目ID，用于筛选慢定位器排行
+            limit: 最多分析的定位器数量
+            repeat: 实测时每个定位器的重复次数
+            apply: 是否将验证通过且更快的推荐写回元素记录
+        
+        Returns:
+            Dict[str, Any]: 分析报告
+        
+        Raises:
+            ValueError: 无法获取元素树
+        """
+        source = await element_locator.get_page_source()
+        if not source:
+            raise ValueError("无法获取元素树")
+        snapshot = PageSnapshot(source)
+        
+        items = []
+        applied = 0
+        for candidate in await self._get_xpath_locators(device_id, project_id, limit):
+            item = suggest_fast_locator(snapshot, candidate["value"])
+            item["profile"] = candidate["profile"]
+            item["original_time"] = item["suggested_time"] = item["speedup"] = None
+            
+            if item["suggestion"]:
+                try:
+                    item["original_time"] = await self._measure(
+                        element_locator, to_device_locator(snapshot.platform, item["original"]), repeat
+                    )
+                    item["suggested_time"] = await self._measure(
+                        element_locator, to_device_locator(snapshot.platform, item["suggestion"]), repeat
+                    )
+                except Exception as e:
+                    logger.error(f"实测定位器耗时失败: {str(e)}")
+                if item["original_time"] and item["suggested_time"]:
+                    item["speedup"] = round(item["original_time"] / item["suggested_time"], 2)
+            
+            element = candidate["element"]
+            if element is not None:
+                item["element_id"] = element.id
+                properties = dict(element.properties or {})
+                properties["locator_suggestion"] = {
+                    "suggestion": item["suggestion"],
+                    "speedup": item["speedup"],
+                    "reason": item["reason"]
+                }
+                element.properties = properties
+                if apply and item["speedup"] and item["speedup"] > 1:
+                    element.locator = item["suggestion"]["value"]
+                    element.locator_type = item["suggestion"]["type"]
+                    item["applied"] = True
+                    applied += 1
+            items.append(item)
+        
+        await self.db.commit()
+        return {
+            "platform": snapshot.platform,
+            "analyzed": len(items),
+            "suggested": sum(1 for item in items if item["suggestion"]),
+            "applied": applied,
+            "items": items
+        } 
\ No newline at end of file
@@ -0,0 +1,145 @@
+import time
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import async_session_factory
+from app.core.logger import logger
+from app.crud.test_execution import test_execution_crud
+
+class StepResultBuffer:
+    """步骤结果写缓冲：累积步骤结果，每N条或T毫秒批量插入一次，不阻塞步骤执行"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        max_rows: int = 50,
+        flush_interval: float = 0.5,
+        retry_interval: float = 2.0
+    ):
+        """
+        初始化步骤结果写缓冲
+        
+        Args:
+            session_factory: 数据库会话工厂，写入使用独立会话，不占用执行器的会话
+            max_rows: 累积多少条后立即写入
+            flush_interval: 第一条未写入的结果最多等待多久写入（秒）
+            retry_interval: 后台写入失败后多久重试（秒）
+        """
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self._rows: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+        self._flushes = 0
+        self._written = 0
+        self._failures = 0
+        self._flush_seconds = 0.0
+    
+    def add(self, row: Dict[str, Any]) -> None:
+        """
+        添加一条步骤结果，只写入内存
+        
+        Args:
+            row: TestStepResult字段字典
+        """
+        row.setdefault("created_at", datetime.utcnow())
+        self._rows.append(row)
+        if len(self._rows) >= self.max_rows:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_later())
+    
+    async def _flush_later(self, delay: Optional[float] = None) -> None:
+        """等待flush_interval（或指定时间）后写入"""
+        try:
+            await asyncio.sleep(self.flush_interval if delay is None else delay)
+        except asyncio.CancelledError:
+            return
+        self._timer = None
+        self._start_flush()
+    
+    def _start_flush(self) -> None:
+        """在后台开始一次写入，正在写入时跳过，由该次写入完成后的检查接续"""
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.ensure_future(self._background_flush())
+    
+    async def _background_flush(self) -> None:
+        """后台写入，失败时不抛出，结果留在缓冲中并安排重试；显式调用flush()或close()时才抛出"""
+        try:
+            await self.flush()
+        except Exception:
+            if self._timer is None:
+                self._timer = asyncio.ensure_future(self._flush_later(self.retry_interval))
+    
+    async def flush(self) -> int:
+        """
+        写入当前缓冲的全部结果
+        
+        Returns:
+            int: 写入的条数
+        
+        Raises:
+            Exception: 写入失败，未写入的结果留在缓冲中
+        """
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            written = 0
+            while self._rows:
+                rows, self._rows = self._rows, []
+                started = time.perf_counter()
+                try:
+                    async with self.session_factory() as db:
+                        await test_execution_crud.create_step_results_bulk(db, rows)
+                except Exception as e:
+                    # 写入失败时放回缓冲，下次写入重试
+                    self._rows = rows + self._rows
+                    self._failures += 1
+                    logger.error(f"批量写入步骤结果失败: {str(e)}")
+                    raise
+                self._flushes += 1
+                self._written += len(rows)
+                self._flush_seconds += time.perf_counter() - started
+                written += len(rows)
+            return written
+    
+    async def close(self) -> None:
+        """
+        等待后台写入完成并写入剩余结果，执行完成或失败时调用
+        
+        Raises:
+            Exception: 剩余结果写入失败
+        """
+        if self._flushing is not None:
+            await self._flushing
+        await self.flush()
+    
+    def row_cost(self) -> float:
+        """
+        已完成写入的平均每行耗时，用于将后台批量写入的耗时折算到单个步骤
+        
+        Returns:
+            float: 每行写入耗时（秒），尚未写入时为0
+        """
+        return self._flush_seconds / self._written if self._written else 0.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取写入统计
+        
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        return {
+            "pending": len(self._rows),
+            "flushes": self._flushes,
+            "written": self._written,
+            "failures": self._failures,
+            "avg_batch_size": round(self._written / self._flushes, 2) if self._flushes else 0.0,
+            "avg_row_ms": round(self.row_cost() * 1000, 3)
+        } 
\ No newline at end of file
@@ -0,0 +1,299 @@
+import asyncio
+import heapq
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import async_session_factory
+from app.core.logger import logger
+from app.core.enums.project import TestEnvironment, TestExecutionStatus
+from app.core.enums.resource import ResourceType, ResourceStatus
+from app.core.resource_pool import Resource, resource_pool
+from app.models.project import TestExecution
+from app.services.test_executor import TestExecutor
+
+def lpt_order(cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    按预计耗时从长到短排序（LPT，最长处理时间优先）
+    
+    Args:
+        cases: 用例列表，包含estimate字段
+    
+    Returns:
+        List[Dict[str, Any]]: 排序后的用例列表
+    """
+    return sorted(cases, key=lambda case: case["estimate"], reverse=True)
+
+def predict_makespan(estimates: List[float], slots: int) -> float:
+    """
+    按LPT贪心分配估算总完成时间
+    
+    Args:
+        estimates: 已按LPT排序的预计耗时列表
+        slots: 并发槽位总数
+    
+    Returns:
+        float: 预计总完成时间（秒）
+    """
+    if slots <= 0:
+        return 0.0
+    loads = [0.0] * slots
+    for estimate in estimates:
+        heapq.heapreplace(loads, loads[0] + estimate)
+    return max(loads)
+
+class SuiteScheduler:
+    """测试套件调度器：将用例按LPT顺序分发到资源池中所有匹配的设备并行执行"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        default_duration: float = 60.0
+    ):
+        """
+        初始化套件调度器
+        
+        Args:
+            session_factory: 数据库会话工厂，每个用例使用独立会话
+            default_duration: 没有历史记录时的预计耗时（秒）
+        """
+        self.session_factory = session_factory
+        self.default_duration = default_duration
+        self._reports: Dict[Any, Dict[str, Any]] = {}
+    
+    async def get_historical_durations(self, db: AsyncSession, test_case_ids: List[int]) -> Dict[int, float]:
+        """
+        获取用例的历史平均执行时长
+        
+        Args:
+            db: 数据库会话
+            test_case_ids: 用例ID列表
+        
+        Returns:
+            Dict[int, float]: 用例ID到平均时长（秒）的映射
+        """
+        if not test_case_ids:
+            return {}
+        result = await db.execute(
+            select(TestExecution.test_case_id, func.avg(TestExecution.duration))
+            .where(
+                TestExecution.test_case_id.in_(test_case_ids),
+                TestExecution.duration.isnot(None)
+            )
+            .group_by(TestExecution.test_case_id)
+        )
+        return {test_case_id: float(duration) for test_case_id, duration in result.all()}
+    
+    def get_devices(self, device_ids: Optional[List[str]] = None) -> List[Resource]:
+        """
+        获取资源池中可用的设备
+        
+        Args:
+            device_ids: 限定的设备ID列表，为空时使用全部可用设备
+        
+        Returns:
+            List[Resource]: 设备资源列表
+        """
+        devices = [
+            resource for resource in resource_pool.get_resources_by_type(ResourceType.DEVICE)
+            if resource.status == ResourceStatus.AVAILABLE
+        ]
+        if device_ids:
+            devices = [resource for resource in devices if resource.resource_id in device_ids]
+        return devices
+    
+    async def plan(
+        self,
+        db: AsyncSession,
+        test_cases: List[Any],
+        device_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        生成调度计划
+        
+        Args:
+            db: 数据库会话
+            test_cases: 测试用例列表
+            device_ids: 限定的设备ID列表
+        
+        Returns:
+            Dict[str, Any]: 调度计划，包含按LPT排序的用例、设备及预计总完成时间
+        """
+        durations = await self.get_historical_durations(db, [case.id for case in test_cases])
+        # 没有历史记录的用例按已知用例的中位数估计
+        fallback = statistics.median(durations.values()) if durations else self.default_duration
+        cases = lpt_order([
+            {
+                "test_case_id": case.id,
+                "project_id": case.project_id,
+                "platform": case.platform.value if case.platform else None,
+                "estimate": durations.get(case.id, fallback),
+                "has_history": case.id in durations
+            }
+            for case in test_cases
+        ])
+        devices = self.get_devices(device_ids)
+        estimates = [case["estimate"] for case in cases]
+        # 设备会话池中每台设备同时只有一个会话，每台设备是一个并发槽位
+        return {
+            "cases": cases,
+            "devices": [device.resource_id for device in devices],
+            "serial_duration": round(sum(estimates), 2),
+            "predicted_makespan": round(predict_makespan(estimates, len(devices)), 2)
+        }
+    
+    @staticmethod
+    def _matches(device: Resource, case: Dict[str, Any]) -> bool:
+        """设备平台与用例平台是否匹配，设备未声明平台时视为匹配"""
+        platform = device.properties.get("platform")
+        return not platform or not case["platform"] or platform == case["platform"]
+    
+    async def _run_case(
+        self,
+        suite_id: Any,
+        case: Dict[str, Any],
+        device: Resource,
+        environment: TestEnvironment
+    ) -> Dict[str, Any]:
+        """
+        在指定设备上执行一个用例，每个用例使用独立的数据库会话
+        
+        Args:
+            suite_id: 套件ID
+            case: 调度计划中的用例
+            device: 设备资源
+            environment: 测试环境
+        
+        Returns:
+            Dict[str, Any]: 用例执行结果
+        """
+        started = time.monotonic()
+        result = {"test_case_id": case["test_case_id"], "device_id": device.resource_id, "execution_id": None}
+        try:
+            async with self.session_factory() as db:
+                # 直接执行的记录不经过执行队列，创建时即为运行中，不会被队列调度协程认领
+                execution = TestExecution(
+                    project_id=case["project_id"],
+                    test_case_id=case["test_case_id"],
+                    test_suite_id=suite_id,
+                    device_id=device.resource_id,
+                    environment=environment,
+                    status=TestExecutionStatus.RUNNING,
+                    start_time=datetime.utcnow()
+                )
+                db.add(execution)
+                await db.commit()
+                await db.refresh(execution)
+                result["execution_id"] = execution.id
+                
+                await TestExecutor(db, execution.id, device_name=device.name).execute()
+                await db.refresh(execution)
+                result["status"] = getattr(execution.status, "value", execution.status)
+        except Exception as e:
+            logger.error(f"套件 {suite_id} 用例 {case['test_case_id']} 执行失败: {str(e)}")
+            result["status"] = TestExecutionStatus.ERROR.value
+            result["error_message"] = str(e)
+        result["duration"] = round(time.monotonic() - started, 2)
+        return result
+    
+    async def run_suite(
+        self,
+        suite_id: Any,
+        plan: Dict[str, Any],
+        environment: str
+    ) -> Dict[str, Any]:
+        """
+        按调度计划执行套件
+        
+        每个设备启动一个工作协程，空闲时从LPT队列中取第一个平台匹配的用例，
+        长用例先开始、短用例填补空隙，总完成时间随设备数而不是用例数增长。
+        
+        Args:
+            suite_id: 套件ID
+            plan: plan()生成的调度计划
+            environment: 环境名称
+        
+        Returns:
+            Dict[str, Any]: 套件执行报告
+        
+        Raises:
+            ValueError: 不支持的环境名称
+        """
+        environment = TestEnvironment(environment)
+        pending = list(plan["cases"])
+        lock = asyncio.Lock()
+        results: List[Dict[str, Any]] = []
+        # 计划生成后设备可能已被其他套件占用，执行时按计划中的设备原子分配
+        devices = resource_pool.allocate_resources(
+            ResourceType.DEVICE,
+            f"suite:{suite_id}",
+            len(plan["devices"]),
+            resource_ids=plan["devices"]
+        )
+        if len(devices) < len(plan["devices"]):
+            logger.warning(f"套件 {suite_id} 计划 {len(plan['devices'])} 台设备, 实际分配 {len(devices)} 台")
+        busy: Dict[str, float] = {device.resource_id: 0.0 for device in devices}
+        
+        async def take(device: Resource) -> Optional[Dict[str, Any]]:
+            async with lock:
+                for index, case in enumerate(pending):
+                    if self._matches(device, case):
+                        return pending.pop(index)
+            return None
+        
+        async def worker(device: Resource) -> None:
+            while True:
+                case = await take(device)
+                if case is None:
+                    return
+                result = await self._run_case(suite_id, case, device, environment)
+                busy[device.resource_id] += result["duration"]
+                results.append(result)
+        
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*[worker(device) for device in devices])
+        finally:
+            for device in devices:
+                resource_pool.release_resource(device.resource_id)
+        makespan = time.monotonic() - started
+        
+        report = {
+            "suite_id": suite_id,
+            "devices": len(devices),
+            "cases": len(plan["cases"]),
+            "executed": len(results),
+            # 没有匹配设备的用例
+            "unscheduled": [case["test_case_id"] for case in pending],
+            "makespan": round(makespan, 2),
+            "predicted_makespan": plan["predicted_makespan"],
+            "serial_duration": round(sum(result["duration"] for result in results), 2),
+            "device_utilization": {
+                device_id: round(seconds / makespan, 4) if makespan else 0.0
+                for device_id, seconds in busy.items()
+            },
+            "results": results
+        }
+        self._reports[suite_id] = report
+        logger.info(
+            f"套件 {suite_id} 执行完成: {len(results)} 个用例, {len(devices)} 台设备, "
+            f"总完成时间 {report['makespan']} 秒（预计 {plan['predicted_makespan']} 秒）"
+        )
+        return report
+    
+    def get_report(self, suite_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        获取套件最近一次执行报告
+        
+        Args:
+            suite_id: 套件ID
+        
+        Returns:
+            Optional[Dict[str, Any]]: 执行报告
+        """
+        return self._reports.get(suite_id)
+
+# 进程级套件调度器
+suite_scheduler = SuiteScheduler() 
\ No newline at end of file
@@ -48,7 +48,7 @@ class TestEngineService:
             })
             
             # 创建测试执行引擎
-            self.current_engine = TestEngine(device.driver)
+            self.current_engine = TestEngine(device.driver, device_id=device_id)
             
             # 执行测试用例
             result = await self.current_engine.execute_test_case(test_case)
@@ -9,12 +9,27 @@ from app.crud.test_execution import test_execution_crud
 from app.core.config import settings
 from app.utils.device_manager import DeviceManager
 from app.utils.element_locator import ElementLocator
-from app.utils.screenshot import take_screenshot
+from app.utils.screenshot import screenshot_pipeline, should_capture
 from app.utils.assertions import Assertions
 from app.utils.data_driver import DataDriver
 from app.models.device import Device
 from app.models.project import TestCase, TestExecution, TestStepResult
 from app.services.element_locator import create_element_locator
+from app.core.data_sharding import run_sharded, merge_row_results
+from app.core.resource_pool import resource_pool
+from app.core.enums.resource import ResourceType
+from app.core.enums.project import TestStepStatus, TestExecutionStatus
+from app.core.exceptions import ExecutionCancelledError, ExecutionTimeoutError
+from app.services.step_result_buffer import StepResultBuffer
+from app.services.execution_checkpoint import ExecutionCheckpointer
+from app.services.execution_cancellation import CancellationToken, cancellation_tokens
+from app.core.step_plan import StepPlan
+from app.core.keywords import Keyword, element_actions, element_assertions
+from app.core.step_fusion import W3C_ACTIONS_COMMAND, fuse_steps, build_actions
+from app.core.step_timing import StepTimer
+from app.core.locator.batch import is_mobile_driver
+from selenium.common.exceptions import UnknownMethodException
+from app.core.simulated_driver import AsyncSimulatedDriver, SimulationProfile
 from app.core.logger import logger
 from app.core.test_engine import TestEngine
 from app.schemas.project import TestExecutionResponse
@@ -24,9 +39,47 @@ logger = logging.getLogger(__name__)
 class TestExecutor(ABC):
     """测试执行器基类"""
     
-    def __init__(self, db: AsyncSession, execution_id: int):
+    def __init__(
+        self,
+        db: AsyncSession,
+        execution_id: int,
+        shards: int = 1,
+        simulation: Optional[SimulationProfile] = None,
+        device_name: Optional[str] = None
+    ):
+        """
+        初始化测试执行器
+        
+        Args:
+            db: 数据库会话
+            execution_id: 执行记录ID
+            shards: 数据驱动分片数，大于1时测试数据行分发到多台设备并发执行
+            simulation: 模拟驱动配置，传入时不连接真实设备，按配置的延迟和失败率演练执行
+            device_name: 调度器分配的设备名称，为空时按执行记录的设备ID解析
+        """
         self.db = db
         self.execution_id = execution_id
+        self.shards = shards
+        self.simulation = simulation
+        # 分片执行时多个设备共用同一个数据库会话，写入需要串行
+        self._db_lock = asyncio.Lock()
+        # 步骤结果写缓冲，执行完成或失败时保证写入
+        self.step_buffer = StepResultBuffer()
+        # 执行检查点，失败后可从最后完成的数据行和步骤继续执行
+        self.checkpointer: Optional[ExecutionCheckpointer] = ExecutionCheckpointer(execution_id)
+        self.track_steps = True
+        # 取消令牌，停止执行或超出整次执行的时间预算时中断步骤
+        self.cancel_token = CancellationToken(execution_id, timeout=settings.EXECUTION_TIMEOUT)
+        self.step_timeout = settings.STEP_TIMEOUT
+        self.screenshot_policy = settings.SCREENSHOT_POLICY
+        self.step_count = 0
+        self.step_plan: Optional[StepPlan] = None
+        # 编译步骤计划时解析的操作关键字，与步骤一一对应
+        self.step_keywords: List[Keyword] = []
+        # 编译步骤计划时解析的断言关键字，按断言步骤的步骤编号查找
+        self.step_assertions: Dict[Any, Keyword] = {}
+        # 相邻的点击、悬停等手势步骤合并为一次W3C Actions调用
+        self.fuse_gestures = settings.STEP_FUSION
         self.device = None
         self.locator = None
         self.assertions = None
@@ -35,11 +88,21 @@ class TestExecutor(ABC):
         self.execution = None
         self.current_step = None
         self.variables = {}
-        self.test_engine = TestEngine()
+        self._test_engine: Optional[TestEngine] = None
         self.test_case_id = None
         self.device_id = None
+        self.device_name: Optional[str] = device_name
         self.step_results: List[TestStepResult] = []
 
+    @property
+    def test_engine(self) -> TestEngine:
+        """测试执行引擎，设备确定后创建，驱动调用使用该设备的执行器"""
+        if self._test_engine is None:
+            if self.device is None:
+                raise Exception("设备未初始化")
+            self._test_engine = TestEngine(self.device, device_id=self.device_name)
+        return self._test_engine
+
     async def initialize(self):
         """初始化测试执行环境"""
         try:
@@ -52,11 +115,17 @@ class TestExecutor(ABC):
             self.test_case = await test_case_crud.get(self.db, self.execution.test_case_id)
             if not self.test_case:
                 raise Exception("测试用例不存在")
+            
+            # 读取检查点，恢复变量快照
+            if await self.checkpointer.load():
+                self.variables.update(self.checkpointer.variables)
 
             # 初始化设备
-            self.device = await DeviceManager.get_device(self.execution.device_name)
+            self.device_id = self.execution.device_id
+            self.device_name = self.device_name or self._resolve_device_name(self.device_id)
+            self.device = await self._get_device(self.device_name)
             if not self.device:
-                raise Exception(f"设备 {self.execution.device_name} 不可用")
+                raise Exception(f"设备 {self.device_name} 不可用")
 
             # 初始化元素定位器
             self.locator = create_element_locator(self.device)
@@ -77,20 +146,39 @@ class TestExecutor(ABC):
 
     async def execute(self):
         """执行测试用例"""
+        cancellation_tokens.register(self.cancel_token)
+        self.cancel_token.start()
+        try:
+            return await self._execute()
+        finally:
+            await self.cancel_token.close()
+            cancellation_tokens.unregister(self.cancel_token)
+
+    async def _execute(self):
+        """初始化并执行测试用例，取消或超时时释放设备并记录状态"""
         if not await self.initialize():
             return
 
         try:
-            if self.test_data:
-                # 数据驱动执行
-                for i, data in enumerate(self.test_data):
+            if self.test_data and self.shards > 1:
+                # 数据驱动分片执行
+                await self._execute_sharded()
+            elif self.test_data:
+                # 数据驱动执行，跳过检查点之前已完成的数据行
+                for i, data in enumerate(self._get_rows()):
+                    if self.checkpointer.is_row_done(i):
+                        continue
+                    await self.cancel_token.check()
                     self.current_data_index = i
                     await self._execute_with_data(data)
+                    await self.checkpointer.record_row(i, self.variables)
             else:
                 # 普通执行
-                await self._execute_steps(self.test_case.steps)
+                await self._execute_steps(self.test_case.steps, self._resume_step())
 
             # 所有执行成功
+            await self.step_buffer.close()
+            await self.checkpointer.clear()
             await test_execution_crud.update_execution_status(
                 self.db,
                 self.execution_id,
@@ -98,6 +186,8 @@ class TestExecutor(ABC):
             )
             self.step_results = self.execution.step_results
             return self.execution
+        except ExecutionCancelledError as e:
+            await self._handle_error(str(e), TestExecutionStatus.CANCELLED.value)
         except Exception as e:
             await self._handle_error(str(e))
         finally:
@@ -106,149 +196,417 @@ class TestExecutor(ABC):
     async def _execute_with_data(self, data: Dict[str, Any]):
         """使用测试数据执行测试用例"""
         try:
-            # 替换步骤中的变量
-            steps = await self._replace_step_variables(self.test_case.steps, data)
-            await self._execute_steps(steps)
+            # 使用编译后的步骤计划渲染变量
+            steps = self._get_step_plan().render(data)
+            await self._execute_steps(steps, self._resume_step())
+        except (ExecutionCancelledError, ExecutionTimeoutError):
+            raise
         except Exception as e:
             raise Exception(f"执行测试数据 {self.current_data_index + 1} 失败: {str(e)}")
 
-    async def _execute_steps(self, steps: List[Dict[str, Any]]):
-        """执行测试步骤列表"""
-        for step in steps:
-            await self._execute_step(step)
+    def _fork(self, device: Any, device_name: str) -> "TestExecutor":
+        """
+        创建绑定到另一台设备的分片执行器，共享执行记录和测试用例
+        
+        Args:
+            device: 设备实例
+            device_name: 设备名称
+            
+        Returns:
+            TestExecutor: 分片执行器
+        """
+        shard = type(self)(self.db, self.execution_id, simulation=self.simulation)
+        shard._db_lock = self._db_lock
+        shard.step_buffer = self.step_buffer
+        shard.checkpointer = None
+        shard.cancel_token = self.cancel_token
+        shard.step_timeout = self.step_timeout
+        shard.screenshot_policy = self.screenshot_policy
+        shard.step_plan = self._get_step_plan()
+        shard.step_keywords = self.step_keywords
+        shard.step_assertions = self.step_assertions
+        shard.execution = self.execution
+        shard.test_case = self.test_case
+        shard.device = device
+        shard.device_name = device_name
+        shard.locator = create_element_locator(device)
+        shard.assertions = Assertions(device)
+        return shard
+
+    @staticmethod
+    def _resolve_device_name(device_id: str) -> str:
+        """
+        将执行记录的设备ID解析为设备名称，资源池中没有该设备时设备ID即为设备名称
+        
+        Args:
+            device_id: 设备ID
+            
+        Returns:
+            str: 设备名称，对应settings.DEVICES中的配置
+        """
+        resource = resource_pool.get_resource(device_id)
+        return resource.name if resource else device_id
 
-    async def _execute_step(self, step: Dict[str, Any]):
-        """执行单个测试步骤"""
+    async def _get_device(self, device_name: str) -> Any:
+        """
+        获取设备，演练执行时返回模拟驱动
+        
+        Args:
+            device_name: 设备名称
+            
+        Returns:
+            Any: 设备驱动实例
+        """
+        if self.simulation:
+            return AsyncSimulatedDriver(self.simulation)
+        return await DeviceManager.get_device(device_name)
+
+    async def _release_device(self, device: Any) -> None:
+        """释放设备，模拟驱动不占用设备"""
+        if isinstance(device, AsyncSimulatedDriver):
+            return
+        await DeviceManager.release_device(device)
+
+    def _get_rows(self) -> List[Dict[str, Any]]:
+        """获取测试数据行列表"""
+        return self.test_data.get_test_data() if hasattr(self.test_data, "get_test_data") else list(self.test_data)
+
+    def _resume_step(self) -> int:
+        """
+        获取当前步骤列表的起始序号，检查点记录的未完成行从最后完成步骤的下一步继续，之后归零
+        
+        Returns:
+            int: 起始步骤序号
+        """
+        if not self.track_steps or not self.checkpointer:
+            return 0
+        start = self.checkpointer.last_step + 1
+        self.checkpointer.last_step = -1
+        return start
+
+    async def _execute_sharded(self):
+        """将测试数据行分发到多台租用的设备并发执行，逐行结果合并到同一条执行记录"""
+        # 各行在不同设备上交错执行，检查点只记录已完成的行
+        self.track_steps = False
+        indexed = [
+            (index, data) for index, data in enumerate(self._get_rows())
+            if not self.checkpointer.is_row_done(index)
+        ]
+        rows = [data for _, data in indexed]
+        if not rows:
+            return
+        
+        user = f"execution:{self.execution_id}"
+        # 分片期间当前设备标记为已分配，不会被其他执行租用；已由调度器分配时不重复标记
+        primary = resource_pool.allocate_resources(ResourceType.DEVICE, user, 1, resource_ids=[self.device_id])
+        # 当前设备之外再租用 shards - 1 台平台匹配的设备
+        wanted = min(self.shards, len(rows)) - 1
+        leased = resource_pool.allocate_resources(ResourceType.DEVICE, user, wanted, resource_ids=self._shard_device_ids())
+        workers = [self]
+        try:
+            for resource in leased:
+                try:
+                    device = await self._get_device(resource.name)
+                except Exception as e:
+                    logger.warning(f"分片设备 {resource.name} 不可用: {str(e)}")
+                    continue
+                if device:
+                    workers.append(self._fork(device, resource.name))
+            
+            if len(workers) - 1 < wanted:
+                logger.warning(f"执行记录 {self.execution_id}: 需要 {wanted} 台分片设备, 实际可用 {len(workers) - 1} 台")
+            logger.info(f"执行记录 {self.execution_id}: {len(rows)} 行数据分发到 {len(workers)} 台设备")
+
+            async def run_row(worker: "TestExecutor", index: int, data: Dict[str, Any]) -> None:
+                await self.cancel_token.check()
+                worker.current_data_index = indexed[index][0]
+                await worker._execute_with_data(data)
+                await self.checkpointer.record_row(indexed[index][0], self.variables, sharded=True)
+            
+            summary = merge_row_results(await run_sharded(rows, workers, run_row))
+        finally:
+            for worker in workers[1:]:
+                await self._release_device(worker.device)
+            for resource in leased + primary:
+                resource_pool.release_resource(resource.resource_id)
+        
+        async with self._db_lock:
+            self.execution.row_results = summary
+            await self.db.commit()
+        # 取消或超时后剩余的行都以失败结束，按取消或超时上报
+        await self.cancel_token.check()
+        if summary["failed"]:
+            raise Exception(f"{summary['failed']}/{summary['total']} 行数据执行失败: {summary['error_message']}")
+
+    def _shard_device_ids(self) -> List[str]:
+        """
+        获取可租用为分片设备的设备ID，排除当前设备，只保留与测试用例平台匹配的设备，设备未声明平台时视为匹配
+        
+        Returns:
+            List[str]: 设备ID列表
+        """
+        platform = getattr(self.test_case.platform, "value", self.test_case.platform)
+        return [
+            resource.resource_id
+            for resource in resource_pool.get_resources_by_type(ResourceType.DEVICE)
+            if resource.resource_id != self.device_id
+            and resource.name != self.device_name
+            and (not platform or not resource.properties.get("platform") or resource.properties["platform"] == platform)
+        ]
+
+    async def _execute_steps(self, steps: List[Dict[str, Any]], start: int = 0):
+        """
+        执行测试步骤列表
+        
+        Args:
+            steps: 步骤列表
+            start: 起始步骤序号，从检查点恢复时跳过已完成的步骤
+        """
+        self._get_step_plan()
+        remaining = steps[start:]
+        if self.fuse_gestures:
+            groups = fuse_steps(remaining, is_mobile_driver(self.device))
+        else:
+            groups = [[step] for step in remaining]
+        index = start
+        for group in groups:
+            if len(group) > 1 and self.fuse_gestures:
+                run = self._execute_fused_steps(group)
+            else:
+                run = self._execute_step(group[0], self.step_keywords[index] if index < len(self.step_keywords) else None)
+            try:
+                # 步骤挂起时按时间预算中断，停止执行时立即中断
+                await self.cancel_token.run(run, self._step_budget(group))
+            except (ExecutionCancelledError, ExecutionTimeoutError) as e:
+                await self._record_step(group[0], TestStepStatus.FAILED, str(e))
+                raise
+            for _ in group:
+                if self.track_steps and self.checkpointer:
+                    await self.checkpointer.record_step(index, self.variables)
+                index += 1
+
+    def _step_budget(self, steps: List[Dict[str, Any]]) -> Optional[float]:
+        """
+        获取一组步骤的时间预算，步骤可用timeout字段单独指定
+        
+        Args:
+            steps: 步骤列表
+        
+        Returns:
+            Optional[float]: 时间预算（秒），为空时只受整次执行的预算限制
+        """
+        budgets = [step.get("timeout") or self.step_timeout for step in steps]
+        if not all(budgets):
+            return None
+        return float(sum(budgets))
+
+    async def _execute_fused_steps(self, steps: List[Dict[str, Any]]):
+        """
+        合并执行相邻的手势步骤，元素全部定位后只发送一次W3C Actions命令
+        
+        后续步骤的元素查找失败时，说明它依赖前面的手势，先提交已合并的部分再重新查找。
+        
+        Args:
+            steps: 可合并的步骤
+        """
+        items = []
+        timer = StepTimer()
+        current = steps[0]
+        try:
+            for step in steps:
+                current = step
+                element = None
+                try:
+                    with timer.phase("locate"):
+                        element = await self.locator.find_element(step["element"])
+                except Exception:
+                    if not items:
+                        raise
+                if not element and items:
+                    await self._dispatch_actions(items, timer)
+                    items = []
+                    timer = StepTimer()
+                    with timer.phase("locate"):
+                        element = await self.locator.find_element(step["element"])
+                if not element:
+                    raise Exception(f"未找到元素: {step['element']}")
+                items.append((step, element, None))
+            current = items[0][0]
+            await self._dispatch_actions(items, timer)
+        except Exception as e:
+            await self._record_step(current, TestStepStatus.FAILED, str(e), timer)
+            raise
+
+    async def _dispatch_actions(self, items: List[Any], timer: Optional[StepTimer] = None):
+        """发送合并后的W3C Actions并记录各步骤结果，驱动不支持时改为逐步执行，耗时平均分给各步骤"""
+        timer = timer or StepTimer()
+        with timer.phase("action"):
+            try:
+                await self.device.execute(
+                    W3C_ACTIONS_COMMAND,
+                    {"actions": build_actions(items, is_mobile_driver(self.device))}
+                )
+            except UnknownMethodException:
+                logger.warning("驱动不支持W3C Actions，关闭步骤合并")
+                self.fuse_gestures = False
+                for step, element, _ in items:
+                    await self._perform_action(element, step)
+        for step, _, _ in items:
+            await self._record_step(step, TestStepStatus.PASSED, "步骤执行成功", timer.divide(len(items)))
+
+    async def _execute_step(self, step: Dict[str, Any], keyword: Optional[Keyword] = None):
+        """
+        执行单个测试步骤
+        
+        Args:
+            step: 步骤
+            keyword: 编译时解析的操作关键字，为空时按步骤操作解析
+        """
+        timer = StepTimer()
         try:
             # 查找元素
-            element = await self.locator.find_element(step["element"])
+            with timer.phase("locate"):
+                element = await self.locator.find_element(step["element"])
             if not element:
                 raise Exception(f"未找到元素: {step['element']}")
 
-            # 执行操作
-            result = await self._perform_action(element, step)
+            # 执行操作，断言步骤的耗时单独统计
+            with timer.phase("assertion" if step["action"] == "assert" else "action"):
+                await self._perform_action(element, step, keyword)
             
-            # 记录步骤结果
-            await test_execution_crud.create_step_result(
-                self.db,
-                self.execution_id,
-                step["step_number"],
-                step["action"],
-                step["element"],
-                step.get("value"),
-                "success",
-                "步骤执行成功",
-                await take_screenshot(self.device)
-            )
+            # 记录步骤结果，写入缓冲后批量插入
+            await self._record_step(step, TestStepStatus.PASSED, "步骤执行成功", timer)
         except Exception as e:
             # 记录失败结果
-            await test_execution_crud.create_step_result(
-                self.db,
-                self.execution_id,
-                step["step_number"],
-                step["action"],
-                step["element"],
-                step.get("value"),
-                "failed",
-                str(e),
-                await take_screenshot(self.device)
-            )
+            await self._record_step(step, TestStepStatus.FAILED, str(e), timer)
             raise
 
-    async def _replace_step_variables(self, steps: List[Dict[str, Any]], data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """替换步骤中的变量"""
-        result = []
-        for step in steps:
-            new_step = {}
-            for key, value in step.items():
-                if isinstance(value, str):
-                    # 替换字符串中的变量
-                    for var_name, var_value in data.items():
-                        value = value.replace(f"${{{var_name}}}", str(var_value))
-                new_step[key] = value
-            result.append(new_step)
-        return result
-
-    async def _perform_action(self, element: Any, step: Dict[str, Any]):
+    async def _record_step(
+        self,
+        step: Dict[str, Any],
+        status: TestStepStatus,
+        message: str,
+        timer: Optional[StepTimer] = None
+    ):
+        """
+        记录步骤结果到写缓冲，按截图策略决定是否截图
+        
+        Args:
+            step: 步骤
+            status: 步骤状态
+            message: 结果信息
+            timer: 步骤计时，截图和持久化耗时记入同一计时
+        """
+        timer = timer or StepTimer()
+        self.step_count += 1
+        screenshot = None
+        if should_capture(
+            self.screenshot_policy,
+            self.step_count,
+            failed=status != TestStepStatus.PASSED,
+            is_assertion=step["action"] == "assert",
+            every_n=settings.SCREENSHOT_EVERY_N
+        ):
+            # 只在步骤中获取截图数据，解码和写盘在后台完成
+            with timer.phase("screenshot"):
+                screenshot = await screenshot_pipeline.capture(self.device, self.device_name, self.execution_id)
+        row = {
+            "execution_id": self.execution_id,
+            "step_number": step["step_number"],
+            "action": step["action"],
+            "element": step["element"],
+            "value": step.get("value"),
+            "status": status,
+            "message": message,
+            "screenshot": screenshot
+        }
+        # 插入在后台批量完成，不在步骤内发生，按已写入批次的每行耗时估算折算到本步骤
+        timer.add("persist", self.step_buffer.row_cost(), deferred=True)
+        row["duration"] = timer.elapsed_ms()
+        row["timings"] = timer.to_dict()
+        # 结果字段全部填写后再交给写缓冲，之后不再修改
+        self.step_buffer.add(row)
+
+    def _get_step_plan(self) -> StepPlan:
+        """获取步骤计划，首次使用时编译并解析操作和断言关键字，不支持的关键字在执行前报错，之后每行数据只做一次拼接"""
+        if self.step_plan is None:
+            steps = self.test_case.steps
+            self.step_keywords = [element_actions.resolve(step["action"]) for step in steps]
+            self.step_assertions = {
+                step["step_number"]: self._resolve_assertion(step)
+                for step in steps if step["action"] == "assert"
+            }
+            self.step_plan = StepPlan(steps)
+        return self.step_plan
+
+    @staticmethod
+    def _resolve_assertion(step: Dict[str, Any]) -> Keyword:
+        """
+        解析断言步骤的断言关键字
+        
+        Args:
+            step: 断言步骤
+        
+        Returns:
+            Keyword: 断言关键字
+        
+        Raises:
+            Exception: 未指定断言类型
+            ValueError: 不支持的断言类型
+        """
+        assert_type = step.get("assert_type")
+        if not assert_type:
+            raise Exception(f"步骤 {step.get('step_number')} 未指定断言类型")
+        return element_assertions.resolve(assert_type)
+
+    async def _perform_action(self, element: Any, step: Dict[str, Any], keyword: Optional[Keyword] = None):
         """执行具体的操作"""
-        action = step["action"]
-        value = step.get("value")
-
-        if action == "click":
-            await element.click()
-        elif action == "input":
-            await element.clear()
-            await element.send_keys(value)
-        elif action == "wait":
-            await asyncio.sleep(float(value))
-        elif action == "assert":
-            await self._perform_assertion(step)
-        else:
-            raise Exception(f"不支持的操作: {action}")
+        keyword = keyword or element_actions.resolve(step["action"])
+        await keyword(self, element, step)
 
     async def _perform_assertion(self, step: Dict[str, Any]):
-        """执行断言操作"""
-        assert_type = step.get("assert_type")
-        if not assert_type:
-            raise Exception("未指定断言类型")
-
-        element = step["element"]
-        value = step.get("value")
-
-        if assert_type == "text":
-            if not value:
-                raise Exception("断言文本内容时未指定预期值")
-            result = await self.assertions.assert_element_text(element, value)
-        elif assert_type == "attribute":
-            attribute = step.get("attribute")
-            if not attribute or not value:
-                raise Exception("断言属性时未指定属性名或预期值")
-            result = await self.assertions.assert_element_attribute(element, attribute, value)
-        elif assert_type == "visible":
-            result = await self.assertions.assert_element_visible(element)
-        elif assert_type == "enabled":
-            result = await self.assertions.assert_element_enabled(element)
-        elif assert_type == "selected":
-            result = await self.assertions.assert_element_selected(element)
-        elif assert_type == "count":
-            if not value:
-                raise Exception("断言元素数量时未指定预期值")
-            result = await self.assertions.assert_element_count(element, int(value))
-        elif assert_type == "page_source":
-            if not value:
-                raise Exception("断言页面源码时未指定预期值")
-            result = await self.assertions.assert_page_source_contains(value)
-        elif assert_type == "url":
-            if not value:
-                raise Exception("断言URL时未指定预期值")
-            result = await self.assertions.assert_current_url(value)
-        else:
-            raise Exception(f"不支持的断言类型: {assert_type}")
+        """执行断言操作，使用编译时解析的断言关键字"""
+        keyword = self.step_assertions.get(step.get("step_number")) or self._resolve_assertion(step)
+
+        result = await keyword(self.assertions, step)
 
         if not result:
-            raise Exception(f"断言失败: {assert_type}")
+            raise Exception(f"断言失败: {step['assert_type']}")
 
-    async def _handle_error(self, error_message: str):
-        """处理执行过程中的错误"""
-        await test_execution_crud.update_execution_status(
-            self.db,
-            self.execution_id,
-            "failed",
-            error_message
-        )
+    async def _handle_error(self, error_message: str, status: str = "failed"):
+        """
+        处理执行过程中的错误
+        
+        Args:
+            error_message: 错误信息
+            status: 执行状态，停止执行时为已取消
+        """
+        try:
+            await self.step_buffer.close()
+        except Exception as e:
+            logger.error(f"写入步骤结果失败: {str(e)}")
+        # 失败时立即写入检查点，恢复执行从最后完成的位置继续
+        if self.checkpointer:
+            await self.checkpointer.save()
+        async with self._db_lock:
+            await test_execution_crud.update_execution_status(
+                self.db,
+                self.execution_id,
+                status,
+                error_message
+            )
 
     async def _cleanup(self):
         """清理测试环境"""
+        # 先释放设备，取消或超时的执行不必等截图写盘
         if self.device:
-            await DeviceManager.release_device(self.device)
+            await self._release_device(self.device)
+        # 截图在后台写盘，结束前只等待本次执行的截图写完，保证步骤结果引用的文件存在
+        await screenshot_pipeline.drain(self.execution_id)
 
     async def stop(self) -> None:
-        """停止测试执行"""
-        try:
-            self.test_engine.stop_execution(self.execution_id)
-        except Exception as e:
-            logger.error(f"停止测试执行失败: {str(e)}")
-            raise
+        """停止测试执行，当前步骤被中断，设备在清理时释放"""
+        self.cancel_token.cancel("执行已停止")
 
     def get_status(self) -> str:
         """
@@ -369,7 +727,9 @@ class WebTestExecutor(TestExecutor):
 def create_test_executor(
     test_case_id: Optional[int] = None,
     device_id: Optional[str] = None,
-    execution_id: Optional[int] = None
+    execution_id: Optional[int] = None,
+    shards: int = 1,
+    simulation: Optional[SimulationProfile] = None
 ) -> TestExecutor:
     """
     创建测试执行器
@@ -378,11 +738,13 @@ def create_test_executor(
         test_case_id: 测试用例ID
         device_id: 设备ID
         execution_id: 执行记录ID
+        shards: 数据驱动分片数
+        simulation: 模拟驱动配置，传入时演练执行
         
     Returns:
         TestExecutor: 测试执行器实例
     """
-    executor = TestExecutor(None, execution_id)
+    executor = TestExecutor(None, execution_id, shards=shards, simulation=simulation)
     executor.test_case_id = test_case_id
     executor.device_id = device_id
     return executor
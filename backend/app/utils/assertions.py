@@ -1,15 +1,21 @@
 from typing import Any, Optional
 from appium.webdriver.webdriver import WebDriver
 from appium.webdriver.common.appiumby import AppiumBy as By
+from app.utils.locator_parser import parse_locator
 
 class Assertions:
+    """元素断言
+    
+    locator 支持 "定位方式:定位值" 格式，没有定位方式前缀时按 XPath 处理
+    """
+
     def __init__(self, driver: WebDriver):
         self.driver = driver
 
     async def assert_element_text(self, locator: str, expected_text: str) -> bool:
         """断言元素文本内容"""
         try:
-            element = await self.driver.find_element(By.XPATH, locator)
+            element = await self.driver.find_element(*parse_locator(locator, By.XPATH))
             actual_text = await element.text
             return actual_text == expected_text
         except Exception as e:
@@ -18,7 +24,7 @@ class Assertions:
     async def assert_element_attribute(self, locator: str, attribute: str, expected_value: str) -> bool:
         """断言元素属性值"""
         try:
-            element = await self.driver.find_element(By.XPATH, locator)
+            element = await self.driver.find_element(*parse_locator(locator, By.XPATH))
             actual_value = await element.get_attribute(attribute)
             return actual_value == expected_value
         except Exception as e:
@@ -27,7 +33,7 @@ class Assertions:
     async def assert_element_visible(self, locator: str) -> bool:
         """断言元素可见"""
         try:
-            element = await self.driver.find_element(By.XPATH, locator)
+            element = await self.driver.find_element(*parse_locator(locator, By.XPATH))
             return await element.is_displayed()
         except Exception as e:
             raise Exception(f"断言元素可见失败: {str(e)}")
@@ -35,7 +41,7 @@ class Assertions:
     async def assert_element_enabled(self, locator: str) -> bool:
         """断言元素可用"""
         try:
-            element = await self.driver.find_element(By.XPATH, locator)
+            element = await self.driver.find_element(*parse_locator(locator, By.XPATH))
             return await element.is_enabled()
         except Exception as e:
             raise Exception(f"断言元素可用失败: {str(e)}")
@@ -43,7 +49,7 @@ class Assertions:
     async def assert_element_selected(self, locator: str) -> bool:
         """断言元素被选中"""
         try:
-            element = await self.driver.find_element(By.XPATH, locator)
+            element = await self.driver.find_element(*parse_locator(locator, By.XPATH))
             return await element.is_selected()
         except Exception as e:
             raise Exception(f"断言元素选中失败: {str(e)}")
@@ -67,7 +73,7 @@ class Assertions:
     async def assert_element_count(self, locator: str, expected_count: int) -> bool:
         """断言元素数量"""
         try:
-            elements = await self.driver.find_elements(By.XPATH, locator)
+            elements = await self.driver.find_elements(*parse_locator(locator, By.XPATH))
             return len(elements) == expected_count
         except Exception as e:
             raise Exception(f"断言元素数量失败: {str(e)}") 
\ No newline at end of file
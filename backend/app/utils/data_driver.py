@@ -3,6 +3,7 @@ import csv
 import yaml
 from typing import List, Dict, Any, Optional
 from pathlib import Path
+from app.core.step_plan import StepPlan
 
 class DataDriver:
     @staticmethod
@@ -74,14 +75,4 @@ class DataDriver:
     @staticmethod
     async def _replace_variables(data: List[Dict[str, Any]], variables: Dict[str, Any]) -> List[Dict[str, Any]]:
         """替换数据中的变量"""
-        result = []
-        for item in data:
-            new_item = {}
-            for key, value in item.items():
-                if isinstance(value, str):
-                    # 替换字符串中的变量
-                    for var_name, var_value in variables.items():
-                        value = value.replace(f"${{{var_name}}}", str(var_value))
-                new_item[key] = value
-            result.append(new_item)
-        return result 
\ No newline at end of file
+        return [dict(item) for item in StepPlan(data).render(variables)] 
\ No newline at end of file
@@ -1,56 +1,260 @@
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 import asyncio
+import json
+import time
 from appium import webdriver
 from appium.webdriver.common.appiumby import AppiumBy
 from app.core.config import settings
+from app.core.driver_executor import driver_executors
+from app.core.logger import logger
+
+# 能力中的应用标识，归还会话时按此重启应用
+APP_ID_CAPABILITIES = ("appium:appPackage", "appPackage", "appium:bundleId", "bundleId")
+
+class PooledSession:
+    """会话池中的一个驱动会话"""
+
+    def __init__(self, device_name: str, key: str, capabilities: Dict[str, Any], driver: webdriver.Remote):
+        self.device_name = device_name
+        self.key = key
+        self.capabilities = capabilities
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.in_use = False
+
+    @property
+    def app_id(self) -> Optional[str]:
+        return next((self.capabilities[name] for name in APP_ID_CAPABILITIES if self.capabilities.get(name)), None)
 
 class DeviceManager:
-    _devices: Dict[str, webdriver.Remote] = {}
-    _lock = asyncio.Lock()
+    """设备会话池：每台设备保留一个预热的会话，执行之间重启应用复用，空闲超时后关闭"""
+    _sessions: Dict[str, PooledSession] = {}
+    _locks: Dict[str, asyncio.Lock] = {}
+    _evictor: Optional[asyncio.Task] = None
+    _created = 0
+    _reused = 0
+    _evicted = 0
+
+    @classmethod
+    def _get_lock(cls, device_name: str) -> asyncio.Lock:
+        """获取设备锁，不同设备的会话创建和归还互不阻塞"""
+        lock = cls._locks.get(device_name)
+        if lock is None:
+            lock = cls._locks[device_name] = asyncio.Lock()
+        return lock
+
+    @classmethod
+    def _get_capabilities(cls, device_name: str, capabilities: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """合并设备配置和本次执行指定的能力"""
+        device_config = settings.DEVICES.get(device_name)
+        if not device_config:
+            raise Exception(f"设备 {device_name} 未配置")
+        return {**device_config, **(capabilities or {})}
+
+    @staticmethod
+    def _session_key(device_name: str, capabilities: Dict[str, Any]) -> str:
+        """会话池键：设备名称加能力集合，能力不同的会话不能复用"""
+        return f"{device_name}:{json.dumps(capabilities, sort_keys=True, default=str)}"
+
+    @classmethod
+    async def _run(cls, device_name: str, func: Any, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """在设备的驱动调用执行器中运行阻塞调用，不阻塞事件循环"""
+        call = driver_executors.get(device_name).run(func, *args, **kwargs)
+        if timeout is None:
+            return await call
+        return await asyncio.wait_for(call, timeout)
+
+    @classmethod
+    async def _create_session(cls, device_name: str, capabilities: Dict[str, Any]) -> PooledSession:
+        """创建新的驱动会话"""
+        started = time.monotonic()
+        driver = await cls._run(
+            device_name,
+            webdriver.Remote,
+            command_executor=settings.APPIUM_SERVER,
+            desired_capabilities=capabilities
+        )
+        cls._created += 1
+        logger.info(f"设备 {device_name} 创建会话耗时 {time.monotonic() - started:.1f} 秒")
+        return PooledSession(device_name, cls._session_key(device_name, capabilities), capabilities, driver)
+
+    @classmethod
+    async def _is_healthy(cls, session: PooledSession) -> bool:
+        """检查会话是否仍然可用，一次轻量命令，超时视为不可用"""
+        if not session.driver.session_id:
+            return False
+        try:
+            await cls._run(
+                session.device_name,
+                session.driver.get_window_size,
+                timeout=settings.SESSION_HEALTH_TIMEOUT
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"设备 {session.device_name} 的会话不可用: {str(e)}")
+            return False
+
+    @classmethod
+    async def _reset_app(cls, session: PooledSession) -> None:
+        """重启被测应用，代替关闭会话，下次执行从应用初始状态开始"""
+        app_id = session.app_id
+        if not app_id:
+            return
+
+        def reset() -> None:
+            session.driver.terminate_app(app_id)
+            session.driver.activate_app(app_id)
+
+        await cls._run(session.device_name, reset, timeout=settings.SESSION_HEALTH_TIMEOUT)
+
+    @classmethod
+    async def _quit_session(cls, session: PooledSession) -> None:
+        """关闭会话，关闭失败只记录日志"""
+        try:
+            await cls._run(session.device_name, session.driver.quit, timeout=settings.SESSION_HEALTH_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"关闭设备 {session.device_name} 的会话失败: {str(e)}")
 
     @classmethod
-    async def get_device(cls, device_name: str) -> Optional[webdriver.Remote]:
-        """获取设备实例"""
-        async with cls._lock:
-            if device_name in cls._devices:
-                return cls._devices[device_name]
+    async def _close_session(cls, session: PooledSession) -> None:
+        """关闭会话并释放设备的驱动调用执行器，调用方持有设备锁"""
+        if cls._sessions.get(session.device_name) is session:
+            del cls._sessions[session.device_name]
+        await cls._quit_session(session)
+        driver_executors.release(session.device_name, wait=False)
+
+    @classmethod
+    def _ensure_evictor(cls) -> None:
+        """启动空闲会话回收协程"""
+        if cls._evictor is None or cls._evictor.done():
+            cls._evictor = asyncio.ensure_future(cls._evict_idle())
+
+    @classmethod
+    async def _evict_idle(cls) -> None:
+        """定期关闭空闲超时的会话，避免超过Appium的newCommandTimeout后成为失效会话"""
+        while True:
+            await asyncio.sleep(max(settings.SESSION_IDLE_TIMEOUT / 4, 1.0))
+            now = time.monotonic()
+            for device_name, session in list(cls._sessions.items()):
+                if session.in_use or now - session.last_used < settings.SESSION_IDLE_TIMEOUT:
+                    continue
+                async with cls._get_lock(device_name):
+                    if cls._sessions.get(device_name) is not session or session.in_use:
+                        continue
+                    cls._evicted += 1
+                    await cls._close_session(session)
+                logger.info(f"设备 {device_name} 的会话空闲超时，已关闭")
+
+    @classmethod
+    async def get_device(cls, device_name: str, capabilities: Optional[Dict[str, Any]] = None) -> Optional[webdriver.Remote]:
+        """
+        获取设备实例，优先复用会话池中的空闲会话
+
+        Args:
+            device_name: 设备名称
+            capabilities: 本次执行追加的能力，与设备配置合并
+
+        Returns:
+            Optional[webdriver.Remote]: 驱动会话
+        """
+        try:
+            merged = cls._get_capabilities(device_name, capabilities)
+        except Exception as e:
+            raise Exception(f"初始化设备失败: {str(e)}")
+        key = cls._session_key(device_name, merged)
+        cls._ensure_evictor()
+        async with cls._get_lock(device_name):
+            session = cls._sessions.get(device_name)
+            if session is not None:
+                if session.in_use:
+                    raise Exception(f"设备 {device_name} 正在使用中")
+                # 能力不同或会话失效时关闭，同一设备同时只能有一个会话
+                if session.key == key and await cls._is_healthy(session):
+                    session.in_use = True
+                    session.uses += 1
+                    session.last_used = time.monotonic()
+                    cls._reused += 1
+                    return session.driver
+                await cls._close_session(session)
 
             try:
-                # 从配置中获取设备信息
-                device_config = settings.DEVICES.get(device_name)
-                if not device_config:
-                    raise Exception(f"设备 {device_name} 未配置")
-
-                # 创建新的设备实例
-                driver = webdriver.Remote(
-                    command_executor=settings.APPIUM_SERVER,
-                    desired_capabilities=device_config
-                )
-                cls._devices[device_name] = driver
-                return driver
+                session = await cls._create_session(device_name, merged)
             except Exception as e:
                 raise Exception(f"初始化设备失败: {str(e)}")
+            session.in_use = True
+            session.uses = 1
+            cls._sessions[device_name] = session
+            return session.driver
 
     @classmethod
     async def release_device(cls, device: webdriver.Remote):
-        """释放设备"""
-        async with cls._lock:
-            for name, dev in cls._devices.items():
-                if dev == device:
-                    try:
-                        await dev.quit()
-                    except:
-                        pass
-                    del cls._devices[name]
-                    break
+        """归还设备：重启应用后保留会话供下次执行复用，会话失效或使用次数达到上限时关闭会话并释放驱动调用执行器"""
+        session = next((session for session in cls._sessions.values() if session.driver is device), None)
+        if session is None:
+            return
+        async with cls._get_lock(session.device_name):
+            keep = session.uses < settings.SESSION_MAX_USES and await cls._is_healthy(session)
+            if keep:
+                try:
+                    await cls._reset_app(session)
+                except Exception as e:
+                    logger.warning(f"设备 {session.device_name} 重启应用失败: {str(e)}")
+                    keep = False
+            if not keep:
+                await cls._close_session(session)
+                return
+            session.in_use = False
+            session.last_used = time.monotonic()
+
+    @classmethod
+    async def warm_up(cls, device_names: Optional[List[str]] = None) -> int:
+        """
+        为设备预先创建会话，各设备并发创建
+
+        Args:
+            device_names: 设备名称列表，为空时为全部已配置设备
+
+        Returns:
+            int: 预热成功的设备数
+        """
+        async def warm(device_name: str) -> bool:
+            try:
+                await cls.release_device(await cls.get_device(device_name))
+                return True
+            except Exception as e:
+                logger.error(f"设备 {device_name} 预热失败: {str(e)}")
+                return False
+
+        names = device_names if device_names is not None else list(settings.DEVICES)
+        results = await asyncio.gather(*[warm(device_name) for device_name in names])
+        return sum(results)
 
     @classmethod
     async def release_all_devices(cls):
         """释放所有设备"""
-        async with cls._lock:
-            for device in cls._devices.values():
-                try:
-                    await device.quit()
-                except:
-                    pass
-            cls._devices.clear() 
\ No newline at end of file
+        if cls._evictor is not None:
+            cls._evictor.cancel()
+            cls._evictor = None
+        sessions = list(cls._sessions.values())
+        cls._sessions.clear()
+        await asyncio.gather(*[cls._quit_session(session) for session in sessions])
+        for session in sessions:
+            driver_executors.release(session.device_name, wait=False)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """
+        获取会话池统计
+
+        Returns:
+            Dict[str, Any]: 会话数、创建、复用和回收次数
+        """
+        return {
+            "sessions": len(cls._sessions),
+            "in_use": sum(1 for session in cls._sessions.values() if session.in_use),
+            "created": cls._created,
+            "reused": cls._reused,
+            "evicted": cls._evicted
+        } 
\ No newline at end of file
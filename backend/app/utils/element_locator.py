@@ -1,11 +1,18 @@
-from typing import Optional, Any
+from typing import Optional, Any, List, Tuple
 import asyncio
-from appium.webdriver.common.appiumby import AppiumBy
 from appium.webdriver.webdriver import WebDriver
+from app.utils.locator_parser import parse_locator
+from app.core.exceptions import WaitCancelledError
 
 class ElementLocator:
-    def __init__(self, driver: WebDriver):
+    def __init__(self, driver: WebDriver, poll_interval: float = 0.2):
+        """
+        Args:
+            driver: WebDriver实例
+            poll_interval: 等待元素时的轮询间隔（秒），支持小于1秒
+        """
         self.driver = driver
+        self.poll_interval = poll_interval
 
     async def find_element(self, locator: str) -> Optional[Any]:
         """查找元素
@@ -17,47 +24,121 @@ class ElementLocator:
                     - xpath: XPath表达式
                     - name: 元素名称
                     - class: 元素类名
+                    - css: CSS选择器
                     - accessibility_id: 无障碍ID
                     - android_uiautomator: Android UI Automator表达式
                     - ios_predicate: iOS Predicate表达式
+                    - ios_class_chain: iOS Class Chain表达式
         """
         try:
-            locator_type, locator_value = locator.split(":", 1)
-            locator_type = locator_type.strip().lower()
-            locator_value = locator_value.strip()
-
-            if locator_type == "id":
-                return await self.driver.find_element(AppiumBy.ID, locator_value)
-            elif locator_type == "xpath":
-                return await self.driver.find_element(AppiumBy.XPATH, locator_value)
-            elif locator_type == "name":
-                return await self.driver.find_element(AppiumBy.NAME, locator_value)
-            elif locator_type == "class":
-                return await self.driver.find_element(AppiumBy.CLASS_NAME, locator_value)
-            elif locator_type == "accessibility_id":
-                return await self.driver.find_element(AppiumBy.ACCESSIBILITY_ID, locator_value)
-            elif locator_type == "android_uiautomator":
-                return await self.driver.find_element(AppiumBy.ANDROID_UIAUTOMATOR, locator_value)
-            elif locator_type == "ios_predicate":
-                return await self.driver.find_element(AppiumBy.IOS_PREDICATE, locator_value)
-            else:
-                raise Exception(f"不支持的定位方式: {locator_type}")
+            by, locator_value = parse_locator(locator)
+            return await self.driver.find_element(by, locator_value)
         except Exception as e:
             raise Exception(f"查找元素失败: {str(e)}")
 
-    async def wait_for_element(self, locator: str, timeout: int = 10) -> Optional[Any]:
-        """等待元素出现"""
+    async def wait_for_element(
+        self,
+        locator: str,
+        timeout: float = 10,
+        poll_interval: Optional[float] = None,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> Optional[Any]:
+        """等待元素出现
+        
+        Args:
+            locator: 元素定位表达式
+            timeout: 超时时间（秒），按截止时间计算，包含查找本身的耗时
+            poll_interval: 轮询间隔（秒），默认使用初始化时的poll_interval
+            cancel_event: 取消事件，置位后立即停止等待
+        
+        Raises:
+            WaitCancelledError: 取消事件已置位，与任务被取消区分
+        """
+        poll_interval = poll_interval or self.poll_interval
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last_error = None
+        while True:
+            if cancel_event and cancel_event.is_set():
+                raise WaitCancelledError(f"等待元素已取消: {locator}")
+            try:
+                element = await self.find_element(locator)
+                if element:
+                    return element
+            except Exception as e:
+                last_error = e
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise Exception(f"等待元素失败: 等待元素超时 {locator}" + (f" ({last_error})" if last_error else ""))
+            await self._sleep(min(poll_interval, remaining), cancel_event)
+
+    async def wait_for_any(
+        self,
+        locators: List[str],
+        timeout: float = 10,
+        poll_interval: Optional[float] = None
+    ) -> Tuple[str, Any]:
+        """并发等待多个元素，返回最先出现的一个
+        
+        适用于一个操作可能进入多个不同页面的场景（如登录成功/失败提示）。
+        
+        Returns:
+            Tuple[str, Any]: 最先出现的定位表达式和元素
+        """
+        cancel_event = asyncio.Event()
+        tasks = {
+            asyncio.ensure_future(self.wait_for_element(locator, timeout, poll_interval, cancel_event)): locator
+            for locator in locators
+        }
         try:
-            element = await self.find_element(locator)
-            if element:
-                return element
-            await asyncio.sleep(1)
-            timeout -= 1
-            if timeout <= 0:
-                raise Exception("等待元素超时")
-            return await self.wait_for_element(locator, timeout)
-        except Exception as e:
-            raise Exception(f"等待元素失败: {str(e)}")
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        return tasks[task], task.result()
+            raise Exception(f"等待元素失败: 等待元素超时 {locators}")
+        finally:
+            cancel_event.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def wait_for_all(
+        self,
+        locators: List[str],
+        timeout: float = 10,
+        poll_interval: Optional[float] = None
+    ) -> List[Any]:
+        """并发等待多个元素全部出现，共用同一个截止时间
+        
+        Returns:
+            List[Any]: 与locators一一对应的元素
+        """
+        cancel_event = asyncio.Event()
+        tasks = [
+            asyncio.ensure_future(self.wait_for_element(locator, timeout, poll_interval, cancel_event))
+            for locator in locators
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            cancel_event.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _sleep(delay: float, cancel_event: Optional[asyncio.Event]) -> None:
+        """休眠指定时间，取消事件置位时提前返回"""
+        if not cancel_event:
+            await asyncio.sleep(delay)
+            return
+        try:
+            await asyncio.wait_for(cancel_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
 
     async def is_element_present(self, locator: str) -> bool:
         """检查元素是否存在"""
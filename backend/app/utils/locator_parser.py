@@ -0,0 +1,104 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+from appium.webdriver.common.appiumby import AppiumBy
+
+# 定位方式分发表："定位方式:定位值" 中的定位方式 -> AppiumBy
+LOCATOR_BY = {
+    "id": AppiumBy.ID,
+    "xpath": AppiumBy.XPATH,
+    "name": AppiumBy.NAME,
+    "class": AppiumBy.CLASS_NAME,
+    "class_name": AppiumBy.CLASS_NAME,
+    "css": AppiumBy.CSS_SELECTOR,
+    "css_selector": AppiumBy.CSS_SELECTOR,
+    "accessibility_id": AppiumBy.ACCESSIBILITY_ID,
+    "android_uiautomator": AppiumBy.ANDROID_UIAUTOMATOR,
+    "ios_predicate": AppiumBy.IOS_PREDICATE,
+    "ios_class_chain": AppiumBy.IOS_CLASS_CHAIN,
+}
+
+@lru_cache(maxsize=4096)
+def parse_locator(locator: str, default_by: Optional[str] = None) -> Tuple[str, str]:
+    """解析定位表达式，结果按表达式缓存，同一定位器只解析一次
+    
+    Args:
+        locator: 元素定位表达式，格式为 "定位方式:定位值"
+        default_by: 没有可识别的定位方式前缀时使用的定位方式，
+                    为None时视为不支持的定位方式
+    
+    Returns:
+        Tuple[str, str]: (AppiumBy定位方式, 定位值)
+    """
+    locator_type, sep, locator_value = locator.partition(":")
+    by = LOCATOR_BY.get(locator_type.strip().lower()) if sep else None
+    if by:
+        return by, locator_value.strip()
+    if default_by:
+        # XPath 等表达式本身可能包含冒号，例如 resource-id='com.app:id/btn'
+        return default_by, locator.strip()
+    raise ValueError(f"不支持的定位方式: {locator_type.strip().lower()}")
+
+def _parse_if_elif(locator: str) -> Tuple[str, str]:
+    """原先ElementLocator.find_element中的if/elif解析，仅作为基准测试的对照"""
+    locator_type, locator_value = locator.split(":", 1)
+    locator_type = locator_type.strip().lower()
+    locator_value = locator_value.strip()
+    
+    if locator_type == "id":
+        return AppiumBy.ID, locator_value
+    elif locator_type == "xpath":
+        return AppiumBy.XPATH, locator_value
+    elif locator_type == "name":
+        return AppiumBy.NAME, locator_value
+    elif locator_type == "class":
+        return AppiumBy.CLASS_NAME, locator_value
+    elif locator_type == "accessibility_id":
+        return AppiumBy.ACCESSIBILITY_ID, locator_value
+    elif locator_type == "android_uiautomator":
+        return AppiumBy.ANDROID_UIAUTOMATOR, locator_value
+    elif locator_type == "ios_predicate":
+        return AppiumBy.IOS_PREDICATE, locator_value
+    else:
+        raise Exception(f"不支持的定位方式: {locator_type}")
+
+def benchmark(steps: int = 10000, distinct_locators: int = 50) -> dict:
+    """测量解析开销：对比原先的if/elif解析、分发表解析（未缓存）和缓存后的解析
+    
+    Args:
+        steps: 模拟的步骤数
+        distinct_locators: 不同定位器的数量
+    
+    Returns:
+        dict: 每步解析耗时（微秒）及相对if/elif解析的加速比
+    """
+    import time
+    
+    # 各定位方式轮流出现，覆盖if/elif链的前后分支
+    prefixes = ["id", "xpath", "name", "class", "accessibility_id", "android_uiautomator", "ios_predicate"]
+    locators = [
+        f"{prefixes[i % len(prefixes)]}:com.example:id/button_{i % distinct_locators}"
+        for i in range(steps)
+    ]
+    parse_locator.cache_clear()
+    
+    def measure(parse) -> float:
+        started = time.perf_counter()
+        for locator in locators:
+            parse(locator)
+        return time.perf_counter() - started
+    
+    baseline = measure(_parse_if_elif)
+    uncached = measure(parse_locator.__wrapped__)
+    cached = measure(parse_locator)
+    
+    return {
+        "steps": steps,
+        "if_elif_us_per_step": round(baseline / steps * 1e6, 3),
+        "uncached_us_per_step": round(uncached / steps * 1e6, 3),
+        "cached_us_per_step": round(cached / steps * 1e6, 3),
+        "speedup_vs_if_elif": round(baseline / cached, 2) if cached else None,
+        "cache_info": parse_locator.cache_info()._asdict(),
+    }
+
+if __name__ == "__main__":
+    print(benchmark()) 
\ No newline at end of file
@@ -1,30 +1,188 @@
 import os
-from typing import Optional
-from datetime import datetime
+import base64
+import asyncio
+import hashlib
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union
 from appium.webdriver.webdriver import WebDriver
 from app.core.config import settings
+from app.core.driver_executor import driver_executors
+from app.core.enums.project import ScreenshotPolicy
+from app.core.logger import logger
 
-async def take_screenshot(driver: WebDriver) -> Optional[str]:
+def should_capture(
+    policy: Union[str, ScreenshotPolicy],
+    step_index: int,
+    failed: bool,
+    is_assertion: bool = False,
+    every_n: int = 10
+) -> bool:
+    """判断步骤是否需要截图
+
+    Args:
+        policy: 截图策略
+        step_index: 步骤序号（从1开始）
+        failed: 步骤是否失败
+        is_assertion: 是否为断言步骤
+        every_n: every_nth策略的间隔
+
+    Returns:
+        bool: 是否截图
+    """
+    policy = ScreenshotPolicy(policy)
+    if policy == ScreenshotPolicy.NEVER:
+        return False
+    # 除never外，失败步骤总是截图
+    if failed or policy == ScreenshotPolicy.ALWAYS:
+        return True
+    if policy == ScreenshotPolicy.EVERY_NTH:
+        return every_n > 0 and step_index % every_n == 0
+    if policy == ScreenshotPolicy.ON_ASSERTION:
+        return is_assertion
+    return False
+
+class ScreenshotPipeline:
+    """异步截图流水线：只在步骤中获取原始数据，解码和写盘交给后台线程池"""
+    
+    def __init__(self, root: Optional[str] = None, max_workers: int = 2):
+        """初始化截图流水线
+
+        Args:
+            root: 媒体根目录，默认为settings.MEDIA_ROOT
+            max_workers: 写盘线程数
+        """
+        self.root = root or settings.MEDIA_ROOT
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenshot")
+        # 待写入的截图及其所属执行，执行结束时只等待自己的截图
+        self._pending: Dict[Future, Any] = {}
+        self._lock = threading.Lock()
+        self._captured = 0
+        self._written = 0
+        self._deduplicated = 0
+        self._failures = 0
+    
+    @staticmethod
+    def content_path(data: Union[str, bytes]) -> str:
+        """根据截图内容生成相对路径，内容相同的截图共用一个文件
+
+        Args:
+            data: base64编码的截图数据
+
+        Returns:
+            str: 相对于媒体根目录的路径
+        """
+        if isinstance(data, str):
+            data = data.encode("ascii")
+        digest = hashlib.sha1(data).hexdigest()
+        return os.path.join("screenshots", digest[:2], f"{digest}.png")
+    
+    def _store(self, data: Union[str, bytes], relative_path: str) -> None:
+        """在后台线程中解码并写入文件"""
+        filepath = os.path.join(self.root, relative_path)
+        try:
+            if os.path.exists(filepath):
+                with self._lock:
+                    self._deduplicated += 1
+                return
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            # 先写临时文件再改名，并发写入同一内容时不会读到半个文件
+            temp_path = f"{filepath}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(base64.b64decode(data))
+            os.replace(temp_path, filepath)
+            with self._lock:
+                self._written += 1
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            logger.error(f"保存截图失败: {relative_path}, {str(e)}")
+    
+    def submit(self, data: Union[str, bytes], owner: Any = None) -> str:
+        """提交截图数据，立即返回内容寻址的路径
+
+        Args:
+            data: base64编码的截图数据
+            owner: 截图所属的执行，用于按执行等待写入
+
+        Returns:
+            str: 截图相对路径
+        """
+        relative_path = self.content_path(data)
+        future = self._executor.submit(self._store, data, relative_path)
+        with self._lock:
+            self._captured += 1
+            self._pending[future] = owner
+        future.add_done_callback(self._discard)
+        return relative_path
+    
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(future, None)
+    
+    async def capture(self, driver: Any, device_id: Optional[str] = None, owner: Any = None) -> Optional[str]:
+        """获取截图并提交到后台保存
+
+        同步驱动的截图调用在设备的驱动调用执行器中执行，与该设备的其他驱动调用串行，不阻塞事件循环。
+
+        Args:
+            driver: WebDriver实例，同步或异步
+            device_id: 设备ID，为空时在事件循环的默认线程池中获取截图
+            owner: 截图所属的执行，用于按执行等待写入
+
+        Returns:
+            Optional[str]: 截图相对路径，截图失败返回None
+        """
+        try:
+            if inspect.iscoroutinefunction(driver.get_screenshot_as_base64):
+                data = await driver.get_screenshot_as_base64()
+            elif device_id is not None:
+                data = await driver_executors.get(device_id).run(driver.get_screenshot_as_base64)
+            else:
+                data = await asyncio.get_running_loop().run_in_executor(None, driver.get_screenshot_as_base64)
+            return self.submit(data, owner)
+        except Exception as e:
+            logger.error(f"截图失败: {str(e)}")
+            return None
+    
+    async def drain(self, owner: Any = None) -> None:
+        """等待已提交的截图写入
+
+        Args:
+            owner: 只等待该执行的截图，为空时等待全部截图
+        """
+        with self._lock:
+            pending = [future for future, item_owner in self._pending.items() if owner is None or item_owner == owner]
+        if pending:
+            await asyncio.gather(*[asyncio.wrap_future(future) for future in pending])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取截图统计
+
+        Returns:
+            Dict[str, Any]: 统计信息
+        """
+        with self._lock:
+            return {
+                "captured": self._captured,
+                "written": self._written,
+                "deduplicated": self._deduplicated,
+                "failures": self._failures,
+                "pending": len(self._pending)
+            }
+
+# 进程级截图流水线
+screenshot_pipeline = ScreenshotPipeline(max_workers=settings.SCREENSHOT_WORKERS)
+
+async def take_screenshot(driver: WebDriver, device_id: Optional[str] = None) -> Optional[str]:
     """获取截图并保存
     
+    Args:
+        driver: WebDriver实例
+        device_id: 设备ID，截图调用在该设备的驱动调用执行器中执行
+    
     Returns:
         str: 截图文件路径，如果截图失败则返回None
     """
-    try:
-        # 创建截图目录
-        screenshot_dir = os.path.join(settings.MEDIA_ROOT, "screenshots")
-        os.makedirs(screenshot_dir, exist_ok=True)
-
-        # 生成文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"screenshot_{timestamp}.png"
-        filepath = os.path.join(screenshot_dir, filename)
-
-        # 获取截图
-        driver.get_screenshot_as_file(filepath)
-
-        # 返回相对路径
-        return os.path.join("screenshots", filename)
-    except Exception as e:
-        print(f"截图失败: {str(e)}")
-        return None 
\ No newline at end of file
+    return await screenshot_pipeline.capture(driver, device_id) 
\ No newline at end of file
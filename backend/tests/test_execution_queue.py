@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.core.enums.project import TestExecutionStatus, TestPriority
+from app.services import execution_queue as queue_module
+from app.services.execution_queue import ExecutionQueue
+
+
+class FakeResult:
+    def __init__(self, rows=None, rowcount=0):
+        self.rows = rows or []
+        self.rowcount = rowcount
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+class FakeSession:
+    """只实现出队用到的查询和条件更新的内存会话"""
+
+    def __init__(self):
+        self.rows = []
+
+    async def execute(self, statement):
+        if statement.is_select:
+            return FakeResult([
+                row for row in self.rows
+                if row.status == TestExecutionStatus.PENDING and row.queued_at is not None
+            ])
+        params = statement.compile().params
+        for row in self.rows:
+            if row.id == params["id_1"] and row.status == TestExecutionStatus.PENDING:
+                row.status = params["status"]
+                row.start_time = params["start_time"]
+                return FakeResult(rowcount=1)
+        return FakeResult(rowcount=0)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, row):
+        pass
+
+
+def make_execution(execution_id, test_case_id):
+    return SimpleNamespace(
+        id=execution_id,
+        test_case_id=test_case_id,
+        device_id="device-1",
+        status=None,
+        priority=None,
+        estimated_duration=None,
+        queued_at=None,
+        created_at=datetime.utcnow(),
+        start_time=None
+    )
+
+
+def enqueue_all(monkeypatch, queue, db, priorities):
+    """按用例优先级入队，返回执行记录"""
+    async def get_test_case(db, test_case_id):
+        return SimpleNamespace(priority=priorities[test_case_id])
+
+    async def get_durations(db, test_case_ids):
+        return {}
+
+    monkeypatch.setattr(queue_module.test_case_crud, "get", get_test_case)
+    monkeypatch.setattr(queue_module.suite_scheduler, "get_historical_durations", get_durations)
+
+    async def run():
+        executions = []
+        for execution_id, test_case_id in enumerate(priorities, start=1):
+            execution = make_execution(execution_id, test_case_id)
+            db.rows.append(execution)
+            executions.append(await queue.enqueue(db, execution))
+        return executions
+
+    return asyncio.run(run())
+
+
+def dequeue_all(queue, db):
+    async def run():
+        order = []
+        while True:
+            execution = await queue.dequeue(db, "device-1")
+            if execution is None:
+                return order
+            order.append(execution.id)
+
+    return asyncio.run(run())
+
+
+def test_dequeue_prefers_higher_priority(monkeypatch):
+    queue = ExecutionQueue(aging_interval=60.0)
+    db = FakeSession()
+    p3, p0 = enqueue_all(monkeypatch, queue, db, {"case-p3": TestPriority.P3, "case-p0": TestPriority.P0})
+    # 低优先级先入队一分钟，不足以越过三个优先级
+    p3.queued_at = datetime.utcnow() - timedelta(seconds=60)
+
+    assert dequeue_all(queue, db) == [p0.id, p3.id]
+    assert p0.status == TestExecutionStatus.RUNNING
+    assert p3.status == TestExecutionStatus.RUNNING
+
+
+def test_dequeue_ages_waiting_low_priority(monkeypatch):
+    queue = ExecutionQueue(aging_interval=60.0)
+    db = FakeSession()
+    p3, p0 = enqueue_all(monkeypatch, queue, db, {"case-p3": TestPriority.P3, "case-p0": TestPriority.P0})
+    # 等待超过三个提升间隔后，低优先级排到新入队的高优先级之前
+    p3.queued_at = datetime.utcnow() - timedelta(seconds=60 * 3 + 30)
+
+    assert dequeue_all(queue, db) == [p3.id, p0.id]
+    stats = queue._waits
+    assert stats[TestPriority.P3.value][0] >= 60 * 3